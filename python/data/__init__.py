@@ -1,3 +1,4 @@
 """ This module serves as the interface of the data package. """
 
 from .load_data import DataSetName, OptionDataSet, get_option_data
+from .history_store import HistoryStore, append_to_history_store
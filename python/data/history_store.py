@@ -0,0 +1,316 @@
+""" This module implements a columnar on-disk store for histories of option data sets (e.g., daily option chains).
+
+    Every column is a raw binary file that is memory-mapped when the store is opened, and a per-date offset index
+    locates the quotes and the expiry data of each date. The option data set for a date therefore consists of views
+    into the memory-mapped columns: a range of dates can be loaded lazily and without copying or parsing.
+
+    The option prices and liquidity proxies may be stored as float32, which halves the size of these columns; strikes,
+    expiries and curves are always stored as float64. The quote processor converts the prices to float64, such that
+    filtering runs at float64 in either case. """
+
+import os
+import json
+import numpy as np
+from typing import Dict, Iterator, Optional, Tuple, final
+import qproc
+from qproc import PriceUnit, OptionQuoteProcessor
+from .load_data import OptionDataSet
+
+STORE_FORMAT_VERSION: final = 2
+SUPPORTED_FORMAT_VERSIONS: final = (1, 2)  # version 1 stores have float64 prices
+METADATA_FILE_NAME: final = "metadata.json"
+DATE_UNIT: final = "datetime64[D]"
+
+DATES_KEY: final = "dates"
+SPOTS_KEY: final = "spots"
+QUOTE_OFFSETS_KEY: final = "quote_offsets"
+EXPIRY_OFFSETS_KEY: final = "expiry_offsets"
+EXPIRIES_KEY: final = "expiries"
+STRIKES_KEY: final = "strikes"
+OPTION_PRICES_KEY: final = "option_prices"
+LIQUIDITY_PROXIES_KEY: final = "liquidity_proxies"
+FORWARDS_KEY: final = "forwards"
+RATES_KEY: final = "rates"
+
+COLUMN_DTYPES: final = {DATES_KEY: np.int64,
+                        SPOTS_KEY: np.float64,
+                        QUOTE_OFFSETS_KEY: np.int64,
+                        EXPIRY_OFFSETS_KEY: np.int64,
+                        EXPIRIES_KEY: np.float64,
+                        STRIKES_KEY: np.float64,
+                        OPTION_PRICES_KEY: np.float64,
+                        LIQUIDITY_PROXIES_KEY: np.float64,
+                        FORWARDS_KEY: np.float64,
+                        RATES_KEY: np.float64}
+PRICE_COLUMNS: final = (OPTION_PRICES_KEY, LIQUIDITY_PROXIES_KEY)  # columns stored with the price dtype of the store
+PRICE_DTYPES: final = (np.float32, np.float64)
+DEFAULT_PRICE_DTYPE: final = np.float64
+
+
+class HistoryStore:
+    def __init__(self, store_dir: str):
+        """ Opens the store in the given directory; the columns are memory-mapped in read-only mode.
+
+        :param store_dir: directory of a store created by append_to_history_store.
+        """
+
+        self._store_dir: str = store_dir
+        self._metadata: dict = _read_metadata(store_dir)
+        self._price_unit: PriceUnit = PriceUnit[self._metadata["price_unit"]]
+        self._columns: Dict[str, np.ndarray] = {name: self._open_column(name) for name in _get_column_names(
+            self._metadata)}
+
+    def _open_column(self, name: str) -> np.ndarray:
+        shape = _get_column_shape(name=name, metadata=self._metadata)
+        dtype = _get_column_dtype(name=name, metadata=self._metadata)
+        if np.prod(shape) == 0:  # empty files cannot be memory-mapped
+            return np.empty(shape, dtype=dtype)
+
+        return np.memmap(os.path.join(self._store_dir, name + ".bin"), dtype=dtype, mode="r", shape=shape)
+
+    def n_dates(self) -> int:
+        return self._metadata["n_dates"]
+
+    def price_dtype(self) -> np.dtype:
+        """ Returns the dtype of the option prices and liquidity proxies. """
+
+        return _get_column_dtype(name=OPTION_PRICES_KEY, metadata=self._metadata)
+
+    def dates(self) -> np.ndarray:
+        """ Returns the dates of the store in ascending order, as a datetime64[D] view of the memory-mapped column. """
+
+        return self._columns[DATES_KEY].view(DATE_UNIT)
+
+    def get_option_data(self, date) -> OptionDataSet:
+        """ Returns the option data set for the given date, whose arrays are views into the memory-mapped columns.
+
+        :param date: any value that can be converted to a np.datetime64 with unit days.
+        :return:
+        """
+
+        day = np.datetime64(date, "D")
+        date_index = int(np.searchsorted(self.dates(), day))
+        if date_index == self.n_dates() or self.dates()[date_index] != day:
+            raise RuntimeError(f"date {day} not in history store {self._store_dir}.")
+
+        return self._get_option_data_for_index(date_index)
+
+    def iter_option_data(self,
+                         start_date=None,
+                         end_date=None) -> Iterator[Tuple[np.datetime64, OptionDataSet]]:
+        """ Lazily iterates over the (date, option data set) pairs with start_date <= date <= end_date.
+
+        :param start_date: optional, if None iterates from the first date.
+        :param end_date: optional, if None iterates up to and including the last date.
+        :return:
+        """
+
+        dates = self.dates()
+        start_index = 0 if start_date is None else int(np.searchsorted(dates, np.datetime64(start_date, "D"),
+                                                                       side="left"))
+        end_index = self.n_dates() if end_date is None else int(np.searchsorted(dates, np.datetime64(end_date, "D"),
+                                                                                side="right"))
+        for date_index in range(start_index, end_index):
+            yield dates[date_index], self._get_option_data_for_index(date_index)
+
+    def iter_q_procs(self,
+                     start_date=None,
+                     end_date=None) -> Iterator[Tuple[np.datetime64, OptionQuoteProcessor]]:
+        """ Lazily iterates over the (date, option quote processor) pairs with start_date <= date <= end_date, where
+            the processors are created directly from the memory-mapped columns. """
+
+        for date, option_data in self.iter_option_data(start_date=start_date, end_date=end_date):
+            q_proc = qproc.create_q_proc(forwards=option_data.forwards,
+                                         rates=option_data.rates,
+                                         option_prices=option_data.option_prices,
+                                         price_unit=option_data.price_unit,
+                                         expiries=option_data.expiries,
+                                         strikes=option_data.strikes,
+                                         liquidity_proxies=option_data.liquidity_proxies,
+                                         spot=option_data.spot)
+            yield date, q_proc
+
+    def _get_option_data_for_index(self, date_index: int) -> OptionDataSet:
+        quote_offsets = self._columns[QUOTE_OFFSETS_KEY]
+        quote_slice = slice(quote_offsets[date_index], quote_offsets[date_index + 1])
+        expiry_offsets = self._columns[EXPIRY_OFFSETS_KEY]
+        expiry_slice = slice(expiry_offsets[date_index], expiry_offsets[date_index + 1])
+
+        liquidity_proxies = None
+        if self._metadata["has_liquidity_proxies"]:
+            liquidity_proxies = self._columns[LIQUIDITY_PROXIES_KEY][quote_slice]
+
+        return OptionDataSet(spot=float(self._columns[SPOTS_KEY][date_index]),
+                             option_prices=self._columns[OPTION_PRICES_KEY][quote_slice],
+                             price_unit=self._price_unit,
+                             strikes=self._columns[STRIKES_KEY][quote_slice],
+                             expiries=self._columns[EXPIRIES_KEY][quote_slice],
+                             forwards=self._columns[FORWARDS_KEY][expiry_slice],
+                             rates=self._columns[RATES_KEY][expiry_slice],
+                             liquidity_proxies=liquidity_proxies)
+
+
+def append_to_history_store(store_dir: str,
+                            date,
+                            option_data: OptionDataSet,
+                            price_dtype: Optional[type] = None):
+    """ Appends the option data set for the given date to the store, creating the store if it does not exist yet.
+        Dates must be appended in ascending order, and all data sets of a store must have the same price unit, the same
+        price sides (mid or bid/ask), and either all or none must have liquidity proxies.
+
+        The metadata is written last, such that the store remains valid if appending is interrupted; trailing data of
+        an interrupted append is discarded by the next append.
+
+    :param store_dir:
+    :param date: any value that can be converted to a np.datetime64 with unit days.
+    :param option_data:
+    :param price_dtype: dtype of the option prices and liquidity proxies, np.float32 or np.float64; if None, float64
+        for a new store and the dtype of the store otherwise.
+    :return:
+    """
+
+    metadata_file_path = os.path.join(store_dir, METADATA_FILE_NAME)
+    if os.path.isfile(metadata_file_path):
+        metadata = _read_metadata(store_dir)
+        if price_dtype is not None and np.dtype(price_dtype) != _get_column_dtype(OPTION_PRICES_KEY, metadata):
+            raise RuntimeError(f"price dtype {np.dtype(price_dtype).name} does not match the price dtype "
+                               f"{metadata['price_dtype']} of the history store.")
+    else:
+        metadata = _create_store(store_dir=store_dir, option_data=option_data,
+                                 price_dtype=DEFAULT_PRICE_DTYPE if price_dtype is None else price_dtype)
+
+    day = np.datetime64(date, "D").astype(np.int64)
+    _check_appended_data(day=int(day), option_data=option_data, metadata=metadata)
+
+    n_quotes = option_data.strikes.size
+    n_expiries = option_data.forwards.size
+    columns = {DATES_KEY: day,
+               SPOTS_KEY: option_data.spot,
+               QUOTE_OFFSETS_KEY: metadata["n_quotes"] + n_quotes,
+               EXPIRY_OFFSETS_KEY: metadata["n_expiries"] + n_expiries,
+               EXPIRIES_KEY: option_data.expiries,
+               STRIKES_KEY: option_data.strikes,
+               OPTION_PRICES_KEY: option_data.option_prices,
+               FORWARDS_KEY: option_data.forwards,
+               RATES_KEY: option_data.rates}
+    if metadata["has_liquidity_proxies"]:
+        columns[LIQUIDITY_PROXIES_KEY] = option_data.liquidity_proxies
+
+    for name, values in columns.items():
+        column_file_path = os.path.join(store_dir, name + ".bin")
+        with open(column_file_path, "r+b") as f:
+            f.truncate(_get_column_n_bytes(name=name, metadata=metadata))  # discard an interrupted append
+            f.seek(0, os.SEEK_END)
+            f.write(np.ascontiguousarray(values, dtype=_get_column_dtype(name=name, metadata=metadata)).tobytes())
+
+    metadata["n_dates"] += 1
+    metadata["n_quotes"] += n_quotes
+    metadata["n_expiries"] += n_expiries
+    metadata["last_date"] = int(day)
+    _write_metadata(store_dir=store_dir, metadata=metadata)
+
+
+def _create_store(store_dir: str,
+                  option_data: OptionDataSet,
+                  price_dtype: type) -> dict:
+
+    if np.dtype(price_dtype) not in [np.dtype(d) for d in PRICE_DTYPES]:
+        raise RuntimeError(f"price dtype {np.dtype(price_dtype).name} is not one of "
+                           f"{[np.dtype(d).name for d in PRICE_DTYPES]}.")
+
+    metadata = {"format_version": STORE_FORMAT_VERSION,
+                "price_unit": option_data.price_unit.name,
+                "price_dtype": np.dtype(price_dtype).name,
+                "n_price_columns": 1 if option_data.option_prices.ndim == 1 else option_data.option_prices.shape[1],
+                "has_liquidity_proxies": option_data.liquidity_proxies is not None,
+                "n_dates": 0,
+                "n_quotes": 0,
+                "n_expiries": 0,
+                "last_date": None}
+
+    os.makedirs(store_dir, exist_ok=True)
+    for name in _get_column_names(metadata):
+        with open(os.path.join(store_dir, name + ".bin"), "wb") as f:
+            if name in (QUOTE_OFFSETS_KEY, EXPIRY_OFFSETS_KEY):
+                f.write(np.zeros(1, dtype=COLUMN_DTYPES[name]).tobytes())
+
+    _write_metadata(store_dir=store_dir, metadata=metadata)
+    return metadata
+
+
+def _check_appended_data(day: int,
+                         option_data: OptionDataSet,
+                         metadata: dict):
+
+    if metadata["last_date"] is not None and day <= metadata["last_date"]:
+        raise RuntimeError("dates must be appended to the history store in ascending order.")
+    elif option_data.price_unit.name != metadata["price_unit"]:
+        raise RuntimeError(f"price unit {option_data.price_unit.name} does not match the price unit "
+                           f"{metadata['price_unit']} of the history store.")
+    elif (1 if option_data.option_prices.ndim == 1 else option_data.option_prices.shape[1]) != \
+            metadata["n_price_columns"]:
+        raise RuntimeError("the price sides of the option prices do not match those of the history store.")
+    elif (option_data.liquidity_proxies is not None) != metadata["has_liquidity_proxies"]:
+        raise RuntimeError("either all or none of the data sets in a history store must have liquidity proxies.")
+    elif option_data.forwards.size != option_data.rates.size:
+        raise RuntimeError("forwards and rates must have the same size.")
+
+
+def _get_column_names(metadata: dict) -> Tuple[str, ...]:
+    if metadata["has_liquidity_proxies"]:
+        return tuple(COLUMN_DTYPES.keys())
+    else:
+        return tuple(name for name in COLUMN_DTYPES.keys() if name != LIQUIDITY_PROXIES_KEY)
+
+
+def _get_column_dtype(name: str,
+                      metadata: dict) -> np.dtype:
+
+    if name in PRICE_COLUMNS:
+        return np.dtype(metadata.get("price_dtype", np.dtype(DEFAULT_PRICE_DTYPE).name))  # missing in version 1
+    else:
+        return np.dtype(COLUMN_DTYPES[name])
+
+
+def _get_column_shape(name: str,
+                      metadata: dict) -> Tuple[int, ...]:
+
+    if name in (DATES_KEY, SPOTS_KEY):
+        return metadata["n_dates"],
+    elif name in (QUOTE_OFFSETS_KEY, EXPIRY_OFFSETS_KEY):
+        return metadata["n_dates"] + 1,
+    elif name == OPTION_PRICES_KEY and metadata["n_price_columns"] > 1:
+        return metadata["n_quotes"], metadata["n_price_columns"]
+    elif name in (FORWARDS_KEY, RATES_KEY):
+        return metadata["n_expiries"],
+    else:
+        return metadata["n_quotes"],
+
+
+def _get_column_n_bytes(name: str,
+                        metadata: dict) -> int:
+
+    return int(np.prod(_get_column_shape(name=name, metadata=metadata))) * \
+        _get_column_dtype(name=name, metadata=metadata).itemsize
+
+
+def _read_metadata(store_dir: str) -> dict:
+    with open(os.path.join(store_dir, METADATA_FILE_NAME), "r") as f:
+        metadata = json.load(f)
+
+    if metadata["format_version"] not in SUPPORTED_FORMAT_VERSIONS:
+        raise RuntimeError(f"Unsupported history store format version {metadata['format_version']}.")
+
+    return metadata
+
+
+def _write_metadata(store_dir: str,
+                    metadata: dict):
+    """ Writes the metadata to a temporary file first, such that the metadata file is replaced atomically. """
+
+    metadata_file_path = os.path.join(store_dir, METADATA_FILE_NAME)
+    tmp_file_path = metadata_file_path + ".tmp"
+    with open(tmp_file_path, "w") as f:
+        json.dump(metadata, f)
+
+    os.replace(tmp_file_path, metadata_file_path)
@@ -1,16 +1,23 @@
 """  This module contains the function allows for loading data sets using get_data_set. """
 
 import os
+import hashlib
 import numpy as np
 import pandas as pd
+from copy import copy
 from enum import Enum
-from typing import Optional, Tuple, final
+from typing import Optional, Tuple, Dict, final
 import qproc
 from qproc import PriceUnit
 
 DAX_EXPIRY_DAYS: final = [3, 28, 48, 68, 133, 198, 263, 398]
 DAX_SPOT: final = 7268.91
 
+DATA_SETS_DIR: final = os.path.join(os.path.dirname(os.path.realpath(__file__)), "data_sets")
+CACHE_DIR: final = os.path.join(DATA_SETS_DIR, "cache")
+CACHE_FORMAT_VERSION: final = 1
+CACHE_ARRAY_KEYS: final = ("option_prices", "strikes", "expiries", "forwards", "rates", "liquidity_proxies")
+
 
 class DataSetName(Enum):
     na = 0
@@ -47,13 +54,39 @@ class OptionDataSet:
         return np.unique(self.expiries)
 
 
-def get_option_data(ds_name: DataSetName) -> OptionDataSet:
+DATA_SET_FILE_NAMES: final = {
+    DataSetName.example_data_afop: ("example_data_afop.csv",),
+    DataSetName.spx500_5_feb_2018: ("spx500_5_feb_2018.csv",),
+    DataSetName.tsla_15_jun_2018: ("tsla_15_jun_2018.csv",),
+    DataSetName.dax_13_jun_2000: ("dax_vol_surface_13_jun_2000.csv", "zero_rates_euribor_13_jun_2000.csv"),
+    DataSetName.dax_13_jun_2000_3days: ("dax_vol_surface_13_jun_2000.csv", "zero_rates_euribor_13_jun_2000.csv")
+}
+
+_loaded_data_sets: Dict[DataSetName, OptionDataSet] = {}
+
+
+def get_option_data(ds_name: DataSetName,
+                    use_cache: bool = True) -> OptionDataSet:
     """ This function returns a data set of choice.
 
     :param ds_name:
+    :param use_cache: if True, the parsed data set is memoized in-process and stored in a binary cache file that is
+        keyed by the hash of the data set's source files, such that the source files are parsed only once. The arrays
+        of a cached data set are read-only, as they are shared by all callers.
     :return:
     """
 
+    if not use_cache:
+        return _load_option_data(ds_name, use_cache=False)
+
+    if ds_name not in _loaded_data_sets:
+        _loaded_data_sets[ds_name] = _get_cached_option_data(ds_name)
+
+    return copy(_loaded_data_sets[ds_name])
+
+
+def _load_option_data(ds_name: DataSetName,
+                      use_cache: bool) -> OptionDataSet:
     if ds_name is DataSetName.example_data_afop:
         return get_example_data_afop()
     elif ds_name is DataSetName.spx500_5_feb_2018:
@@ -63,7 +96,7 @@ def get_option_data(ds_name: DataSetName) -> OptionDataSet:
     elif ds_name is DataSetName.dax_13_jun_2000:
         return get_dax_ds()
     elif ds_name is DataSetName.dax_13_jun_2000_3days:
-        return get_dax_3days_ds()
+        return get_dax_3days_ds(use_cache=use_cache)
     else:
         raise RuntimeError(f"get_data_set not implemented for data_set_name {ds_name.name}.")
 
@@ -113,15 +146,15 @@ def get_tsla_ds() -> OptionDataSet:
                          name=DataSetName.tsla_15_jun_2018)
 
 
-def get_dax_3days_ds() -> OptionDataSet:
-    dax_3days_ds = get_dax_ds()
+def get_dax_3days_ds(use_cache: bool = True) -> OptionDataSet:
+    dax_3days_ds = get_option_data(DataSetName.dax_13_jun_2000, use_cache=use_cache)
     dax_3days_ds.forwards = np.array([dax_3days_ds.forwards[0]])
     dax_3days_ds.rates = np.array([dax_3days_ds.rates[0]])
 
-    init_expiry = np.min(dax_3days_ds.expiries)
-    dax_3days_ds.option_prices = dax_3days_ds.option_prices[dax_3days_ds.expiries == init_expiry]
-    dax_3days_ds.strikes = dax_3days_ds.strikes[dax_3days_ds.expiries == init_expiry]
-    dax_3days_ds.expiries = dax_3days_ds.expiries[dax_3days_ds.expiries == init_expiry]
+    init_expiry_masks = dax_3days_ds.expiries == np.min(dax_3days_ds.expiries)
+    dax_3days_ds.option_prices = dax_3days_ds.option_prices[init_expiry_masks]
+    dax_3days_ds.strikes = dax_3days_ds.strikes[init_expiry_masks]
+    dax_3days_ds.expiries = dax_3days_ds.expiries[init_expiry_masks]
     return dax_3days_ds
 
 
@@ -179,8 +212,7 @@ def _get_raw_data_set(file_name: str,
     :return: raw_data: a pd df with the raw data.
     """
 
-    dir_path = os.path.dirname(os.path.realpath(__file__))
-    file_path = os.path.join(dir_path, "data_sets", file_name)
+    file_path = os.path.join(DATA_SETS_DIR, file_name)
 
     if ".csv" in file_name:
         raw_data = pd.read_csv(file_path, index_col=index_col, parse_dates=parse_dates, infer_datetime_format=True)
@@ -188,3 +220,62 @@ def _get_raw_data_set(file_name: str,
         raise RuntimeError("Unsupported file format {:s}".format(file_name))
 
     return raw_data
+
+
+def _get_cached_option_data(ds_name: DataSetName) -> OptionDataSet:
+    """ Returns the data set from its binary cache file, and parses and caches the data set if the file is missing. """
+
+    cache_file_path = _get_cache_file_path(ds_name)
+    if os.path.isfile(cache_file_path):
+        option_data = _read_cache_file(cache_file_path)
+    else:
+        option_data = _load_option_data(ds_name, use_cache=True)
+        _write_cache_file(option_data, cache_file_path)
+
+    for key in CACHE_ARRAY_KEYS:
+        arr = getattr(option_data, key)
+        if arr is not None:
+            arr.setflags(write=False)
+
+    return option_data
+
+
+def _get_cache_file_path(ds_name: DataSetName) -> str:
+    hash_obj = hashlib.sha256(f"{ds_name.name}:{CACHE_FORMAT_VERSION}".encode())
+    for file_name in DATA_SET_FILE_NAMES[ds_name]:
+        with open(os.path.join(DATA_SETS_DIR, file_name), "rb") as f:
+            hash_obj.update(f.read())
+
+    return os.path.join(CACHE_DIR, f"{ds_name.name}_{hash_obj.hexdigest()[:16]}.npz")
+
+
+def _read_cache_file(cache_file_path: str) -> OptionDataSet:
+    with np.load(cache_file_path, allow_pickle=False) as npz_file:
+        arrays = {key: npz_file[key] for key in CACHE_ARRAY_KEYS if key in npz_file.files}
+        return OptionDataSet(spot=float(npz_file["spot"]),
+                             price_unit=PriceUnit(int(npz_file["price_unit"])),
+                             name=DataSetName(int(npz_file["name"])),
+                             **arrays)
+
+
+def _write_cache_file(option_data: OptionDataSet,
+                      cache_file_path: str):
+    """ Writes the data set to a binary cache file. The file is moved into place only once it is complete, such that
+        concurrent readers never see a partial file; failing to write the cache is not an error. """
+
+    arrays = {key: getattr(option_data, key) for key in CACHE_ARRAY_KEYS if getattr(option_data, key) is not None}
+    tmp_file_path = f"{cache_file_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(tmp_file_path, "wb") as f:
+            np.savez(f, spot=option_data.spot, price_unit=option_data.price_unit.value,
+                     name=option_data.name.value, **arrays)
+        os.replace(tmp_file_path, cache_file_path)
+    except OSError:
+        pass
+    finally:
+        if os.path.exists(tmp_file_path):  # the write or the move failed
+            try:
+                os.remove(tmp_file_path)
+            except OSError:
+                pass
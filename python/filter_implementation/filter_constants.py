@@ -10,4 +10,6 @@ CALL_ONE_ELSE_PUT_MINUS_ONE = 1
 MAXIMUM_NUMBER_OF_ATTEMPTS = 5
 MAXIMUM_PERCENTAGE_OF_QUOTES_ADJUSTED = 10.0
 DUMMY_FIELD_VALUE = -1
-PROPER_RANDOM_SEED = 2147483563
\ No newline at end of file
+PROPER_RANDOM_SEED = 2147483563
+LINEAR_BUMP_SEARCH = "linear"  # bump the first-ranked quote by one step after each failed attempt
+BISECTION_BUMP_SEARCH = "bisection"  # gallop and bisect over the bump steps; assumes monotone feasibility
@@ -0,0 +1,93 @@
+''' Goal: This module defines a MutationJournal object that records the mutations of a QuoteSlice object during the
+          forward surface filter of "Arbitrage-Based Filtering of Option Price Data", such that a failed filtering
+          attempt can be rolled back in O(number of mutations) instead of deep-copying the quote slice beforehand. '''
+
+
+ATTRIBUTE_ENTRY = 0
+QUOTE_ENTRY = 1
+REMOVAL_ENTRY = 2
+
+QUOTE_STATE_ATTRIBUTES = ('call_premium', 'implied_vol', 'adjustment_call_premium', 'adjustment_implied_vol',
+                          'is_adjusted')
+
+
+def get_quote_state(quote):
+    return tuple(getattr(quote, attribute_name) for attribute_name in QUOTE_STATE_ATTRIBUTES)
+
+
+def set_quote_state(quote, quote_state):
+    for attribute_name, value in zip(QUOTE_STATE_ATTRIBUTES, quote_state):
+        setattr(quote, attribute_name, value)
+
+
+class MutationJournal:
+    def __init__(self):
+        """ Each entry is a tuple (entry_type, target, key, value) holding the information needed to undo a single
+            mutation; the entries are stored in the order in which the mutations took place. """
+
+        self.entries = []
+
+
+    def checkpoint(self):
+        return len(self.entries)
+
+
+    def record_attribute(self, obj, attribute_name):
+        self.entries.append((ATTRIBUTE_ENTRY, obj, attribute_name, obj.__dict__[attribute_name]))
+
+
+    def record_quote(self, quote):
+        self.entries.append((QUOTE_ENTRY, quote, None, get_quote_state(quote)))
+
+
+    def record_removal(self, quote_list, index, quote):
+        self.entries.append((REMOVAL_ENTRY, quote_list, index, quote))
+
+
+    def swap(self, entry):
+        """ Restores the value stored in an attribute or quote entry, and returns the entry that restores the value
+            that was overwritten. """
+
+        entry_type, target, key, value = entry
+
+        if entry_type == ATTRIBUTE_ENTRY:
+            current_value = target.__dict__[key]
+            object.__setattr__(target, key, value)  # bypass the journaling in QuoteSlice.__setattr__
+            return entry_type, target, key, current_value
+        else:
+            current_quote_state = get_quote_state(target)
+            set_quote_state(target, value)
+            return entry_type, target, key, current_quote_state
+
+
+    def rollback(self, checkpoint = 0):
+        """ Undoes all mutations recorded after the checkpoint, and returns the entries that redo these mutations
+            when passed to replay. """
+
+        redo_entries = []
+
+        while len(self.entries) > checkpoint:
+            entry = self.entries.pop()
+            entry_type, target, key, value = entry
+
+            if entry_type == REMOVAL_ENTRY:
+                target.insert(key, value)
+                redo_entries.append(entry)
+            else:
+                redo_entries.append(self.swap(entry))
+
+        redo_entries.reverse()
+        return redo_entries
+
+
+    def replay(self, redo_entries):
+        """ Re-applies mutations that were undone by rollback; the replayed mutations are recorded again. """
+
+        for entry in redo_entries:
+            entry_type, target, key, value = entry
+
+            if entry_type == REMOVAL_ENTRY:
+                del target[key]
+                self.entries.append(entry)
+            else:
+                self.entries.append(self.swap(entry))
@@ -18,6 +18,7 @@ from .sorting_algorithms import index, find_lt, find_gt
 
 class QuoteSlice:
     def __init__(self, discount_factor, forward, expiry, quote_list):
+        self.journal = None  # MutationJournal that records the mutations of this slice, if set
         self.discount_factor = discount_factor
         self.forward = forward
         self.expiry = expiry
@@ -31,6 +32,16 @@ class QuoteSlice:
         self.is_filtered = False
 
 
+    def __setattr__(self, name, value):
+        """ Records the previous value of the attribute in the journal, if a journal is set. """
+
+        journal = self.__dict__.get('journal')
+        if journal is not None and name != 'journal' and name in self.__dict__:
+            journal.record_attribute(self, name)
+
+        object.__setattr__(self, name, value)
+
+
     def compute_quote0(self):
         strike0 = 0.0
         dummy_implied_vol0 = DUMMY_FIELD_VALUE
@@ -123,7 +134,18 @@ class QuoteSlice:
 
 
     def remove_quote_from_sorted_quote_list(self, quote):
-        self.sorted_quote_list.remove(quote)
+        index_in_list = self.sorted_quote_list.index(quote)
+        if self.journal is not None:
+            self.journal.record_removal(self.sorted_quote_list, index_in_list, quote)
+
+        del self.sorted_quote_list[index_in_list]
+
+
+    def set_call_premium(self, quote, new_premium):
+        if self.journal is not None:
+            self.journal.record_quote(quote)
+
+        quote.adjust(new_premium, self.forward, self.discount_factor)
 
 
     def initial_fill_arbitrage_consistent_set(self):
@@ -141,10 +163,10 @@ class QuoteSlice:
     def adjust_quote(self, quote, lower_bound, upper_bound):
         if quote.call_premium < lower_bound:
             new_premium = lower_bound + ALPHA * (upper_bound - lower_bound)
-            quote.adjust(new_premium, self.forward, self.discount_factor)
+            self.set_call_premium(quote, new_premium)
         elif quote.call_premium > upper_bound:
             new_premium = lower_bound + (1.0 - ALPHA) * (upper_bound - lower_bound)
-            quote.adjust(new_premium, self.forward, self.discount_factor)
+            self.set_call_premium(quote, new_premium)
 
 
     def fill_arbitrage_consistent_set_with_adjusted_quotes(self):
@@ -297,7 +319,7 @@ class QuoteSlice:
     def set_quotes_to_maximum_theoretical_value(self):
         maximum_call_price = self.compute_theoretical_maximum_price()
         for quote in self.sorted_quote_list:
-            quote.adjust(maximum_call_price, self.forward, self.discount_factor)
+            self.set_call_premium(quote, maximum_call_price)
 
 
     def final_safeguard_attempt_surface(self):
@@ -8,12 +8,12 @@ import bisect
 import numpy as np
 import matplotlib.pyplot as plt
 from math import inf
-from copy import deepcopy
 from numpy.random import shuffle
 
+from .mutation_journal import MutationJournal
 from .filter_exceptions import LowerBoundMoneynessTooHighException, PreviousPremiumTooHighException
 from .filter_constants import MAXIMUM_NUMBER_OF_ATTEMPTS, MAXIMUM_NUMBER_OF_FAILED_ATTEMPTS, PROPER_RANDOM_SEED, \
-    MAXIMUM_PERCENTAGE_OF_QUOTES_ADJUSTED
+    MAXIMUM_PERCENTAGE_OF_QUOTES_ADJUSTED, LINEAR_BUMP_SEARCH, BISECTION_BUMP_SEARCH
 
 
 class QuoteSurface:
@@ -115,13 +115,78 @@ class QuoteSurface:
     def bump_first_ranked_call_price(self, quote_slice, bump_size):
         first_ranked_quote = quote_slice.get_first_ranked_quote()
         new_call_premium = first_ranked_quote.call_premium + bump_size
-        first_ranked_quote.adjust(new_call_premium, quote_slice.forward, quote_slice.discount_factor)
+        quote_slice.set_call_premium(first_ranked_quote, new_call_premium)
 
 
-    def compute_scaled_distance_first_ranked_to_max_call_price(self, quote_slice):
+    def compute_scaled_distance_first_ranked_to_max_call_price(self, quote_slice,
+                                                               maximum_number_of_failed_attempts =
+                                                               MAXIMUM_NUMBER_OF_FAILED_ATTEMPTS):
         max_call_premium = quote_slice.compute_theoretical_maximum_price()
         first_ranked_quote = quote_slice.get_first_ranked_quote()
-        return (max_call_premium - first_ranked_quote.call_premium) / MAXIMUM_NUMBER_OF_FAILED_ATTEMPTS
+        return (max_call_premium - first_ranked_quote.call_premium) / maximum_number_of_failed_attempts
+
+
+    def attempt_forward_surface_filter_with_bump(self, quote_slice, bump_step, number_of_steps):
+        """ Attempts the forward surface filter after bumping the first-ranked call price by number_of_steps times
+            bump_step, and rolls the quote slice back afterwards. The steps are added one by one, as in the linear
+            search, such that both searches give the same call price for the same number of steps. Returns the entries
+            that redo a successful attempt, or None if the attempt failed.
+
+            Remark: bump_step is the distance from the first-ranked call price to the maximum call price divided by
+            maximum_number_of_failed_attempts (see compute_scaled_distance_first_ranked_to_max_call_price), such that
+            maximum_number_of_failed_attempts sets the step size of both searches, and not only their budget of
+            attempts: the bisection search needs fewer attempts, but searches the same steps as the linear search. """
+
+        journal = quote_slice.journal
+        checkpoint = journal.checkpoint()
+
+        for step in range(number_of_steps):
+            self.bump_first_ranked_call_price(quote_slice, bump_step)
+
+        try:
+            self.attempt_forward_surface_filter_of_quote_slice(quote_slice)
+        except (LowerBoundMoneynessTooHighException, PreviousPremiumTooHighException):
+            journal.rollback(checkpoint)
+            return None
+
+        return journal.rollback(checkpoint)
+
+
+    def bisection_forward_surface_filter(self, quote_slice, bump_step, maximum_number_of_bump_steps):
+        """ Searches the smallest feasible bump k*bump_step, k = 0, ..., maximum_number_of_bump_steps, of the
+            first-ranked call price by galloping (k = 1, 2, 4, ...) followed by bisection, which requires
+            O(log(maximum_number_of_bump_steps)) attempts given that feasibility is monotone in the bump. If it is not
+            (which may occur for noisy data), the bump found is feasible but not necessarily the smallest one. Returns
+            True and leaves the quote slice filtered if a feasible bump was found; otherwise returns False and leaves
+            the quote slice unchanged. """
+
+        best_redo_entries = self.attempt_forward_surface_filter_with_bump(quote_slice, bump_step, 0)
+        highest_infeasible_steps = 0
+        lowest_feasible_steps = 0
+
+        number_of_steps = 1
+        while best_redo_entries is None and highest_infeasible_steps < maximum_number_of_bump_steps:
+            best_redo_entries = self.attempt_forward_surface_filter_with_bump(quote_slice, bump_step, number_of_steps)
+            if best_redo_entries is None:
+                highest_infeasible_steps = number_of_steps
+                number_of_steps = min(2 * number_of_steps, maximum_number_of_bump_steps)
+            else:
+                lowest_feasible_steps = number_of_steps
+
+        if best_redo_entries is None:
+            return False
+
+        while lowest_feasible_steps - highest_infeasible_steps > 1:
+            number_of_steps = (highest_infeasible_steps + lowest_feasible_steps) // 2
+            redo_entries = self.attempt_forward_surface_filter_with_bump(quote_slice, bump_step, number_of_steps)
+            if redo_entries is None:
+                highest_infeasible_steps = number_of_steps
+            else:
+                lowest_feasible_steps = number_of_steps
+                best_redo_entries = redo_entries
+
+        quote_slice.journal.replay(best_redo_entries)
+        return True
 
 
     def truncate_first_ranked_quote_forward_filtering(self, quote_slice):
@@ -137,69 +202,112 @@ class QuoteSurface:
         quote_slice.adjust_quote(first_ranked_quote, lower_bound, theoretical_upper_bound)
 
 
-    def forward_surface_filter_for_index(self, index):
+    def forward_surface_filter_for_index(self, index, bump_search = LINEAR_BUMP_SEARCH,
+                                         maximum_number_of_failed_attempts = MAXIMUM_NUMBER_OF_FAILED_ATTEMPTS):
+        """ Failed attempts are undone by rolling back the journal of the quote slice rather than by restoring a deep
+            copy, such that the costs of a failed attempt are proportional to the number of mutations it made.
+
+            Inputs: bump_search: LINEAR_BUMP_SEARCH bumps the first-ranked call price by one step after each failed
+                        attempt; BISECTION_BUMP_SEARCH finds the smallest feasible number of steps in logarithmically
+                        many attempts.
+                    maximum_number_of_failed_attempts: the number of steps between the first-ranked call price and the
+                        maximum call price, which sets the step size of both searches; the final step is replaced by
+                        the safeguard. For the linear search, it is also the number of attempts. """
+
         quote_slice = self.sorted_quote_slices[index]
-        original_quote_slice = deepcopy(quote_slice)
+        is_journal_owner = quote_slice.journal is None
+        if is_journal_owner:
+            quote_slice.journal = MutationJournal()
+
+        journal = quote_slice.journal
+        original_checkpoint = journal.checkpoint()
 
         self.truncate_first_ranked_quote_forward_filtering(quote_slice)
         scaled_distance_first_ranked_to_max_call_price = self.compute_scaled_distance_first_ranked_to_max_call_price(
-            quote_slice)
+            quote_slice, maximum_number_of_failed_attempts)
 
         filtering_procedure_failed = False
 
-        for number_of_failed_filtering_attempts in range(0, MAXIMUM_NUMBER_OF_FAILED_ATTEMPTS):
-            quote_slice_copy = deepcopy(quote_slice)
-            try:
-                self.attempt_forward_surface_filter_of_quote_slice(quote_slice)
-                break
-            except (LowerBoundMoneynessTooHighException, PreviousPremiumTooHighException):
-                quote_slice = quote_slice_copy
-                next_attempt_is_final_attempt = number_of_failed_filtering_attempts == \
-                                                (MAXIMUM_NUMBER_OF_FAILED_ATTEMPTS - 1)
-
-                if next_attempt_is_final_attempt:
-                    quote_slice.final_safeguard_attempt_surface()
-                    filtering_procedure_failed = self.previous_premium_exceeds_upper_bound(quote_slice)
-                else:
-                    self.bump_first_ranked_call_price(quote_slice, scaled_distance_first_ranked_to_max_call_price)
+        if bump_search == LINEAR_BUMP_SEARCH:
+            for number_of_failed_filtering_attempts in range(0, maximum_number_of_failed_attempts):
+                attempt_checkpoint = journal.checkpoint()
+                try:
+                    self.attempt_forward_surface_filter_of_quote_slice(quote_slice)
+                    break
+                except (LowerBoundMoneynessTooHighException, PreviousPremiumTooHighException):
+                    journal.rollback(attempt_checkpoint)
+                    next_attempt_is_final_attempt = number_of_failed_filtering_attempts == \
+                                                    (maximum_number_of_failed_attempts - 1)
+
+                    if next_attempt_is_final_attempt:
+                        quote_slice.final_safeguard_attempt_surface()
+                        filtering_procedure_failed = self.previous_premium_exceeds_upper_bound(quote_slice)
+                    else:
+                        self.bump_first_ranked_call_price(quote_slice, scaled_distance_first_ranked_to_max_call_price)
+        elif bump_search == BISECTION_BUMP_SEARCH:
+            is_feasible_bump_found = self.bisection_forward_surface_filter(
+                quote_slice, scaled_distance_first_ranked_to_max_call_price, maximum_number_of_failed_attempts - 1)
+
+            if not is_feasible_bump_found:
+                quote_slice.final_safeguard_attempt_surface()
+                filtering_procedure_failed = self.previous_premium_exceeds_upper_bound(quote_slice)
+        else:
+            raise RuntimeError("Unsupported bump search {:s}".format(bump_search))
 
         if filtering_procedure_failed:
-            quote_slice = original_quote_slice
+            journal.rollback(original_checkpoint)
             quote_slice.filter_in_strike_dimension_with_safeguard()
 
-        self.sorted_quote_slices[index] = quote_slice  # to deal with by object reference
         quote_slice.is_filtered = True
 
+        if is_journal_owner:
+            quote_slice.journal = None
+
 
-    def forward_surface_filter_for_index_with_safeguard(self, index):
+    def forward_surface_filter_for_index_with_safeguard(self, index, bump_search = LINEAR_BUMP_SEARCH,
+                                                        maximum_number_of_failed_attempts =
+                                                        MAXIMUM_NUMBER_OF_FAILED_ATTEMPTS):
         np.random.seed(PROPER_RANDOM_SEED)
         percentage_quotes_adjusted = inf
         adjustments_are_acceptable = False
-        master_quote_slice = deepcopy(self.sorted_quote_slices[index])
+
+        quote_slice = self.sorted_quote_slices[index]
+        quote_slice.journal = MutationJournal()  # checkpoint 0 corresponds to the master quote slice
+        best_attempt_redo_entries = None  # None as long as the current state of the quote slice is the best attempt
 
         for number_of_attempts in range(1, MAXIMUM_NUMBER_OF_ATTEMPTS + 1):
-            self.forward_surface_filter_for_index(index)
-            new_percentage_quotes_adjusted = self.sorted_quote_slices[index].compute_percentage_of_quotes_adjusted()
+            self.forward_surface_filter_for_index(index, bump_search, maximum_number_of_failed_attempts)
+            new_percentage_quotes_adjusted = quote_slice.compute_percentage_of_quotes_adjusted()
 
             if new_percentage_quotes_adjusted < percentage_quotes_adjusted:
                 percentage_quotes_adjusted = new_percentage_quotes_adjusted
-                best_quote_slice = self.sorted_quote_slices[index]
+                best_attempt_redo_entries = None
                 adjustments_are_acceptable = percentage_quotes_adjusted <= MAXIMUM_PERCENTAGE_OF_QUOTES_ADJUSTED
 
             if adjustments_are_acceptable:
                 break
             elif number_of_attempts < MAXIMUM_NUMBER_OF_ATTEMPTS:  # loop not finished
-                self.sorted_quote_slices[index] = deepcopy(master_quote_slice)
-                shuffle(self.sorted_quote_slices[index].sorted_quote_list)
+                redo_entries = quote_slice.journal.rollback()
+                if best_attempt_redo_entries is None:
+                    best_attempt_redo_entries = redo_entries
+
+                shuffled_quote_list = quote_slice.sorted_quote_list[:]
+                shuffle(shuffled_quote_list)
+                quote_slice.sorted_quote_list = shuffled_quote_list
+
+        if best_attempt_redo_entries is not None:
+            quote_slice.journal.rollback()
+            quote_slice.journal.replay(best_attempt_redo_entries)
 
-        self.sorted_quote_slices[index] = best_quote_slice
+        quote_slice.journal = None
 
 
     def is_valid_expiry_index(self, index):
         return 0 <= index <= self.number_of_slices - 1
 
 
-    def filter_surface_forward(self, use_safeguard = True):
+    def filter_surface_forward(self, use_safeguard = True, bump_search = LINEAR_BUMP_SEARCH,
+                               maximum_number_of_failed_attempts = MAXIMUM_NUMBER_OF_FAILED_ATTEMPTS):
         self.sorted_quote_slices[0].filter_in_strike_dimension_with_safeguard()
         self.filtered_slices_indices.append(0)
 
@@ -208,7 +316,7 @@ class QuoteSurface:
 
         if self.is_valid_expiry_index(1):  # perform the following only if there is more than one expiry
             for index in range(1, self.number_of_slices):
-                filter_function(index)
+                filter_function(index, bump_search, maximum_number_of_failed_attempts)
                 self.filtered_slices_indices.append(index)
 
         self.is_filtered = True
@@ -1,6 +1,9 @@
 """ This module serves as the interface of the qproc package. """
 
 from .globals import *
-from .factory import create_q_proc, create_rate_curve, create_forward_curve
+from .factory import create_q_proc, create_rate_curve, create_forward_curve, create_filter_cache
+from .grouped_filtering import filter_grouped_quotes
 from .plotting import plot_quotes
 from .printing import print_filter_errors
+from .kernels import set_kernel_cache_dir, warm_up_kernels, compile_aot_kernels
+from .service_client import ServiceClient
@@ -9,6 +9,7 @@ from .internal.quote_surface_construction import get_quote_surface
 from .internal.curve_construction import InternalRateCurve, InternalForwardCurve
 from .internal.liquidity_proxy_computation import compute_moneyness_based_liquidity_proxies
 from .internal.quote_transformation import transform_strike
+from .internal.filter_cache import InternalFilterCache
 
 
 def create_q_proc(forwards: Union[np.ndarray, ForwardCurve],
@@ -19,14 +20,15 @@ def create_q_proc(forwards: Union[np.ndarray, ForwardCurve],
                   strikes: np.ndarray,
                   strike_unit: StrikeUnit = StrikeUnit.strike,
                   liquidity_proxies: Optional[np.ndarray] = None,
-                  spot: float = np.nan) -> OptionQuoteProcessor:
+                  spot: float = np.nan,
+                  check_args: bool = True) -> OptionQuoteProcessor:
     """ Creates an instance of OptionQuoteProcessor.
 
-    :param forwards: (n_expiries,) array with forwards for every expiry date, or a forward curve object.
-    :param rates: (n_expiries,) array with zero rates (= continuously-compounded yields) for every expiry date, or a
-        rate curve object.
-    :param option_prices: (n,2) array with bid and ask prices or an (n,) array with mid prices. The option prices must
-        be in ascending order w.r.t. to their expiry.
+    :param forwards: (n_expiries,) array with forwards for every expiry date in ascending order, or a forward curve
+        object.
+    :param rates: (n_expiries,) array with zero rates (= continuously-compounded yields) for every expiry date in
+        ascending order, or a rate curve object.
+    :param option_prices: (n,2) array with bid and ask prices or an (n,) array with mid prices, in any order.
     :param price_unit: unit in which the option prices are expressed.
     :param expiries: (n,) array with expiries for each option corresponding to the option prices.
     :param strikes: (n,) array with strikes corresponding to the option prices.
@@ -34,17 +36,20 @@ def create_q_proc(forwards: Union[np.ndarray, ForwardCurve],
     :param liquidity_proxies: (n,) array with liquidity proxies (e.g., trading volume), used by the arbitrage filter.
         By default, -|(K - F)/F| is used, with strike K and forward F.
     :param spot: the spot price; only needed if forwards is not a curve object.
+    :param check_args: whether to check the input arguments, which raises a RuntimeError listing the offending rows for
+        invalid input; may be disabled for trusted input.
     :return:
     """
 
-    check_create_q_proc_args(forwards=forwards,
-                             rates=rates,
-                             option_prices=option_prices,
-                             price_unit=price_unit,
-                             expiries=expiries,
-                             strikes=strikes,
-                             strike_unit=strike_unit,
-                             liquidity_proxies=liquidity_proxies)
+    if check_args:
+        check_create_q_proc_args(forwards=forwards,
+                                 rates=rates,
+                                 option_prices=option_prices,
+                                 price_unit=price_unit,
+                                 expiries=expiries,
+                                 strikes=strikes,
+                                 strike_unit=strike_unit,
+                                 liquidity_proxies=liquidity_proxies)
 
     if isinstance(forwards, np.ndarray) or isinstance(rates, np.ndarray):
         unique_expiries = np.sort(np.unique(expiries))
@@ -96,3 +101,16 @@ def create_rate_curve(times: np.ndarray,
     """
 
     return InternalRateCurve(times=times, zero_rates=zero_rates)
+
+
+def create_filter_cache(cache_dir: str = DEFAULT_FILTER_CACHE_DIR,
+                        max_size: int = DEFAULT_FILTER_CACHE_SIZE) -> FilterCache:
+    """ Returns a cache of filter results in the given directory, to be passed to OptionQuoteProcessor.filter. Results
+        are reused across processes and runs that share the directory.
+
+    :param cache_dir: optional, by default a directory in the cache of the user, which is private to the user.
+    :param max_size: maximal size of the cached results in bytes.
+    :return:
+    """
+
+    return InternalFilterCache(cache_dir=cache_dir, max_size=max_size)
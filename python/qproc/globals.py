@@ -1,10 +1,13 @@
 """ This module collects all exposed types from the qproc package. """
 
-import pandas as pd
+import os
+import numpy as np
 from enum import Enum
 from abc import ABC, abstractmethod
-from typing import final, Optional, Tuple
-from computils import ScalarOrArray
+from typing import final, Dict, Optional, Tuple, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:  # pandas is imported on first use only, as it is expensive to import
+    import pandas as pd
 
 CALENDAR_DAYS_YEAR: final = 365
 EXPIRY_KEY: final = 'expiry'
@@ -16,6 +19,11 @@ LIQ_KEY: final = 'liq'
 
 DEFAULT_SMOOTHING_PARAM: final = 0.0
 DEFAULT_SMOOTHING_PARAM_GRID: final = (0.1, 0.2, 0.3, 0.4, 0.5)
+DEFAULT_FILTER_CACHE_SIZE: final = 2 ** 30  # bytes
+DEFAULT_FILTER_CACHE_DIR: final = os.path.join(os.path.expanduser("~"), ".cache", "qproc", "filter_cache")
+
+Scalar: final = Union[int, float, np.integer, np.floating]
+ScalarOrArray: final = Union[Scalar, np.ndarray]  # equivalent to computils.ScalarOrArray for real numbers
 
 
 class SurfacePlotType(Enum):
@@ -81,8 +89,72 @@ class ForwardCurve(ABC):
         """ Returns the spot price."""
 
 
+class BoundQuery(ABC):
+    """ Read-only snapshot of the bounds implied by filtered quotes, which may be queried concurrently from multiple
+        threads; the bounds are evaluated in compiled code that releases the GIL. """
+
+    @abstractmethod
+    def expiries(self) -> np.ndarray:
+        """ Returns the quote expiries, in ascending order; bounds can be computed for other expiries too. """
+
+    @abstractmethod
+    def compute_lower_bound(self,
+                            expiry: float,
+                            strike: ScalarOrArray,
+                            strike_unit: StrikeUnit,
+                            price_unit: PriceUnit) -> ScalarOrArray:
+        """ Computes the lower bound for given expiry and strike implied by the quotes, as
+            OptionQuoteProcessor.compute_lower_bound does.
+
+        :param expiry:
+        :param strike:
+        :param strike_unit:
+        :param price_unit:
+        :return:
+        """
+
+    @abstractmethod
+    def compute_upper_bound(self,
+                            expiry: float,
+                            strike: ScalarOrArray,
+                            strike_unit: StrikeUnit,
+                            price_unit: PriceUnit) -> ScalarOrArray:
+        """ Computes the upper bound for given expiry and strike implied by the quotes, as
+            OptionQuoteProcessor.compute_upper_bound does.
+
+        :param expiry:
+        :param strike:
+        :param strike_unit:
+        :param price_unit:
+        :return:
+        """
+
+
+class FilterCache(ABC):
+    """ Cache of filter results on local disk, keyed by the quotes, the forwards and discount factors for their
+        expiries, and the filter parameters. The least recently used results are evicted when the cache exceeds its
+        size. """
+
+    @abstractmethod
+    def size(self) -> int:
+        """ Returns the size of the cached results in bytes. """
+
+    @abstractmethod
+    def clear(self):
+        """ Removes all cached results. """
+
+
 class OptionQuoteProcessor(ABC):
 
+    @abstractmethod
+    def get_forward(self, expiry: float) -> float:
+        """ Returns the forward for the given expiry, which is taken from the curves for expiries without quotes. """
+
+    @abstractmethod
+    def get_discount_factor(self, expiry: float) -> float:
+        """ Returns the discount factor for the given expiry, which is taken from the curves for expiries without
+            quotes. """
+
     @abstractmethod
     def transform_strike(self,
                          expiry: float,
@@ -121,26 +193,46 @@ class OptionQuoteProcessor(ABC):
     def filter(self,
                filter_type: FilterType,
                smoothing_param: Optional[float] = DEFAULT_SMOOTHING_PARAM,
-               param_grid: Tuple[float] = DEFAULT_SMOOTHING_PARAM_GRID):
+               param_grid: Tuple[float] = DEFAULT_SMOOTHING_PARAM_GRID,
+               cache: Optional[FilterCache] = None):
         """ Filters the quotes based on the chosen filtering type.
 
         :param filter_type:
         :param smoothing_param:
         :param param_grid: smoothing parameters to optimize over.
+        :param cache: if given, the filtered quotes are taken from the cache when the same quotes have been filtered
+            with the same parameters before, and stored in the cache otherwise.
         :return:
         """
 
+    @abstractmethod
+    def is_filtered(self) -> bool:
+        """ Returns whether the quotes have been filtered. """
+
     @abstractmethod
     def get_quotes(self,
                    strike_unit: StrikeUnit,
-                   price_unit: PriceUnit) -> pd.DataFrame:
+                   price_unit: PriceUnit) -> "pd.DataFrame":
         """ Returns the quotes sorted in ascending order by expiry (first) and strike (second).
 
         :param strike_unit:
         :param price_unit:
         :return:
         """
-        
+
+    @abstractmethod
+    def get_quote_arrays(self,
+                         strike_unit: StrikeUnit,
+                         price_unit: PriceUnit) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """ Returns the quotes of get_quotes as arrays, without creating a data frame. The quotes of the i-th expiry are
+            those from offsets[i] up to offsets[i + 1].
+
+        :param strike_unit:
+        :param price_unit:
+        :return: the expiries with quotes in ascending order, the (n_expiries + 1,) offsets of the expiries in the
+            quotes, and the (n,) arrays of the quotes with the keys STRIKE_KEY, MID_KEY, BID_KEY, ASK_KEY and LIQ_KEY.
+        """
+
     @abstractmethod
     def compute_lower_bound(self,
                             expiry: float,
@@ -148,7 +240,8 @@ class OptionQuoteProcessor(ABC):
                             strike_unit: StrikeUnit,
                             price_unit: PriceUnit) -> ScalarOrArray:
         """ Computes the lower bound for given expiry and strike implied by the quotes. The bounds are expressed in the
-            chosen price unit. 
+            chosen price unit. For an expiry between quote expiries, the bound is implied by the quotes of the
+            neighbouring expiries, as normalized call prices in forward moneyness are non-decreasing in the expiry.
             
             Remark: this function can be used only after a call to 'filter' (i.e., once the quotes have been filtered). 
         
@@ -166,7 +259,8 @@ class OptionQuoteProcessor(ABC):
                             strike_unit: StrikeUnit,
                             price_unit: PriceUnit) -> ScalarOrArray:
         """ Computes the upper bound for given expiry and strike implied by the quotes. The bounds are expressed in the
-            chosen price unit. 
+            chosen price unit. For an expiry between quote expiries, the bound is implied by the quotes of the
+            neighbouring expiries, as normalized call prices in forward moneyness are non-decreasing in the expiry.
 
             Remark: this function can be used only after a call to 'filter' (i.e., once the quotes have been filtered). 
 
@@ -176,3 +270,32 @@ class OptionQuoteProcessor(ABC):
         :param price_unit: 
         :return: 
         """
+
+    @abstractmethod
+    def compute_bounds(self,
+                       expiries: np.ndarray,
+                       strikes: np.ndarray,
+                       strike_unit: StrikeUnit,
+                       price_unit: PriceUnit) -> Tuple[np.ndarray, np.ndarray]:
+        """ Computes the lower and upper bounds implied by the quotes for every combination of the given expiries and
+            strikes, which are the same as those of compute_lower_bound and compute_upper_bound. The bounds are
+            expressed in the chosen price unit.
+
+            Remark: this function can be used only after a call to 'filter' (i.e., once the quotes have been filtered).
+
+        :param expiries: (n_expiries,) array of expiries.
+        :param strikes: (n_strikes,) array of strikes.
+        :param strike_unit:
+        :param price_unit:
+        :return: lower and upper bounds, as (n_expiries, n_strikes) arrays.
+        """
+
+    @abstractmethod
+    def get_bound_query(self) -> BoundQuery:
+        """ Returns a read-only snapshot of the bounds implied by the filtered quotes, which is not affected by later
+            calls to 'filter' and may be queried concurrently from multiple threads.
+
+            Remark: this function can be used only after a call to 'filter' (i.e., once the quotes have been filtered).
+
+        :return:
+        """
@@ -0,0 +1,190 @@
+""" This module allows for filtering the quotes of many underlyings at once, e.g., a universe of single stocks. All
+    quotes are passed as a single table, and the slices of all underlyings are filtered in parallel by one compiled
+    kernel, without creating an OptionQuoteProcessor per underlying. """
+
+import numpy as np
+from typing import Tuple
+from .globals import *
+from .internal.input_checking import check_filter_grouped_quotes_args
+from .internal.quote_transformation import transform_strike
+from .internal.zero_strike_computation import compute_zero_strike_call_value
+
+GROUPED_PRICE_UNITS: final = (PriceUnit.call, PriceUnit.undiscounted_call, PriceUnit.normalized_call)
+
+
+def filter_grouped_quotes(underlying_ids: np.ndarray,
+                          expiries: np.ndarray,
+                          strikes: np.ndarray,
+                          option_prices: np.ndarray,
+                          price_unit: PriceUnit,
+                          curve_underlying_ids: np.ndarray,
+                          curve_expiries: np.ndarray,
+                          forwards: np.ndarray,
+                          rates: np.ndarray,
+                          filter_type: FilterType,
+                          strike_unit: StrikeUnit = StrikeUnit.strike,
+                          liquidity_proxies: Optional[np.ndarray] = None,
+                          smoothing_param: Optional[float] = DEFAULT_SMOOTHING_PARAM) -> Tuple[np.ndarray, np.ndarray]:
+    """ Filters the quotes of every underlying as OptionQuoteProcessor.filter does, in parallel over the slices of all
+        underlyings (or over the underlyings for the expiry_forward filter, which bounds a slice by the earlier slices).
+
+    :param underlying_ids: (n,) array with the underlying of every quote, of any type that can be sorted (e.g., integer
+        ids or tickers).
+    :param expiries: (n,) array with expiries for each option corresponding to the option prices.
+    :param strikes: (n,) array with strikes corresponding to the option prices.
+    :param option_prices: (n,2) array with bid and ask prices or an (n,) array with mid prices, in any order.
+    :param price_unit: one of the call price units; implied volatilities are not supported.
+    :param curve_underlying_ids: (m,) array with the underlying of every forward and rate.
+    :param curve_expiries: (m,) array with the expiry of every forward and rate, which must cover every pair of
+        underlying and expiry of the quotes.
+    :param forwards: (m,) array with forwards.
+    :param rates: (m,) array with zero rates (= continuously-compounded yields).
+    :param filter_type:
+    :param strike_unit:
+    :param liquidity_proxies: (n,) array with liquidity proxies, which default to the proxies of create_q_proc.
+    :param smoothing_param:
+    :return: (n,) keep-mask, and the filtered prices with the shape of option_prices, which equal the input prices
+        for kept quotes, the adjusted mid prices for adjusted quotes (nan if smoothing_param is None), and nan for
+        removed quotes.
+    """
+
+    from .internal.grouped_filter_kernels import filter_slices  # imported on first use, as it loads numba
+
+    check_filter_grouped_quotes_args(underlying_ids=underlying_ids, expiries=expiries, strikes=strikes,
+                                     option_prices=option_prices, price_unit=price_unit,
+                                     curve_underlying_ids=curve_underlying_ids, curve_expiries=curve_expiries,
+                                     forwards=forwards, rates=rates, strike_unit=strike_unit,
+                                     liquidity_proxies=liquidity_proxies)
+    if price_unit not in GROUPED_PRICE_UNITS:
+        raise RuntimeError(f"price_unit must be one of {', '.join(u.name for u in GROUPED_PRICE_UNITS)}, not "
+                           f"{price_unit.name}.")
+
+    expiries = np.asarray(expiries, dtype=float)
+    strikes = np.asarray(strikes, dtype=float)
+    option_prices = np.asarray(option_prices, dtype=float)
+    sided_prices = option_prices.reshape((expiries.size, -1))
+
+    curve_expiries = np.asarray(curve_expiries, dtype=float)
+    row_slices, slice_underlying_ids, row_curves = _get_slices(underlying_ids=np.asarray(underlying_ids),
+                                                               expiries=expiries,
+                                                               curve_underlying_ids=np.asarray(curve_underlying_ids),
+                                                               curve_expiries=curve_expiries)
+    row_forwards = np.asarray(forwards, dtype=float)[row_curves]
+    row_discount_factors = np.exp(-(np.asarray(rates, dtype=float) * curve_expiries))[row_curves]
+    zero_strike_calls = compute_zero_strike_call_value(discount_factor=row_discount_factors, forward=row_forwards)
+
+    if liquidity_proxies is None:
+        actual_strikes = transform_strike(strike=strikes, input_strike_unit=strike_unit,
+                                          output_strike_unit=StrikeUnit.strike, forward=row_forwards)
+        liquidity_proxies = 1.0 / (1.0 + np.abs(actual_strikes - row_forwards))
+    liquidity_proxies = np.asarray(liquidity_proxies, dtype=float)
+
+    moneyness = transform_strike(strike=strikes, input_strike_unit=strike_unit, output_strike_unit=StrikeUnit.moneyness,
+                                 forward=row_forwards)
+    normalized_prices = _normalize_prices(sided_prices, price_unit=price_unit,
+                                          discount_factors=row_discount_factors[:, np.newaxis],
+                                          zero_strike_calls=zero_strike_calls[:, np.newaxis])
+    bids, asks = normalized_prices[:, 0], normalized_prices[:, -1]
+    mids = np.where(bids == asks, bids, (bids + asks) / 2.0)
+
+    # the quotes of a slice are processed by descending liquidity, with ties in the order of StrikeFilter
+    order = np.lexsort((np.arange(expiries.size)[::-1], strikes, -liquidity_proxies, row_slices))
+    n_slices = slice_underlying_ids.size
+    slice_starts = np.concatenate(([0], np.cumsum(np.bincount(row_slices, minlength=n_slices))))
+    if filter_type is FilterType.expiry_forward:
+        task_starts = np.concatenate(([0], np.flatnonzero(slice_underlying_ids[1:] != slice_underlying_ids[:-1]) + 1,
+                                      [n_slices]))
+    else:
+        task_starts = np.arange(n_slices + 1)
+
+    sorted_keep_mask = np.zeros(expiries.size, dtype=bool)
+    sorted_adjust_mask = np.zeros(expiries.size, dtype=bool)
+    sorted_adjusted_mids = np.full(expiries.size, np.nan)
+    is_slice_failed = np.zeros(n_slices, dtype=bool)
+    filter_slices(moneyness[order], mids[order], slice_starts, task_starts,
+                  np.nan if smoothing_param is None else float(smoothing_param),
+                  filter_type is not FilterType.discard, filter_type is FilterType.expiry_forward,
+                  sorted_keep_mask, sorted_adjust_mask, sorted_adjusted_mids, is_slice_failed)
+    if is_slice_failed.any():
+        raise RuntimeError(f"quotes of {np.count_nonzero(is_slice_failed)} slices are infeasible, but cannot be "
+                           f"adjusted.")
+
+    keep_mask = np.empty(expiries.size, dtype=bool)
+    keep_mask[order] = sorted_keep_mask
+    is_adjusted = np.empty(expiries.size, dtype=bool)
+    is_adjusted[order] = sorted_adjust_mask
+    adjusted_mids = np.empty(expiries.size)
+    adjusted_mids[order] = sorted_adjusted_mids
+
+    adjusted_prices = _denormalize_prices(adjusted_mids[is_adjusted], price_unit=price_unit,
+                                          discount_factors=row_discount_factors[is_adjusted],
+                                          zero_strike_calls=zero_strike_calls[is_adjusted])
+    filtered_prices = np.where(keep_mask[:, np.newaxis], sided_prices, np.nan)
+    filtered_prices[is_adjusted] = adjusted_prices[:, np.newaxis]
+
+    return keep_mask, filtered_prices.reshape(option_prices.shape)
+
+
+def _get_slices(underlying_ids: np.ndarray,
+                expiries: np.ndarray,
+                curve_underlying_ids: np.ndarray,
+                curve_expiries: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """ Returns the slice of every quote, with the slices sorted by underlying and expiry, the underlying of every
+        slice, and the curve entry of every quote. """
+
+    id_dtype = np.result_type(underlying_ids, curve_underlying_ids)
+    curve_keys = _get_keys(curve_underlying_ids, curve_expiries, id_dtype=id_dtype)
+    row_keys = _get_keys(underlying_ids, expiries, id_dtype=id_dtype)
+
+    unique_keys, key_indices = np.unique(np.concatenate((curve_keys, row_keys)), return_inverse=True)
+    curve_key_indices, row_key_indices = key_indices[:curve_keys.size], key_indices[curve_keys.size:]
+    if np.unique(curve_key_indices).size != curve_keys.size:
+        raise RuntimeError("the curves contain more than one forward and rate for a pair of underlying and expiry.")
+
+    curve_for_key = np.full(unique_keys.size, -1)
+    curve_for_key[curve_key_indices] = np.arange(curve_keys.size)
+    row_curves = curve_for_key[row_key_indices]
+    if (row_curves < 0).any():
+        raise RuntimeError(f"the curves contain no forward and rate for {np.count_nonzero(row_curves < 0)} quotes, "
+                           f"the first in row {np.argmax(row_curves < 0)}.")
+
+    slice_key_indices, row_slices = np.unique(row_key_indices, return_inverse=True)
+    return row_slices, unique_keys["underlying_id"][slice_key_indices], row_curves
+
+
+def _get_keys(underlying_ids: np.ndarray,
+              expiries: np.ndarray,
+              id_dtype: np.dtype) -> np.ndarray:
+
+    keys = np.empty(expiries.size, dtype=[("underlying_id", id_dtype), ("expiry", float)])
+    keys["underlying_id"] = underlying_ids
+    keys["expiry"] = expiries
+    return keys
+
+
+def _normalize_prices(prices: np.ndarray,
+                      price_unit: PriceUnit,
+                      discount_factors: np.ndarray,
+                      zero_strike_calls: np.ndarray) -> np.ndarray:
+    """ Maps call prices to normalized call prices, in the order of operations of quote_transformation. """
+
+    if price_unit is PriceUnit.undiscounted_call:
+        prices = prices * discount_factors
+    if price_unit is not PriceUnit.normalized_call:
+        prices = prices / zero_strike_calls
+
+    return prices
+
+
+def _denormalize_prices(prices: np.ndarray,
+                        price_unit: PriceUnit,
+                        discount_factors: np.ndarray,
+                        zero_strike_calls: np.ndarray) -> np.ndarray:
+    """ Maps normalized call prices to call prices, in the order of operations of quote_transformation. """
+
+    if price_unit is not PriceUnit.normalized_call:
+        prices = prices * zero_strike_calls
+    if price_unit is PriceUnit.undiscounted_call:
+        prices = prices / discount_factors
+
+    return prices
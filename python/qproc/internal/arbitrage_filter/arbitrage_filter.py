@@ -112,11 +112,20 @@ class StrikeFilter(ArbitrageFilter):
         q.set_price(price=adjusted_price, side=Side.mid)
         self._current_a.add_quote(q)
 
+    def get_arbitrage_free_sets(self) -> List[ArbitrageFreeSet]:
+        return self.arbitrage_free_collection.sets()
+
+    def set_arbitrage_free_sets(self, arbitrage_free_sets: List[ArbitrageFreeSet]):
+        self.arbitrage_free_collection = ArbitrageFreeCollection(price_unit=self.quote_surface.price_unit,
+                                                                 strike_unit=self.quote_surface.strike_unit)
+        for a in arbitrage_free_sets:
+            self.arbitrage_free_collection.add_slice(a)
+
     def compute_upper_bound(self,
                             expiry: float,
                             trans_strike: float) -> float:
 
-        a = self.arbitrage_free_collection.get_set(expiry)
+        a = self.arbitrage_free_collection.get_upper_bound_set(expiry)
         dummy_quote_for_indexing = Quote(bid=np.nan, ask=np.nan, strike=trans_strike, liq_proxy=np.nan)
         return a.compute_upper_bound(dummy_quote_for_indexing)
     
@@ -124,7 +133,7 @@ class StrikeFilter(ArbitrageFilter):
                             expiry: float,
                             trans_strike: float) -> float:
 
-        a = self.arbitrage_free_collection.get_set(expiry)
+        a = self.arbitrage_free_collection.get_lower_bound_set(expiry)
         dummy_quote_for_indexing = Quote(bid=np.nan, ask=np.nan, strike=trans_strike, liq_proxy=np.nan)
         return a.compute_lower_bound(dummy_quote_for_indexing)
 
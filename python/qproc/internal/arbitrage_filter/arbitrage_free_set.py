@@ -4,7 +4,7 @@
 
 import numpy as np
 from typing import List, final
-from computils.sorting_algorithms import find_lt, find_gt
+from ..sorting_algorithms import get_sorting_algorithms
 from ..quote_structures import Quote, QuoteSlice, QuoteSurface
 from ...globals import StrikeUnit, PriceUnit
 
@@ -41,7 +41,7 @@ class ArbitrageFreeSet(QuoteSlice):
         return max(lower_bound_from_left_difference_quotient, lower_bound_from_right_difference_quotient)
 
     def _get_left_adjacent_quote(self, q: Quote) -> Quote:
-        return find_lt(self.quotes, q)
+        return get_sorting_algorithms().find_lt(self.quotes, q)
 
     def _compute_left_difference_quotient(self, q: Quote) -> float:
         if self._are_two_points_left_of_quote(q):
@@ -57,7 +57,7 @@ class ArbitrageFreeSet(QuoteSlice):
         return self.quotes[1].strike < q.strike
     
     def _get_right_adjacent_quote(self, q: Quote) -> Quote:
-        return find_gt(self.quotes, q)
+        return get_sorting_algorithms().find_gt(self.quotes, q)
     
     def _compute_right_difference_quotient(self, q: Quote) -> float:
         
@@ -101,6 +101,25 @@ class ArbitrageFreeCollection(QuoteSurface):
         """ Wrapper function for type hinting in calling code. """
         return self.get_slice(expiry)
 
+    def get_lower_bound_set(self, expiry: float) -> ArbitrageFreeSet:
+        """ Returns the set whose lower bounds apply to the given expiry, which is the set of the latest expiry up to
+            the given expiry: normalized call prices in forward moneyness are non-decreasing in the expiry. If there is
+            no such set, an empty set is returned, whose bounds follow from the absence of arbitrage alone. """
+
+        try:
+            return get_sorting_algorithms().find_le(self.slices, QuoteSlice(expiry=expiry))
+        except ValueError:
+            return ArbitrageFreeSet(expiry)
+
+    def get_upper_bound_set(self, expiry: float) -> ArbitrageFreeSet:
+        """ Returns the set whose upper bounds apply to the given expiry, which is the set of the earliest expiry from
+            the given expiry on (see get_lower_bound_set). """
+
+        try:
+            return get_sorting_algorithms().find_ge(self.slices, QuoteSlice(expiry=expiry))
+        except ValueError:
+            return ArbitrageFreeSet(expiry)
+
     def sets(self) -> List[ArbitrageFreeSet]:
         """ Wrapper function for type hinting in calling code. """
         return self.slices
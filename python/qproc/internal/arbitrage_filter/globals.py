@@ -1,6 +1,8 @@
 """ This module collects all types from the arbitrage_filter package. """
 
 from abc import ABC, abstractmethod
+from typing import List
+from .arbitrage_free_set import ArbitrageFreeSet
 
 
 class ArbitrageFilter(ABC):
@@ -8,11 +10,21 @@ class ArbitrageFilter(ABC):
     def filter(self):
         """ Filters the quote surface passed to the filter. """
 
+    @abstractmethod
+    def get_arbitrage_free_sets(self) -> List[ArbitrageFreeSet]:
+        """ Returns the arbitrage-free sets of the filtered slices, in ascending order of expiry. """
+
+    @abstractmethod
+    def set_arbitrage_free_sets(self, arbitrage_free_sets: List[ArbitrageFreeSet]):
+        """ Restores the arbitrage-free sets of a quote surface that has been filtered before, e.g., from a cached
+            filter result, instead of filtering the quote surface again. """
+
     @abstractmethod
     def compute_lower_bound(self,
                             expiry: float,
                             trans_strike: float) -> float:
-        """ Computes the lower bound implied by the quotes for the given expiry and transformed strike.
+        """ Computes the lower bound implied by the quotes for the given expiry and transformed strike. The expiry need
+            not be a quote expiry, in which case the lower bound follows from the neighbouring quote expiries.
 
         :param expiry:
         :param trans_strike: must have the same strike unit as the underlying quote surface on which the filtering
@@ -24,7 +36,8 @@ class ArbitrageFilter(ABC):
     def compute_upper_bound(self,
                             expiry: float,
                             trans_strike: float) -> float:
-        """ Computes the upper bound implied by the quotes for the given expiry and transformed strike.
+        """ Computes the upper bound implied by the quotes for the given expiry and transformed strike. The expiry need
+            not be a quote expiry, in which case the upper bound follows from the neighbouring quote expiries.
 
         :param expiry:
         :param trans_strike: must have the same strike unit as the underlying quote surface on which the filtering
@@ -0,0 +1,113 @@
+""" This module implements the compiled kernels that evaluate the price bounds implied by arbitrage-free sets. The
+    kernels reproduce ArbitrageFreeSet.compute_lower_bound and ArbitrageFreeSet.compute_upper_bound, followed by the
+    mapping of normalized call prices to the requested price unit, and release the GIL.
+
+    Remark: the price units are passed by the values of the PriceUnit enum, since enums cannot be passed to compiled
+    code. """
+
+import numpy as np
+from math import inf, nan, isfinite
+from typing import final
+from py_lets_be_rational.numba_helper import maybe_jit
+from ..globals import PriceUnit
+from .compiled_solver import get_compiled_implied_vol_solver
+
+VOL: final = PriceUnit.vol.value
+CALL: final = PriceUnit.call.value
+UNDISCOUNTED_CALL: final = PriceUnit.undiscounted_call.value
+NORMALIZED_CALL: final = PriceUnit.normalized_call.value
+TOTAL_VAR: final = PriceUnit.total_var.value
+
+implied_vol_solver = get_compiled_implied_vol_solver(nogil=True)
+
+
+@maybe_jit(cache=True, nopython=True, nogil=True)
+def _python_max(a, b):
+    """ Returns max(a, b) with the semantics of Python's max, which differ from np.maximum for nan. """
+
+    return b if b > a else a
+
+
+@maybe_jit(cache=True, nopython=True, nogil=True)
+def compute_lower_bound(set_strikes, set_mids, strike):
+    """ Computes the lower bound of the normalized call price implied by the quotes of an arbitrage-free set, whose
+        strikes (in moneyness) start at 0 and end at inf; returns nan for strikes outside (0, inf). """
+
+    left = np.searchsorted(set_strikes, strike, side='left') - 1
+    right = np.searchsorted(set_strikes, strike, side='right')
+    if left < 0 or right >= set_strikes.size:
+        return nan
+
+    left_difference_quotient = -1.0
+    if set_strikes[1] < strike:
+        second_left = np.searchsorted(set_strikes, set_strikes[left], side='left') - 1
+        left_difference_quotient = (set_mids[left] - set_mids[second_left]) / \
+                                   (set_strikes[left] - set_strikes[second_left])
+    lower_bound_from_left = _python_max(set_mids[left] + left_difference_quotient * (strike - set_strikes[left]), 0.0)
+
+    right_difference_quotient = 0.0
+    if set_strikes[-2] > strike:
+        second_right = np.searchsorted(set_strikes, set_strikes[right], side='right')
+        right_difference_quotient = (set_mids[right] - set_mids[second_right]) / \
+                                    (set_strikes[right] - set_strikes[second_right])
+    lower_bound_from_right = set_mids[right]
+    if isfinite(set_strikes[right]):  # handle 0.0 * inf = nan
+        lower_bound_from_right -= right_difference_quotient * (set_strikes[right] - strike)
+
+    return _python_max(lower_bound_from_left, lower_bound_from_right)
+
+
+@maybe_jit(cache=True, nopython=True, nogil=True)
+def compute_upper_bound(set_strikes, set_mids, strike):
+    """ Computes the upper bound of the normalized call price implied by the quotes of an arbitrage-free set, whose
+        strikes (in moneyness) start at 0 and end at inf; returns nan for strikes outside (0, inf). """
+
+    left = np.searchsorted(set_strikes, strike, side='left') - 1
+    right = np.searchsorted(set_strikes, strike, side='right')
+    if left < 0 or right >= set_strikes.size:
+        return nan
+
+    if isfinite(set_strikes[right]):
+        return ((set_strikes[right] - strike) * set_mids[left] + (strike - set_strikes[left]) * set_mids[right]) / \
+               (set_strikes[right] - set_strikes[left])
+    else:
+        return set_mids[left]
+
+
+@maybe_jit(cache=True, nopython=True, nogil=True)
+def compute_implied_vol(discounted_price, forward, strike, expiry, discount_factor):
+    """ Mirrors volatility_functions.implied_vol_for_discounted_option for calls: returns 0.0 for prices below the
+        intrinsic value, and inf for prices above the maximum. """
+
+    undiscounted_price = discounted_price / discount_factor
+    try:
+        return implied_vol_solver(undiscounted_price, forward, strike, expiry, 1)
+    except Exception:  # the solver raises BelowIntrinsicException only for prices below the intrinsic value
+        if undiscounted_price < abs(max(forward - strike, 0.0)):
+            return 0.0
+        return inf
+
+
+@maybe_jit(cache=True, nopython=True, nogil=True)
+def compute_price_bounds(set_strikes, set_mids, actual_strikes, moneyness, price_unit, is_lower_bound, expiry,
+                         forward, discount_factor, price_bounds):
+    """ Fills price_bounds with the bounds for the given strikes (in both strike and moneyness units), mapping the
+        normalized call bounds to the price unit in the same order of operations as quote_transformation. """
+
+    zero_strike_call = discount_factor * forward
+    for i in range(actual_strikes.size):
+        if is_lower_bound:
+            price = compute_lower_bound(set_strikes, set_mids, moneyness[i])
+        else:
+            price = compute_upper_bound(set_strikes, set_mids, moneyness[i])
+
+        if price_unit != NORMALIZED_CALL:
+            price *= zero_strike_call
+            if price_unit == UNDISCOUNTED_CALL:
+                price /= discount_factor
+            elif price_unit == VOL or price_unit == TOTAL_VAR:
+                price = compute_implied_vol(price, forward, actual_strikes[i], expiry, discount_factor)
+                if price_unit == TOTAL_VAR:
+                    price = (price ** 2) * expiry
+
+        price_bounds[i] = price
@@ -0,0 +1,162 @@
+""" This module implements the InternalBoundQuery class. """
+
+import numpy as np
+from copy import deepcopy
+from typing import List, Tuple
+from ..globals import *
+from .arbitrage_filter.arbitrage_free_set import ArbitrageFreeSet
+from .quote_transformation import transform_strike
+
+# strikes (in moneyness) and normalized call prices of an empty arbitrage-free set, whose bounds follow from the absence
+# of arbitrage alone
+EMPTY_SET_STRIKES: final = np.array([0.0, np.inf])
+EMPTY_SET_MIDS: final = np.array([1.0, 0.0])
+
+
+class InternalBoundQuery(BoundQuery):
+    def __init__(self,
+                 arbitrage_free_sets: List[ArbitrageFreeSet],
+                 forwards: np.ndarray,
+                 discount_factors: np.ndarray,
+                 forward_curve: ForwardCurve,
+                 rate_curve: RateCurve):
+        """ Copies the quotes of the arbitrage-free sets into read-only arrays, such that the object does not share any
+            mutable state with the filter. The bounds for other expiries than those of the sets are computed from the
+            sets of the neighbouring expiries, as in ArbitrageFreeCollection.
+
+        :param arbitrage_free_sets: sets in ascending order of expiry, with strikes in moneyness and normalized call
+            prices.
+        :param forwards: forwards for the expiries of the sets.
+        :param discount_factors: discount factors for the expiries of the sets.
+        :param forward_curve: curve for the forwards of other expiries.
+        :param rate_curve: curve for the discount factors of other expiries.
+        """
+
+        # the compiled kernels are imported on first use, as they load numba
+        from . import bound_kernels
+
+        expiries = np.array([a.expiry for a in arbitrage_free_sets], dtype=float)
+        set_strikes = [np.array([q.strike for q in a.quotes], dtype=float) for a in arbitrage_free_sets]
+        set_mids = [np.array([q.mid() for q in a.quotes], dtype=float) for a in arbitrage_free_sets]
+        for array in [expiries, forwards, discount_factors, EMPTY_SET_STRIKES, EMPTY_SET_MIDS] + set_strikes + set_mids:
+            array.setflags(write=False)
+
+        # the attributes are set once, and read-only afterwards (see __setattr__)
+        object.__setattr__(self, "_bound_kernels", bound_kernels)
+        object.__setattr__(self, "_expiries", expiries)
+        object.__setattr__(self, "_set_indices", {expiry: i for i, expiry in enumerate(expiries.tolist())})
+        object.__setattr__(self, "_set_strikes", tuple(set_strikes))
+        object.__setattr__(self, "_set_mids", tuple(set_mids))
+        object.__setattr__(self, "_forwards", forwards)
+        object.__setattr__(self, "_discount_factors", discount_factors)
+        object.__setattr__(self, "_forward_curve", deepcopy(forward_curve))
+        object.__setattr__(self, "_rate_curve", deepcopy(rate_curve))
+
+    def __setattr__(self, name, value):
+        raise RuntimeError("InternalBoundQuery objects are read-only.")
+
+    def expiries(self) -> np.ndarray:
+        return self._expiries
+
+    def compute_lower_bound(self,
+                            expiry: float,
+                            strike: ScalarOrArray,
+                            strike_unit: StrikeUnit,
+                            price_unit: PriceUnit) -> ScalarOrArray:
+
+        return self._compute_bound(expiry=expiry, strike=strike, strike_unit=strike_unit, price_unit=price_unit,
+                                   is_lower_bound=True)
+
+    def compute_upper_bound(self,
+                            expiry: float,
+                            strike: ScalarOrArray,
+                            strike_unit: StrikeUnit,
+                            price_unit: PriceUnit) -> ScalarOrArray:
+
+        return self._compute_bound(expiry=expiry, strike=strike, strike_unit=strike_unit, price_unit=price_unit,
+                                   is_lower_bound=False)
+
+    def compute_bounds(self,
+                       expiry: float,
+                       strikes: np.ndarray,
+                       strike_unit: StrikeUnit,
+                       price_unit: PriceUnit) -> Tuple[np.ndarray, np.ndarray]:
+        """ Computes the lower and upper bounds for the given expiry and strikes, for which the strikes are mapped
+            once.
+
+        :param expiry:
+        :param strikes: (n,) array.
+        :param strike_unit:
+        :param price_unit:
+        :return: the (n,) arrays of the lower and upper bounds.
+        """
+
+        forward, discount_factor, actual_strikes, moneyness = self._get_query_strikes(expiry=expiry, strikes=strikes,
+                                                                                       strike_unit=strike_unit)
+        bounds = []
+        for is_lower_bound in (True, False):
+            set_strikes, set_mids = self._get_bound_set(expiry=expiry, is_lower_bound=is_lower_bound)
+            price_bounds = np.empty(actual_strikes.shape)
+            self._bound_kernels.compute_price_bounds(set_strikes, set_mids, actual_strikes, moneyness,
+                                                     price_unit.value, is_lower_bound, float(expiry), forward,
+                                                     discount_factor, price_bounds)
+            bounds.append(price_bounds)
+
+        return bounds[0], bounds[1]
+
+    def _compute_bound(self,
+                       expiry: float,
+                       strike: ScalarOrArray,
+                       strike_unit: StrikeUnit,
+                       price_unit: PriceUnit,
+                       is_lower_bound: bool) -> ScalarOrArray:
+
+        is_scalar = not isinstance(strike, np.ndarray)
+        forward, discount_factor, actual_strikes, moneyness = self._get_query_strikes(
+            expiry=expiry, strikes=np.asarray(strike, dtype=float).reshape(-1), strike_unit=strike_unit)
+        set_strikes, set_mids = self._get_bound_set(expiry=expiry, is_lower_bound=is_lower_bound)
+
+        price_bounds = np.empty(actual_strikes.shape)
+        self._bound_kernels.compute_price_bounds(set_strikes, set_mids, actual_strikes, moneyness, price_unit.value,
+                                                 is_lower_bound, float(expiry), forward, discount_factor, price_bounds)
+
+        return price_bounds[0] if is_scalar else price_bounds.reshape(np.shape(strike))
+
+    def _get_query_strikes(self,
+                           expiry: float,
+                           strikes: np.ndarray,
+                           strike_unit: StrikeUnit) -> Tuple[float, float, np.ndarray, np.ndarray]:
+        """ Returns the forward and discount factor for the expiry, and the strikes in strike and moneyness units. """
+
+        set_index: Optional[int] = self._set_indices.get(expiry)
+        if set_index is None:  # not a quote expiry
+            forward = float(self._forward_curve.get_forward(expiry))
+            discount_factor = float(self._rate_curve.get_discount_factor(expiry))
+        else:
+            forward = float(self._forwards[set_index])
+            discount_factor = float(self._discount_factors[set_index])
+
+        # the strikes are mapped by numpy, as in OptionQuoteProcessor, since np.exp may differ from the compiled exp in
+        # the last digit
+        actual_strikes = transform_strike(strike=strikes, input_strike_unit=strike_unit,
+                                          output_strike_unit=StrikeUnit.strike, forward=forward)
+        moneyness = transform_strike(strike=strikes, input_strike_unit=strike_unit,
+                                     output_strike_unit=StrikeUnit.moneyness, forward=forward)
+        return forward, discount_factor, actual_strikes, moneyness
+
+    def _get_bound_set(self,
+                       expiry: float,
+                       is_lower_bound: bool) -> Tuple[np.ndarray, np.ndarray]:
+        """ Returns the strikes and normalized call prices of the set whose bounds apply to the expiry: the set of the
+            latest expiry up to the expiry for lower bounds, and of the earliest expiry from the expiry on for upper
+            bounds. """
+
+        if is_lower_bound:
+            set_index = int(np.searchsorted(self._expiries, expiry, side='right')) - 1
+        else:
+            set_index = int(np.searchsorted(self._expiries, expiry, side='left'))
+
+        if 0 <= set_index < self._expiries.size:
+            return self._set_strikes[set_index], self._set_mids[set_index]
+        else:
+            return EMPTY_SET_STRIKES, EMPTY_SET_MIDS
@@ -0,0 +1,38 @@
+""" This module allows for compiling the implied volatility solver of py_lets_be_rational in nopython mode. The vendored
+    package leaves the top-level functions of the solver uncompiled, as they raise exceptions, such that they cannot be
+    called from compiled code or released from the GIL. """
+
+import types
+from typing import final, Callable, Dict
+
+UNCOMPILED_SOLVER_FUNCTION_NAMES: final = (
+    "_unchecked_normalised_implied_volatility_from_a_transformed_rational_guess_with_limited_iterations",
+    "implied_volatility_from_a_transformed_rational_guess_with_limited_iterations",
+    "implied_volatility_from_a_transformed_rational_guess")
+
+_compiled_solvers: Dict[bool, Callable] = {}
+
+
+def get_compiled_implied_vol_solver(nogil: bool = False) -> Callable:
+    """ Returns implied_volatility_from_a_transformed_rational_guess compiled in nopython mode, or the uncompiled
+        function if numba is not installed. The functions are compiled lazily, on their first call from Python or
+        compiled code.
+
+    :param nogil: whether the compiled functions release the GIL when called from Python.
+    :return:
+    """
+
+    if nogil not in _compiled_solvers:
+        from py_lets_be_rational.numba_helper import maybe_jit
+        import py_lets_be_rational.lets_be_rational as lets_be_rational
+
+        # the functions share a copy of the module namespace, in which they refer to their compiled counterparts
+        namespace = dict(lets_be_rational.__dict__)
+        for name in UNCOMPILED_SOLVER_FUNCTION_NAMES:
+            func = getattr(lets_be_rational, name)
+            namespace[name] = maybe_jit(nopython=True, nogil=nogil)(
+                types.FunctionType(func.__code__, namespace, name, func.__defaults__))
+
+        _compiled_solvers[nogil] = namespace["implied_volatility_from_a_transformed_rational_guess"]
+
+    return _compiled_solvers[nogil]
@@ -1,7 +1,6 @@
 """ This module implements the rate and forward curves. """
 
 import numpy as np
-from computils import create_interpolator, Interpolator, InterpolationType, ExtrapolationType
 from ..globals import *
 
 
@@ -10,22 +9,24 @@ class InternalRateCurve(RateCurve):
                  times: np.ndarray,
                  zero_rates: np.ndarray):
 
-        self._times: np.ndarray = times
-        log_deposits = zero_rates * times  # perform log linear interpolation
-        self._interpolator: Interpolator = create_interpolator(x=times, y=log_deposits,
-                                                               inter_type=InterpolationType.linear,
-                                                               extra_type=ExtrapolationType.nan)  # todo: extrapolation
+        self._times: np.ndarray = np.asarray(times, dtype=float)
+        self._log_deposits: np.ndarray = zero_rates * self._times  # perform log linear interpolation
 
     def get_zero_rate(self, time: ScalarOrArray) -> ScalarOrArray:
-        log_depo = self._interpolator(time)
+        log_depo = self._get_log_deposit(time)
         zero_rate = log_depo / time
         return zero_rate
 
     def get_discount_factor(self, time: ScalarOrArray) -> ScalarOrArray:
-        log_depo = self._interpolator(time)
+        log_depo = self._get_log_deposit(time)
         discount_factor = np.exp(-log_depo)
         return discount_factor
 
+    def _get_log_deposit(self, time: ScalarOrArray) -> ScalarOrArray:
+        """ Linearly interpolates the log deposits for scalar or array times in a single pass over the knots. """
+
+        return np.interp(time, self._times, self._log_deposits, left=np.nan, right=np.nan)  # todo: extrapolation
+
 
 class InternalForwardCurve(ForwardCurve):
     def __init__(self,
@@ -34,16 +35,19 @@ class InternalForwardCurve(ForwardCurve):
                  forwards: np.ndarray):
 
         self._spot: float = spot
-        self._times: np.ndarray = times
-        log_depo_diff = np.log(forwards/spot)
-        self._interpolator: Interpolator = create_interpolator(x=times, y=log_depo_diff,
-                                                               inter_type=InterpolationType.linear,
-                                                               extra_type=ExtrapolationType.nan)  # todo: extrapolation
+        self._times: np.ndarray = np.asarray(times, dtype=float)
+        self._log_depo_diffs: np.ndarray = np.log(forwards/spot)
 
     def get_forward(self, time: ScalarOrArray) -> ScalarOrArray:
-        log_depo_diff = self._interpolator(time)
+        log_depo_diff = self._get_log_depo_diff(time)
         forward = self._spot * np.exp(log_depo_diff)
         return forward
 
     def spot(self) -> float:
         return self._spot
+
+    def _get_log_depo_diff(self, time: ScalarOrArray) -> ScalarOrArray:
+        """ Linearly interpolates the log deposit differences for scalar or array times in a single pass over the
+            knots. """
+
+        return np.interp(time, self._times, self._log_depo_diffs, left=np.nan, right=np.nan)  # todo: extrapolation
@@ -0,0 +1,222 @@
+""" This module implements the InternalFilterCache class. """
+
+import os
+import hashlib
+import tempfile
+import numpy as np
+from typing import Dict, Iterator, List, Tuple
+from ..globals import *
+from .quote_structures import Quote, QuoteSlice, QuoteSurface
+from .arbitrage_filter import create_filter, ArbitrageFilter
+from .arbitrage_filter.arbitrage_free_set import ArbitrageFreeSet
+
+ENTRY_SUFFIX: final = ".npz"
+QUOTE_PREFIX: final = "quote_"  # arrays of the quote slices
+SET_PREFIX: final = "set_"  # arrays of the arbitrage-free sets, without the quotes at strikes 0 and inf
+CACHE_DIR_MODE: final = 0o700
+
+FilterResult = Tuple[QuoteSurface, ArbitrageFilter]
+
+
+class InternalFilterCache(FilterCache):
+    def __init__(self,
+                 cache_dir: str,
+                 max_size: int):
+        """ Stores every filter result as plain arrays in a file named by its key, from which the quote surface and the
+            filter are rebuilt; entries are never unpickled, such that they cannot run code. The recency of a result is
+            the modification time of its file, which is updated whenever the result is loaded.
+
+        :param cache_dir: directory of the cache, which may be shared by multiple processes. It is created as private to
+            the user if it does not exist.
+        :param max_size: maximal size of the cached results in bytes.
+        """
+
+        if max_size <= 0:
+            raise RuntimeError(f"max_size must be positive, but is {max_size}.")
+
+        self.cache_dir: str = os.path.abspath(cache_dir)
+        self.max_size: int = max_size
+        os.makedirs(self.cache_dir, mode=CACHE_DIR_MODE, exist_ok=True)
+
+    def size(self) -> int:
+        return sum(entry_size for _, _, entry_size in self._get_entries())
+
+    def clear(self):
+        for path, _, _ in self._get_entries():
+            _remove_entry(path)
+
+    def get_key(self,
+                quote_surface: QuoteSurface,
+                forwards: np.ndarray,
+                discount_factors: np.ndarray,
+                filter_type: FilterType,
+                smoothing_param: Optional[float],
+                param_grid: Tuple[float]) -> str:
+        """ Returns the key of the filter result for an unfiltered quote surface, which is a hash of everything the
+            filter depends on. The order of the quotes is part of the key, as it decides ties in liquidity.
+
+        :param quote_surface:
+        :param forwards: forwards for the expiries of the quote surface.
+        :param discount_factors: discount factors for the expiries of the quote surface.
+        :param filter_type:
+        :param smoothing_param:
+        :param param_grid:
+        :return:
+        """
+
+        quotes = [(qs.expiry, q.strike, q.bid, q.ask, q.liq_proxy) for qs in quote_surface.slices for q in qs.quotes]
+        parameters = (quote_surface.price_unit.name, quote_surface.strike_unit.name,
+                      filter_type.name, smoothing_param, tuple(param_grid))
+
+        hash_object = hashlib.sha256(repr(parameters).encode("utf-8"))
+        for array in (np.array(quotes, dtype=float), forwards, discount_factors):
+            hash_object.update(np.ascontiguousarray(array, dtype=float).tobytes())
+
+        return hash_object.hexdigest()
+
+    def load(self,
+             key: str,
+             filter_type: FilterType,
+             smoothing_param: Optional[float],
+             param_grid: Tuple[float]) -> Optional[FilterResult]:
+        """ Returns the filter result for the key, or None if the result is not cached. An entry that cannot be decoded
+            is removed and treated as not cached, such that the result is recomputed.
+
+        :param key:
+        :param filter_type: the filter parameters of the key, with which the filter is rebuilt.
+        :param smoothing_param:
+        :param param_grid:
+        :return:
+        """
+
+        path = self._get_path(key)
+        try:
+            with np.load(path, allow_pickle=False) as arrays:
+                filter_result = _decode(arrays, filter_type=filter_type, smoothing_param=smoothing_param,
+                                        param_grid=param_grid)
+        except FileNotFoundError:
+            return None
+        except Exception:  # unreadable or stale entry
+            _remove_entry(path)
+            return None
+
+        try:
+            os.utime(path)  # marks the result as most recently used
+        except FileNotFoundError:  # evicted by another process in the meantime
+            pass
+
+        return filter_result
+
+    def store(self,
+              key: str,
+              filter_result: FilterResult):
+        """ Stores the filter result, and evicts the least recently used results if the cache exceeds its size. The
+            entry is written to a temporary file first, such that other processes never read a partial entry. """
+
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                np.savez(file, **_encode(filter_result))
+            os.replace(temp_path, self._get_path(key))
+        except BaseException:
+            _remove_entry(temp_path)
+            raise
+
+        self._evict()
+
+    def _evict(self):
+        entries = self._get_entries()
+        entries.sort(key=lambda entry: entry[1])  # least recently used first
+        total_size = sum(entry_size for _, _, entry_size in entries)
+        for path, _, entry_size in entries:
+            if total_size <= self.max_size:
+                break
+            _remove_entry(path)
+            total_size -= entry_size
+
+    def _get_entries(self) -> List[Tuple[str, int, int]]:
+        """ Returns the path, modification time in nanoseconds and size in bytes of every cached result. """
+
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for dir_entry in it:
+                if dir_entry.name.endswith(ENTRY_SUFFIX):
+                    try:
+                        stat = dir_entry.stat()
+                    except FileNotFoundError:  # removed by another process in the meantime
+                        continue
+                    entries.append((dir_entry.path, stat.st_mtime_ns, stat.st_size))
+
+        return entries
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ENTRY_SUFFIX)
+
+
+def _remove_entry(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _encode(filter_result: FilterResult) -> Dict[str, np.ndarray]:
+    quote_surface, arbitrage_filter = filter_result
+    arrays = dict(price_unit=np.array(quote_surface.price_unit.name),
+                  strike_unit=np.array(quote_surface.strike_unit.name))
+    arrays.update(_encode_slices(prefix=QUOTE_PREFIX, expiries=[qs.expiry for qs in quote_surface.slices],
+                                 quote_lists=[qs.quotes for qs in quote_surface.slices]))
+    arbitrage_free_sets = arbitrage_filter.get_arbitrage_free_sets()
+    arrays.update(_encode_slices(prefix=SET_PREFIX, expiries=[a.expiry for a in arbitrage_free_sets],
+                                 quote_lists=[a.get_arbitrage_free_quotes(exclude_strikes_0_and_inf=True)
+                                              for a in arbitrage_free_sets]))
+    return arrays
+
+
+def _encode_slices(prefix: str,
+                   expiries: List[float],
+                   quote_lists: List[List[Quote]]) -> Dict[str, np.ndarray]:
+    """ Returns the quotes of all slices as flat arrays, in which the quotes of the i-th slice are those from
+        offsets[i] up to offsets[i + 1]. """
+
+    quotes = [q for quote_list in quote_lists for q in quote_list]
+    return {prefix + "expiries": np.array(expiries, dtype=float),
+            prefix + "offsets": np.concatenate(([0], np.cumsum([len(ql) for ql in quote_lists], dtype=np.int64))),
+            prefix + "strikes": np.array([q.strike for q in quotes], dtype=float),
+            prefix + "bids": np.array([q.bid for q in quotes], dtype=float),
+            prefix + "asks": np.array([q.ask for q in quotes], dtype=float),
+            prefix + "liq_proxies": np.array([q.liq_proxy for q in quotes], dtype=float)}
+
+
+def _decode(arrays: Dict[str, np.ndarray],
+            filter_type: FilterType,
+            smoothing_param: Optional[float],
+            param_grid: Tuple[float]) -> FilterResult:
+
+    quote_surface = QuoteSurface(price_unit=PriceUnit[str(arrays["price_unit"])],
+                                 strike_unit=StrikeUnit[str(arrays["strike_unit"])])
+    for expiry, quotes in _decode_slices(arrays, prefix=QUOTE_PREFIX):
+        quote_slice = QuoteSlice(expiry)
+        quote_slice.quotes = quotes
+        quote_surface.add_slice(quote_slice)
+
+    arbitrage_free_sets = []
+    for expiry, quotes in _decode_slices(arrays, prefix=SET_PREFIX):
+        a = ArbitrageFreeSet(expiry)
+        a.quotes[1:-1] = quotes  # between the quotes at strikes 0 and inf
+        arbitrage_free_sets.append(a)
+
+    arbitrage_filter = create_filter(quote_surface=quote_surface, filter_type=filter_type,
+                                     smoothing_param=smoothing_param, smoothing_param_grid=param_grid)
+    arbitrage_filter.set_arbitrage_free_sets(arbitrage_free_sets)
+    return quote_surface, arbitrage_filter
+
+
+def _decode_slices(arrays: Dict[str, np.ndarray],
+                   prefix: str) -> Iterator[Tuple[float, List[Quote]]]:
+    offsets = arrays[prefix + "offsets"].tolist()
+    strikes, bids, asks, liq_proxies = (arrays[prefix + name].tolist()
+                                        for name in ("strikes", "bids", "asks", "liq_proxies"))
+    for i, expiry in enumerate(arrays[prefix + "expiries"].tolist()):
+        yield expiry, [Quote(bid=bids[j], ask=asks[j], strike=strikes[j], liq_proxy=liq_proxies[j])
+                       for j in range(offsets[i], offsets[i + 1])]
@@ -0,0 +1,137 @@
+""" This module implements the compiled kernel that filters many quote slices, of one or more underlyings, in parallel.
+    The kernel reproduces the StrikeFilter, ForwardExpiryFilter and DiscardFilter on normalized call prices in
+    moneyness, with every arbitrage-free set kept in a segment of a shared buffer instead of a list of quotes.
+
+    Remark: the slices of the strike and discard filters are independent, whereas the forward expiry filter bounds a
+    slice by the sets of the earlier slices of the same underlying. The kernel therefore processes tasks of consecutive
+    slices in parallel, which are single slices for the former and all slices of an underlying for the latter. """
+
+import numpy as np
+from py_lets_be_rational.numba_helper import maybe_jit
+from .bound_kernels import compute_lower_bound, compute_upper_bound
+
+try:
+    from numba import prange
+except ImportError:
+    prange = range
+
+
+@maybe_jit(cache=True, nopython=True, nogil=True)
+def _insert_quote(set_strikes, set_mids, set_size, strike, mid):
+    """ Inserts a quote into the first set_size entries of an arbitrage-free set, before any quotes with equal strikes
+        as bisect.insort_left does, and returns the new size of the set. """
+
+    position = np.searchsorted(set_strikes[:set_size], strike, side='left')
+    for i in range(set_size, position, -1):
+        set_strikes[i] = set_strikes[i - 1]
+        set_mids[i] = set_mids[i - 1]
+    set_strikes[position] = strike
+    set_mids[position] = mid
+
+    return set_size + 1
+
+
+@maybe_jit(cache=True, nopython=True, nogil=True)
+def _compute_task_lower_bound(set_strikes, set_mids, set_starts, set_sizes, first_slice, slice_index, strike,
+                              bound_by_earlier_slices):
+    """ Computes the lower bound from the set of the slice, and from the sets of the earlier slices of the task if
+        bound_by_earlier_slices, as ForwardExpiryFilter does. """
+
+    start = set_starts[slice_index]
+    lower_bound = compute_lower_bound(set_strikes[start:start + set_sizes[slice_index]],
+                                      set_mids[start:start + set_sizes[slice_index]], strike)
+    if bound_by_earlier_slices:
+        for earlier_slice in range(first_slice, slice_index):
+            start = set_starts[earlier_slice]
+            lower_bound_from_earlier_slice = compute_lower_bound(set_strikes[start:start + set_sizes[earlier_slice]],
+                                                                 set_mids[start:start + set_sizes[earlier_slice]],
+                                                                 strike)
+            if lower_bound_from_earlier_slice >= lower_bound:
+                lower_bound = lower_bound_from_earlier_slice
+
+    return lower_bound
+
+
+@maybe_jit(cache=True, nopython=True, nogil=True)
+def _filter_slice(strikes, mids, slice_starts, set_starts, set_strikes, set_mids, set_sizes, first_slice, slice_index,
+                  smoothing_param, adjust_infeasible_quotes, bound_by_earlier_slices, complement, keep_mask,
+                  adjust_mask, adjusted_mids):
+    """ Filters the quotes of a slice, which are sorted by descending liquidity; returns False if an infeasible quote
+        cannot be adjusted, in which case the Python filters raise. """
+
+    set_start = set_starts[slice_index]
+    set_strikes[set_start], set_mids[set_start] = 0.0, 1.0
+    set_strikes[set_start + 1], set_mids[set_start + 1] = np.inf, 0.0
+    set_sizes[slice_index] = 2
+
+    set_end = set_starts[slice_index + 1]
+    n_complement = 0
+    for i in range(slice_starts[slice_index], slice_starts[slice_index + 1]):
+        lower_bound = _compute_task_lower_bound(set_strikes, set_mids, set_starts, set_sizes, first_slice, slice_index,
+                                                strikes[i], bound_by_earlier_slices)
+        upper_bound = compute_upper_bound(set_strikes[set_start:set_start + set_sizes[slice_index]],
+                                          set_mids[set_start:set_start + set_sizes[slice_index]], strikes[i])
+        if lower_bound <= mids[i] <= upper_bound:
+            set_sizes[slice_index] = _insert_quote(set_strikes[set_start:set_end], set_mids[set_start:set_end],
+                                                   set_sizes[slice_index], strikes[i], mids[i])
+            keep_mask[i] = True
+        else:
+            complement[slice_starts[slice_index] + n_complement] = i
+            n_complement += 1
+
+    if not adjust_infeasible_quotes:
+        return True
+
+    for j in range(slice_starts[slice_index], slice_starts[slice_index] + n_complement):
+        i = complement[j]
+        lower_bound = _compute_task_lower_bound(set_strikes, set_mids, set_starts, set_sizes, first_slice, slice_index,
+                                                strikes[i], bound_by_earlier_slices)
+        upper_bound = compute_upper_bound(set_strikes[set_start:set_start + set_sizes[slice_index]],
+                                          set_mids[set_start:set_start + set_sizes[slice_index]], strikes[i])
+        if mids[i] < lower_bound:
+            adjusted_mid = lower_bound + smoothing_param * (upper_bound - lower_bound)
+        elif mids[i] > upper_bound:
+            adjusted_mid = lower_bound + (1.0 - smoothing_param) * (upper_bound - lower_bound)
+        else:
+            return False
+
+        set_sizes[slice_index] = _insert_quote(set_strikes[set_start:set_end], set_mids[set_start:set_end],
+                                               set_sizes[slice_index], strikes[i], adjusted_mid)
+        keep_mask[i] = True
+        adjust_mask[i] = True
+        adjusted_mids[i] = adjusted_mid
+
+    return True
+
+
+@maybe_jit(cache=True, nopython=True, nogil=True, parallel=True)
+def filter_slices(strikes, mids, slice_starts, task_starts, smoothing_param, adjust_infeasible_quotes,
+                  bound_by_earlier_slices, keep_mask, adjust_mask, adjusted_mids, is_slice_failed):
+    """ Filters the quotes of every slice, in parallel over the tasks.
+
+    :param strikes: strikes in moneyness of all quotes, sorted by slice and by descending liquidity within a slice.
+    :param mids: normalized call mid prices of all quotes, in the order of the strikes.
+    :param slice_starts: (n_slices + 1,) offsets of the slices in the quotes.
+    :param task_starts: (n_tasks + 1,) offsets of the tasks in the slices.
+    :param smoothing_param: nan if None, as in the Python filters.
+    :param adjust_infeasible_quotes: False for the discard filter.
+    :param bound_by_earlier_slices: True for the forward expiry filter.
+    :param keep_mask: filled with whether the quotes are kept, initially False.
+    :param adjust_mask: filled with whether the quotes are adjusted, initially False.
+    :param adjusted_mids: filled with the adjusted mid prices of the adjusted quotes.
+    :param is_slice_failed: filled with whether a slice has an infeasible quote that cannot be adjusted.
+    """
+
+    n_slices = slice_starts.size - 1
+    set_starts = slice_starts + 2 * np.arange(n_slices + 1)  # every set also holds the quotes at strikes 0 and inf
+    set_strikes = np.empty(set_starts[-1])
+    set_mids = np.empty(set_starts[-1])
+    set_sizes = np.zeros(n_slices, dtype=np.int64)
+    complement = np.empty(strikes.size, dtype=np.int64)
+
+    for task in prange(task_starts.size - 1):
+        for slice_index in range(task_starts[task], task_starts[task + 1]):
+            is_slice_failed[slice_index] = not _filter_slice(
+                strikes, mids, slice_starts, set_starts, set_strikes, set_mids, set_sizes, task_starts[task],
+                slice_index, smoothing_param, adjust_infeasible_quotes, bound_by_earlier_slices, complement, keep_mask,
+                adjust_mask, adjusted_mids)
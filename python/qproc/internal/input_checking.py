@@ -1,17 +1,163 @@
 """ This module collects functionality for checking input arguments. """
 
 import numpy as np
+from typing import Union
 from ..globals import *
 
+MAX_REPORTED_ROWS: final = 10
 
-def check_create_q_proc_args(forwards: np.ndarray,
-                             rates: np.ndarray,
+
+def check_create_q_proc_args(forwards: Union[np.ndarray, ForwardCurve],
+                             rates: Union[np.ndarray, RateCurve],
                              option_prices: np.ndarray,
                              price_unit: PriceUnit,
                              expiries: np.ndarray,
                              strikes: np.ndarray,
                              strike_unit: StrikeUnit,
                              liquidity_proxies: Optional[np.ndarray]):
-    """ Checks the arguments passed to create_q_proc and raises a RuntimeError if the input is invalid. """
+    """ Checks the arguments passed to create_q_proc and raises a RuntimeError if the input is invalid. The error
+        message lists the offending rows of the option data, or the offending expiry indices of the forwards and rates.
+        """
+
+    expiries = _check_quote_args(option_prices=option_prices, price_unit=price_unit, expiries=expiries,
+                                 strikes=strikes, strike_unit=strike_unit, liquidity_proxies=liquidity_proxies)
+
+    if isinstance(forwards, ForwardCurve) and isinstance(rates, RateCurve):
+        return
+
+    n_expiries = np.unique(expiries).size
+    if not isinstance(forwards, ForwardCurve):
+        forwards = _check_expiry_array(forwards, name="forwards", n_expiries=n_expiries)
+        _raise_for_expiries(~(np.isfinite(forwards) & (forwards > 0.0)), "forwards contains non-positive or non-finite "
+                                                                           "values")
+    if not isinstance(rates, RateCurve):
+        rates = _check_expiry_array(rates, name="rates", n_expiries=n_expiries)
+        _raise_for_expiries(~np.isfinite(rates), "rates contains non-finite values")
+
+
+def check_filter_grouped_quotes_args(underlying_ids: np.ndarray,
+                                     expiries: np.ndarray,
+                                     strikes: np.ndarray,
+                                     option_prices: np.ndarray,
+                                     price_unit: PriceUnit,
+                                     curve_underlying_ids: np.ndarray,
+                                     curve_expiries: np.ndarray,
+                                     forwards: np.ndarray,
+                                     rates: np.ndarray,
+                                     strike_unit: StrikeUnit,
+                                     liquidity_proxies: Optional[np.ndarray]):
+    """ Checks the arguments passed to filter_grouped_quotes as check_create_q_proc_args does, where the forwards and
+        rates are checked per row of the curve arrays. """
+
+    expiries = _check_quote_args(option_prices=option_prices, price_unit=price_unit, expiries=expiries,
+                                 strikes=strikes, strike_unit=strike_unit, liquidity_proxies=liquidity_proxies)
+    _check_row_array(underlying_ids, name="underlying_ids", n_quotes=expiries.size)
+
+    curve_expiries = np.asarray(curve_expiries)
+    if curve_expiries.ndim != 1:
+        raise RuntimeError(f"curve_expiries must be an (m,) array, not an array of shape {curve_expiries.shape}.")
+
+    n_curve_rows = curve_expiries.size
+    for name, array in (("curve_underlying_ids", curve_underlying_ids), ("forwards", forwards), ("rates", rates)):
+        if np.shape(array) != (n_curve_rows,):
+            raise RuntimeError(f"{name} must be an ({n_curve_rows},) array like curve_expiries, not an array of shape "
+                               f"{np.shape(array)}.")
+
+    forwards, rates = np.asarray(forwards), np.asarray(rates)
+    _raise_for_curve_rows(~(np.isfinite(curve_expiries) & (curve_expiries > 0.0)), "curve_expiries contains "
+                                                                                   "non-positive or non-finite values")
+    _raise_for_curve_rows(~(np.isfinite(forwards) & (forwards > 0.0)), "forwards contains non-positive or non-finite "
+                                                                         "values")
+    _raise_for_curve_rows(~np.isfinite(rates), "rates contains non-finite values")
+
+
+def _check_quote_args(option_prices: np.ndarray,
+                      price_unit: PriceUnit,
+                      expiries: np.ndarray,
+                      strikes: np.ndarray,
+                      strike_unit: StrikeUnit,
+                      liquidity_proxies: Optional[np.ndarray]) -> np.ndarray:
+    """ Checks the arguments that describe the quotes, and returns the expiries as an array. """
+
+    if not isinstance(price_unit, PriceUnit):
+        raise RuntimeError(f"price_unit must be a PriceUnit, not {type(price_unit).__name__}.")
+    if not isinstance(strike_unit, StrikeUnit):
+        raise RuntimeError(f"strike_unit must be a StrikeUnit, not {type(strike_unit).__name__}.")
+
+    option_prices = np.asarray(option_prices)
+    if option_prices.ndim not in (1, 2) or (option_prices.ndim == 2 and option_prices.shape[1] not in (1, 2)):
+        raise RuntimeError(f"option_prices must be an (n,) or (n,2) array, not an array of shape "
+                           f"{option_prices.shape}.")
+
+    n_quotes = option_prices.shape[0]
+    if n_quotes == 0:
+        raise RuntimeError("option_prices must not be empty.")
+
+    expiries = _check_row_array(expiries, name="expiries", n_quotes=n_quotes)
+    strikes = _check_row_array(strikes, name="strikes", n_quotes=n_quotes)
+
+    option_prices = option_prices.reshape((n_quotes, -1))
+    _raise_for_rows(~np.isfinite(option_prices).all(axis=1), "option_prices contains non-finite values")
+    _raise_for_rows((option_prices < 0.0).any(axis=1), "option_prices contains negative values")
+    if option_prices.shape[1] == 2:
+        _raise_for_rows(option_prices[:, 0] > option_prices[:, 1], "option_prices contains bid prices above ask prices")
+
+    _raise_for_rows(~(np.isfinite(expiries) & (expiries > 0.0)), "expiries contains non-positive or non-finite values")
+
+    _raise_for_rows(~np.isfinite(strikes), "strikes contains non-finite values")
+    if strike_unit is not StrikeUnit.log_moneyness:
+        _raise_for_rows(strikes <= 0.0, "strikes contains non-positive values")
+
+    if liquidity_proxies is not None:
+        liquidity_proxies = _check_row_array(liquidity_proxies, name="liquidity_proxies", n_quotes=n_quotes)
+        _raise_for_rows(~np.isfinite(liquidity_proxies), "liquidity_proxies contains non-finite values")
+
+    return expiries
+
+
+def _check_row_array(array: np.ndarray,
+                     name: str,
+                     n_quotes: int) -> np.ndarray:
+
+    array = np.asarray(array)
+    if array.shape != (n_quotes,):
+        raise RuntimeError(f"{name} must be an ({n_quotes},) array like the rows of option_prices, not an array of "
+                           f"shape {array.shape}.")
+
+    return array
+
+
+def _check_expiry_array(array: np.ndarray,
+                        name: str,
+                        n_expiries: int) -> np.ndarray:
+
+    array = np.asarray(array)
+    if array.shape != (n_expiries,):
+        raise RuntimeError(f"{name} must be an ({n_expiries},) array with a value for every unique expiry, not an "
+                           f"array of shape {array.shape}.")
+
+    return array
+
+
+def _raise_for_rows(is_invalid: np.ndarray, message: str):
+    if is_invalid.any():
+        raise RuntimeError(f"{message} in rows {_format_indices(np.flatnonzero(is_invalid))}.")
+
+
+def _raise_for_expiries(is_invalid: np.ndarray, message: str):
+    if is_invalid.any():
+        raise RuntimeError(f"{message} for the expiries with indices {_format_indices(np.flatnonzero(is_invalid))} "
+                           f"(in ascending order of the unique expiries).")
+
+
+def _raise_for_curve_rows(is_invalid: np.ndarray, message: str):
+    if is_invalid.any():
+        raise RuntimeError(f"{message} in curve rows {_format_indices(np.flatnonzero(is_invalid))}.")
+
+
+def _format_indices(indices: np.ndarray) -> str:
+    formatted_indices = ", ".join(str(i) for i in indices[:MAX_REPORTED_ROWS])
+    if indices.size > MAX_REPORTED_ROWS:
+        formatted_indices += f" and {indices.size - MAX_REPORTED_ROWS} more"
 
-    pass  # todo: implement
+    return formatted_indices
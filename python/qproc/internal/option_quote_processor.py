@@ -2,9 +2,11 @@
 
 import numpy as np
 from copy import deepcopy
+from typing import Dict, List
 from ..globals import *
 from .arbitrage_filter import create_filter, ArbitrageFilter
 from .quote_structures import QuoteSurface
+from .bound_query import InternalBoundQuery
 from .quote_transformation import transform_strike, transform_price, transform_quote
 
 COL_NAMES: final = (EXPIRY_KEY, STRIKE_KEY, MID_KEY, BID_KEY, ASK_KEY, LIQ_KEY)
@@ -26,13 +28,47 @@ class InternalQuoteProcessor(OptionQuoteProcessor):
         self._rate_curve: RateCurve = rate_curve
         self._arbitrage_filter: Optional[ArbitrageFilter] = None
 
+        self._forwards_for_expiries: Dict[float, float] = {}
+        self._discount_factors_for_expiries: Dict[float, float] = {}
+        self._tabulate_curves(expiries=quote_surface.expiries())
+
+    def _tabulate_curves(self, expiries: List[float]):
+        """ Precomputes the forwards and discount factors for the given expiries in one vectorized curve evaluation,
+            since these are requested for the same expiries by every transformation and bound computation. """
+
+        expiries_arr = np.array(expiries, dtype=float)
+        forwards = self._forward_curve.get_forward(expiries_arr)
+        discount_factors = self._rate_curve.get_discount_factor(expiries_arr)
+        self._forwards_for_expiries = dict(zip(expiries, forwards))
+        self._discount_factors_for_expiries = dict(zip(expiries, discount_factors))
+
+    def _get_forward(self, expiry: float) -> float:
+        forward = self._forwards_for_expiries.get(expiry)
+        if forward is None:  # expiry not tabulated
+            forward = self._forward_curve.get_forward(expiry)
+
+        return forward
+
+    def _get_discount_factor(self, expiry: float) -> float:
+        discount_factor = self._discount_factors_for_expiries.get(expiry)
+        if discount_factor is None:  # expiry not tabulated
+            discount_factor = self._rate_curve.get_discount_factor(expiry)
+
+        return discount_factor
+
+    def get_forward(self, expiry: float) -> float:
+        return self._get_forward(expiry)
+
+    def get_discount_factor(self, expiry: float) -> float:
+        return self._get_discount_factor(expiry)
+
     def transform_strike(self,
                          expiry: float,
                          strike: ScalarOrArray,
                          input_strike_unit: StrikeUnit,
                          output_strike_unit: StrikeUnit) -> ScalarOrArray:
 
-        forward = self._forward_curve.get_forward(expiry)
+        forward = self._get_forward(expiry)
         return transform_strike(strike=strike, input_strike_unit=input_strike_unit,
                                 output_strike_unit=output_strike_unit, forward=forward)
 
@@ -44,8 +80,8 @@ class InternalQuoteProcessor(OptionQuoteProcessor):
                         output_price_unit: PriceUnit,
                         expiry: float) -> ScalarOrArray:
 
-        forward = self._forward_curve.get_forward(expiry)
-        discount_factor = self._rate_curve.get_discount_factor(expiry)
+        forward = self._get_forward(expiry)
+        discount_factor = self._get_discount_factor(expiry)
         return transform_price(strike=strike, strike_unit=strike_unit, price=price, input_price_unit=input_price_unit,
                                output_price_unit=output_price_unit, expiry=expiry, discount_factor=discount_factor,
                                forward=forward)
@@ -53,7 +89,20 @@ class InternalQuoteProcessor(OptionQuoteProcessor):
     def filter(self,
                filter_type: FilterType,
                smoothing_param: Optional[float] = DEFAULT_SMOOTHING_PARAM,
-               param_grid: Tuple[float] = DEFAULT_SMOOTHING_PARAM_GRID):
+               param_grid: Tuple[float] = DEFAULT_SMOOTHING_PARAM_GRID,
+               cache: Optional[FilterCache] = None):
+
+        if cache is not None:
+            expiries = self._quote_surface.expiries()
+            forwards = np.array([self._get_forward(e) for e in expiries], dtype=float)
+            discount_factors = np.array([self._get_discount_factor(e) for e in expiries], dtype=float)
+            key = cache.get_key(quote_surface=self._quote_surface, forwards=forwards, discount_factors=discount_factors,
+                                filter_type=filter_type, smoothing_param=smoothing_param, param_grid=param_grid)
+            filter_result = cache.load(key, filter_type=filter_type, smoothing_param=smoothing_param,
+                                       param_grid=param_grid)
+            if filter_result is not None:
+                self._quote_surface, self._arbitrage_filter = filter_result
+                return
 
         self.transform_quote_surface(quote_surface=self._quote_surface,
                                      output_price_unit=PriceUnit.normalized_call,
@@ -66,6 +115,9 @@ class InternalQuoteProcessor(OptionQuoteProcessor):
                                                smoothing_param_grid=param_grid)
 
         self._arbitrage_filter.filter()
+        if cache is not None:
+            # the quote surface and the arbitrage-free sets of the filter are stored together
+            cache.store(key, (self._quote_surface, self._arbitrage_filter))
 
     def compute_lower_bound(self,
                             expiry: float,
@@ -92,12 +144,9 @@ class InternalQuoteProcessor(OptionQuoteProcessor):
                        price_unit: PriceUnit,
                        bound_type: BoundType) -> ScalarOrArray:
 
-        if not self._is_filtered():
+        if not self.is_filtered():
             raise RuntimeError("bounds can only be computed if the quotes have been filtered."
                                "Call the 'filter' method before computing the bounds.")
-        elif expiry not in self._quote_surface.expiries():
-            # todo:  make possible for other expiries too.
-            raise RuntimeError(f"expiry {expiry} not in quote expiries {self._quote_surface.expiries()}", )
 
         # map strike to units of quote surface
         transformed_strike = self.transform_strike(expiry=expiry, strike=strike, input_strike_unit=strike_unit,
@@ -111,7 +160,44 @@ class InternalQuoteProcessor(OptionQuoteProcessor):
                                            expiry=expiry)
         return price_bound
 
-    def _is_filtered(self) -> bool:
+    def compute_bounds(self,
+                       expiries: np.ndarray,
+                       strikes: np.ndarray,
+                       strike_unit: StrikeUnit,
+                       price_unit: PriceUnit) -> Tuple[np.ndarray, np.ndarray]:
+
+        if not self.is_filtered():
+            raise RuntimeError("bounds can only be computed if the quotes have been filtered."
+                               "Call the 'filter' method before computing the bounds.")
+
+        expiries = np.asarray(expiries, dtype=float).reshape(-1)
+        strikes = np.asarray(strikes, dtype=float).reshape(-1)
+
+        # both envelopes are evaluated in the compiled kernels of the bound query, including the inversion of the
+        # implied volatilities, instead of one Python call per strike and bound
+        bound_query = self.get_bound_query()
+        lower_bounds = np.full((expiries.size, strikes.size), np.nan)
+        upper_bounds = np.full((expiries.size, strikes.size), np.nan)
+        for i, expiry in enumerate(expiries.tolist()):
+            lower_bounds[i], upper_bounds[i] = bound_query.compute_bounds(expiry=expiry, strikes=strikes,
+                                                                          strike_unit=strike_unit,
+                                                                          price_unit=price_unit)
+
+        return lower_bounds, upper_bounds
+
+    def get_bound_query(self) -> BoundQuery:
+        if not self.is_filtered():
+            raise RuntimeError("bounds can only be computed if the quotes have been filtered."
+                               "Call the 'filter' method before computing the bounds.")
+
+        arbitrage_free_sets = self._arbitrage_filter.get_arbitrage_free_sets()
+        forwards = np.array([self._get_forward(a.expiry) for a in arbitrage_free_sets], dtype=float)
+        discount_factors = np.array([self._get_discount_factor(a.expiry) for a in arbitrage_free_sets], dtype=float)
+        return InternalBoundQuery(arbitrage_free_sets=arbitrage_free_sets, forwards=forwards,
+                                  discount_factors=discount_factors, forward_curve=self._forward_curve,
+                                  rate_curve=self._rate_curve)
+
+    def is_filtered(self) -> bool:
         return self._arbitrage_filter is not None
 
     def _compute_normalized_call_bound(self,
@@ -140,27 +226,51 @@ class InternalQuoteProcessor(OptionQuoteProcessor):
 
     def get_quotes(self,
                    strike_unit: StrikeUnit,
-                   price_unit: PriceUnit) -> pd.DataFrame:
-
-        quote_df = pd.DataFrame(np.nan, index=np.arange(self._quote_surface.n_quotes()), columns=COL_NAMES)
-        trans_quote_surface = self.transform_quote_surface(quote_surface=self._quote_surface,
-                                                           output_price_unit=price_unit,
-                                                           output_strike_unit=strike_unit,
-                                                           in_place=False)
-
-        row_index = 0
-        for qs in trans_quote_surface.slices:
-            for q in qs.quotes:
-                quote_df[EXPIRY_KEY].iloc[row_index] = qs.expiry
-                quote_df[STRIKE_KEY].iloc[row_index] = q.strike
-                quote_df[MID_KEY].iloc[row_index] = q(Side.mid)
-                quote_df[BID_KEY].iloc[row_index] = q.bid
-                quote_df[ASK_KEY].iloc[row_index] = q.ask
-                quote_df[LIQ_KEY].iloc[row_index] = q.liq_proxy
-
-                row_index += 1
-
-        return quote_df
+                   price_unit: PriceUnit) -> "pd.DataFrame":
+
+        import pandas as pd  # imported on first use, as importing pandas is expensive
+
+        expiries, offsets, quote_arrays = self.get_quote_arrays(strike_unit=strike_unit, price_unit=price_unit)
+        columns = {EXPIRY_KEY: np.repeat(expiries, np.diff(offsets))}
+        columns.update((key, quote_arrays[key]) for key in COL_NAMES[1:])
+        return pd.DataFrame(columns, columns=COL_NAMES)
+
+    def get_quote_arrays(self,
+                         strike_unit: StrikeUnit,
+                         price_unit: PriceUnit) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+
+        # slices that the filter emptied are left out, as they have no rows in get_quotes
+        slices = [qs for qs in self._quote_surface.slices if qs.n_quotes() > 0]
+        expiries = np.array([qs.expiry for qs in slices], dtype=float)
+        offsets = np.concatenate(([0], np.cumsum([qs.n_quotes() for qs in slices], dtype=np.int64)))
+        strikes = np.array([q.strike for qs in slices for q in qs.quotes], dtype=float)
+        bids = np.array([q.bid for qs in slices for q in qs.quotes], dtype=float)
+        asks = np.array([q.ask for qs in slices for q in qs.quotes], dtype=float)
+        liq_proxies = np.array([q.liq_proxy for qs in slices for q in qs.quotes], dtype=float)
+
+        trans_strikes = np.empty(strikes.shape)
+        input_strike_unit = self._quote_surface.strike_unit
+        input_price_unit = self._quote_surface.price_unit
+        for i, expiry in enumerate(expiries.tolist()):
+            # every slice is transformed as transform_quote_surface transforms its quotes, for all quotes at once
+            quote_slice = slice(offsets[i], offsets[i + 1])
+            forward = self._get_forward(expiry)
+            discount_factor = self._get_discount_factor(expiry)
+            actual_strikes = transform_strike(strike=strikes[quote_slice], input_strike_unit=input_strike_unit,
+                                              output_strike_unit=StrikeUnit.strike, forward=forward)
+            trans_strikes[quote_slice] = transform_strike(strike=actual_strikes, input_strike_unit=StrikeUnit.strike,
+                                                          output_strike_unit=strike_unit, forward=forward)
+            if price_unit is not input_price_unit:
+                for prices in (bids, asks):
+                    prices[quote_slice] = transform_price(strike=actual_strikes, strike_unit=StrikeUnit.strike,
+                                                          price=prices[quote_slice],
+                                                          input_price_unit=input_price_unit,
+                                                          output_price_unit=price_unit, expiry=expiry,
+                                                          discount_factor=discount_factor, forward=forward)
+
+        mids = np.where(bids == asks, bids, (bids + asks) / 2.0)  # as Quote.mid
+        return expiries, offsets, {STRIKE_KEY: trans_strikes, MID_KEY: mids, BID_KEY: bids, ASK_KEY: asks,
+                                   LIQ_KEY: liq_proxies}
 
     def transform_quote_surface(self,
                                 quote_surface: QuoteSurface,
@@ -175,8 +285,8 @@ class InternalQuoteProcessor(OptionQuoteProcessor):
 
         for qs in trans_quote_surface.slices:
             expiry = qs.expiry
-            forward = self._forward_curve.get_forward(expiry)
-            discount_factor = self._rate_curve.get_discount_factor(expiry)
+            forward = self._get_forward(expiry)
+            discount_factor = self._get_discount_factor(expiry)
             for q in qs.quotes:
                 transform_quote(q=q,
                                 input_price_unit=quote_surface.price_unit,
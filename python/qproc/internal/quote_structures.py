@@ -3,7 +3,7 @@
 import bisect
 from typing import List
 from ..globals import Side, StrikeUnit, PriceUnit
-from computils.sorting_algorithms import find_le
+from .sorting_algorithms import get_sorting_algorithms
 
 
 class Quote:
@@ -111,7 +111,7 @@ class QuoteSurface:
         """ Returns the quote slice for the given expiry; raises a runtime error if expiry is not equivalent. """
 
         dummy_slice_for_indexing = QuoteSlice(expiry=expiry)
-        quote_slice = find_le(self.slices, dummy_slice_for_indexing)
+        quote_slice = get_sorting_algorithms().find_le(self.slices, dummy_slice_for_indexing)
         if quote_slice.expiry != expiry:
             raise RuntimeError("expiry does not match any of the quote expiries")
 
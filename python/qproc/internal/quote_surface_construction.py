@@ -21,6 +21,7 @@ def get_quote_surface(option_prices: np.ndarray,
 
 def _get_sided_prices(option_prices: np.ndarray) -> np.ndarray:
 
+    option_prices = np.asarray(option_prices, dtype=float)  # the quotes are processed at float64, whatever the input
     are_prices_sided = False
     are_prices_2d = len(option_prices.shape) == 2
     if are_prices_2d:
@@ -38,27 +39,26 @@ def _fill_quote_surface(sided_option_prices,
                         expiries: np.ndarray,
                         liquidity_proxies: np.ndarray,
                         quote_surface: QuoteSurface):
-
-    n_quotes = sided_option_prices.shape[0]
-
-    current_expiry = -np.inf
-    quote_slice: Optional[QuoteSlice] = None
-    qslice_index = -1
-
-    for i in range(n_quotes):
-        expiry = expiries[i]
-        if expiry < current_expiry:
-            raise RuntimeError("option_prices must be passed in ascending order w.r.t. their expiry.")
-
-        elif expiry > current_expiry:
-            qslice_index += 1
-            current_expiry = expiry
-            quote_slice = QuoteSlice(expiry=expiry)
-
-            quote_surface.add_slice(quote_slice)
-
-        bid = sided_option_prices[i, 0]
-        ask = sided_option_prices[i, 1]
-        strike = strikes[i]
-        q = Quote(bid=bid, ask=ask, strike=strike, liq_proxy=liquidity_proxies[i])
-        quote_slice.add_quote(q)
+    """ Fills the quote surface with slices of quotes sorted by their strikes, in the order of bisect.insort_left,
+        i.e., quotes with equal strikes are ordered from the last to the first input row. """
+
+    expiries = np.asarray(expiries)
+    reversed_row_indices = np.arange(expiries.size)[::-1]
+    order = np.lexsort((reversed_row_indices, strikes, expiries))
+
+    sorted_expiries = expiries[order]
+    sorted_bids = sided_option_prices[order, 0]
+    sorted_asks = sided_option_prices[order, 1]
+    sorted_strikes = np.asarray(strikes)[order]
+    sorted_liquidity_proxies = np.asarray(liquidity_proxies, dtype=float)[order]
+
+    slice_starts = np.concatenate(([0], np.flatnonzero(np.diff(sorted_expiries)) + 1))
+    slice_ends = np.append(slice_starts[1:], sorted_expiries.size)
+
+    for start, end in zip(slice_starts, slice_ends):
+        quote_slice = QuoteSlice(expiry=sorted_expiries[start])
+        quote_slice.quotes = [Quote(bid=bid, ask=ask, strike=strike, liq_proxy=liq_proxy)
+                              for bid, ask, strike, liq_proxy in zip(sorted_bids[start:end], sorted_asks[start:end],
+                                                                     sorted_strikes[start:end],
+                                                                     sorted_liquidity_proxies[start:end])]
+        quote_surface.slices.append(quote_slice)
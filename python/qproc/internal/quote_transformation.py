@@ -3,8 +3,7 @@
 import numpy as np
 from typing import final
 from copy import copy, deepcopy
-from computils import ScalarOrArray
-from ..globals import StrikeUnit, PriceUnit
+from ..globals import StrikeUnit, PriceUnit, ScalarOrArray
 from .quote_structures import Quote
 from .volatility_functions import implied_vol_for_discounted_option, discounted_black
 from .zero_strike_computation import compute_zero_strike_call_value
@@ -0,0 +1,135 @@
+""" This module implements the requests of the qproc service, which are processed in batches by the worker processes.
+
+    Every request carries the option data of a surface or the curves it needs, such that the workers are stateless. The
+    units and filter types are passed by the names of their enum members. """
+
+import numpy as np
+from typing import final, Dict, List, Tuple, Any
+from ..globals import *
+
+FILTER_REQUEST: final = "filter"
+BOUND_REQUEST: final = "bound"
+PRICE_REQUEST: final = "price"
+
+STATUS_KEY: final = "status"
+MESSAGE_KEY: final = "message"
+STATUS_OK: final = "ok"
+STATUS_ERROR: final = "error"
+
+Message = Tuple[Dict[str, Any], Dict[str, np.ndarray]]
+
+
+def process_batch(requests: List[Message]) -> List[Message]:
+    """ Processes the requests of a batch in order; a failing request results in an error response, and does not affect
+        the other requests of the batch. """
+
+    responses = []
+    for header, arrays in requests:
+        try:
+            response_arrays = process_request(header, arrays)
+            responses.append(({STATUS_KEY: STATUS_OK}, response_arrays))
+        except Exception as exception:
+            responses.append(({STATUS_KEY: STATUS_ERROR, MESSAGE_KEY: f"{type(exception).__name__}: {exception}"}, {}))
+
+    return responses
+
+
+def process_request(header: Dict[str, Any],
+                    arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+
+    request_type = header.get("request")
+    if request_type == FILTER_REQUEST:
+        return _process_filter_request(header, arrays)
+    elif request_type == BOUND_REQUEST:
+        return _process_bound_request(header, arrays)
+    elif request_type == PRICE_REQUEST:
+        return _process_price_request(header, arrays)
+    else:
+        raise RuntimeError(f"Unhandled request {request_type}.")
+
+
+def _process_filter_request(header: Dict[str, Any],
+                            arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """ Filters the surface, and returns the filtered quotes in the units of the input. """
+
+    q_proc = _create_filtered_q_proc(header, arrays)
+    quotes = q_proc.get_quotes(strike_unit=StrikeUnit[header["strike_unit"]],
+                               price_unit=PriceUnit[header["price_unit"]])
+
+    return {"expiries": quotes[EXPIRY_KEY].to_numpy(), "strikes": quotes[STRIKE_KEY].to_numpy(),
+            "bids": quotes[BID_KEY].to_numpy(), "asks": quotes[ASK_KEY].to_numpy(),
+            "liquidity_proxies": quotes[LIQ_KEY].to_numpy()}
+
+
+def _process_bound_request(header: Dict[str, Any],
+                           arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """ Filters the surface, and returns the lower and upper bounds for the query expiries and strikes. """
+
+    bound_query = _create_filtered_q_proc(header, arrays).get_bound_query()
+    query_expiries = arrays["query_expiries"]
+    query_strikes = arrays["query_strikes"].astype(float)
+    query_strike_unit = StrikeUnit[header["query_strike_unit"]]
+    query_price_unit = PriceUnit[header["query_price_unit"]]
+
+    lower_bounds = np.full(query_strikes.shape, np.nan)
+    upper_bounds = np.full(query_strikes.shape, np.nan)
+    for expiry in np.unique(query_expiries):
+        is_expiry = query_expiries == expiry
+        lower_bounds[is_expiry] = bound_query.compute_lower_bound(expiry=float(expiry),
+                                                                  strike=query_strikes[is_expiry],
+                                                                  strike_unit=query_strike_unit,
+                                                                  price_unit=query_price_unit)
+        upper_bounds[is_expiry] = bound_query.compute_upper_bound(expiry=float(expiry),
+                                                                  strike=query_strikes[is_expiry],
+                                                                  strike_unit=query_strike_unit,
+                                                                  price_unit=query_price_unit)
+
+    return {"lower_bounds": lower_bounds, "upper_bounds": upper_bounds}
+
+
+def _process_price_request(header: Dict[str, Any],
+                           arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """ Transforms the query prices between price units, using curves through the given forwards and rates. """
+
+    from ..factory import create_forward_curve, create_rate_curve
+    from .quote_transformation import transform_price
+
+    forward_curve = create_forward_curve(spot=header["spot"], times=arrays["curve_times"], forwards=arrays["forwards"])
+    rate_curve = create_rate_curve(times=arrays["curve_times"], zero_rates=arrays["rates"])
+    query_expiries = arrays["query_expiries"]
+    query_strikes = arrays["query_strikes"].astype(float)
+    query_prices = arrays["query_prices"].astype(float)
+
+    prices = np.full(query_prices.shape, np.nan)
+    for expiry in np.unique(query_expiries):
+        is_expiry = query_expiries == expiry
+        prices[is_expiry] = transform_price(strike=query_strikes[is_expiry],
+                                            strike_unit=StrikeUnit[header["strike_unit"]],
+                                            price=query_prices[is_expiry],
+                                            input_price_unit=PriceUnit[header["input_price_unit"]],
+                                            output_price_unit=PriceUnit[header["output_price_unit"]],
+                                            expiry=float(expiry),
+                                            discount_factor=float(rate_curve.get_discount_factor(float(expiry))),
+                                            forward=float(forward_curve.get_forward(float(expiry))))
+
+    return {"prices": prices}
+
+
+def _create_filtered_q_proc(header: Dict[str, Any],
+                            arrays: Dict[str, np.ndarray]) -> OptionQuoteProcessor:
+
+    from ..factory import create_q_proc
+
+    q_proc = create_q_proc(forwards=arrays["forwards"],
+                           rates=arrays["rates"],
+                           option_prices=arrays["option_prices"].astype(float),
+                           price_unit=PriceUnit[header["price_unit"]],
+                           expiries=arrays["expiries"],
+                           strikes=arrays["strikes"].astype(float),
+                           strike_unit=StrikeUnit[header["strike_unit"]],
+                           liquidity_proxies=arrays.get("liquidity_proxies"),
+                           spot=header.get("spot", np.nan))
+    q_proc.filter(filter_type=FilterType[header["filter_type"]],
+                  smoothing_param=header.get("smoothing_param", DEFAULT_SMOOTHING_PARAM))
+
+    return q_proc
@@ -0,0 +1,64 @@
+""" This module implements the message format of the qproc service. A message consists of a fixed-size prefix with the
+    lengths of the header and the payload, a JSON header, and a payload with the raw bytes of the arrays of the message,
+    which are described in the header by their name, dtype and shape. """
+
+import json
+import struct
+import socket
+import numpy as np
+from typing import final, Dict, Tuple, Any
+
+PREFIX_FORMAT: final = "<IQ"  # header length, payload length
+PREFIX_SIZE: final = struct.calcsize(PREFIX_FORMAT)
+ARRAYS_KEY: final = "arrays"
+
+
+def send_message(sock: socket.socket,
+                 header: Dict[str, Any],
+                 arrays: Dict[str, np.ndarray]):
+
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    header = dict(header)
+    header[ARRAYS_KEY] = [(name, array.dtype.str, array.shape) for name, array in arrays.items()]
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    payload_length = sum(array.nbytes for array in arrays.values())
+    sock.sendall(struct.pack(PREFIX_FORMAT, len(header_bytes), payload_length) + header_bytes)
+    for array in arrays.values():
+        sock.sendall(memoryview(array).cast("B"))
+
+
+def receive_message(sock: socket.socket) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """ Receives a message, and raises an EOFError if the connection is closed before the start of the message. """
+
+    prefix = _receive_exactly(sock, PREFIX_SIZE, allow_eof=True)
+    header_length, payload_length = struct.unpack(PREFIX_FORMAT, prefix)
+    header = json.loads(_receive_exactly(sock, header_length).decode("utf-8"))
+    payload = _receive_exactly(sock, payload_length)
+
+    arrays = {}
+    offset = 0
+    for name, dtype, shape in header.pop(ARRAYS_KEY):
+        array = np.frombuffer(payload, dtype=np.dtype(dtype), count=int(np.prod(shape, dtype=int)), offset=offset)
+        arrays[name] = array.reshape(shape)
+        offset += array.nbytes
+
+    return header, arrays
+
+
+def _receive_exactly(sock: socket.socket,
+                     n_bytes: int,
+                     allow_eof: bool = False) -> bytes:
+
+    buffer = bytearray(n_bytes)
+    view = memoryview(buffer)
+    n_received = 0
+    while n_received < n_bytes:
+        n = sock.recv_into(view[n_received:])
+        if n == 0:
+            if allow_eof and n_received == 0:
+                raise EOFError("connection closed")
+            raise RuntimeError("connection closed in the middle of a message.")
+        n_received += n
+
+    return bytes(buffer)
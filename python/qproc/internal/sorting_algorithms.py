@@ -0,0 +1,15 @@
+""" This module gives access to the search functions on sorted sequences of computils.sorting_algorithms, which is
+    imported on first use, as importing computils loads numba and scipy. """
+
+_sorting_algorithms = None
+
+
+def get_sorting_algorithms():
+    """ Returns the computils.sorting_algorithms module, which provides find_lt, find_le, find_gt and find_ge. """
+
+    global _sorting_algorithms
+
+    if _sorting_algorithms is None:
+        from computils import sorting_algorithms
+        _sorting_algorithms = sorting_algorithms
+    return _sorting_algorithms
@@ -6,10 +6,26 @@
 
 
 from math import inf
-from py_lets_be_rational.lets_be_rational import black, \
-    implied_volatility_from_a_transformed_rational_guess
-from py_lets_be_rational.exceptions import AboveMaximumException, \
-    BelowIntrinsicException
+
+AOT_KERNEL_MODULE_NAME = "aot_kernels"
+
+_kernels = None
+
+
+def get_kernels():
+    """ Returns the Black function and implied volatility solver, which are taken from the extension module built by
+        qproc.compile_aot_kernels if it exists, and from py_lets_be_rational otherwise. Both are imported on first use,
+        as py_lets_be_rational loads numba when it is imported. """
+
+    global _kernels
+
+    if _kernels is None:
+        try:
+            from . import aot_kernels as kernel_module
+        except ImportError:
+            from py_lets_be_rational import lets_be_rational as kernel_module
+        _kernels = kernel_module.black, kernel_module.implied_volatility_from_a_transformed_rational_guess
+    return _kernels
 
 
 def implied_vol_for_discounted_option(discounted_option_price, forward, strike, expiry, discount_factor,
@@ -19,20 +35,27 @@ def implied_vol_for_discounted_option(discounted_option_price, forward, strike,
         interrupted after round-off errors or unacceptable starting data that violates the theoretical European call
         price bounds. """
 
+    _, implied_volatility_from_a_transformed_rational_guess = get_kernels()
+
     undiscounted_price = discounted_option_price / discount_factor
 
     try:
         implied_vol = implied_volatility_from_a_transformed_rational_guess(undiscounted_price, forward, strike, expiry,
                                                                            call_one_else_put_minus_one)
-    except AboveMaximumException:
-        implied_vol = inf
-    except BelowIntrinsicException:
-        implied_vol = 0.0
+    except Exception as exception:
+        # the exception classes are imported here, as the extension module only loads py_lets_be_rational on a raise
+        from py_lets_be_rational.exceptions import AboveMaximumException, BelowIntrinsicException
+
+        if isinstance(exception, AboveMaximumException):
+            implied_vol = inf
+        elif isinstance(exception, BelowIntrinsicException):
+            implied_vol = 0.0
+        else:
+            raise
     return implied_vol
 
 
 def discounted_black(forward, strike, vol, expiry, discount_factor, call_one_else_put_minus_one):
-    return discount_factor*black(forward, strike, vol, expiry, call_one_else_put_minus_one)
-
-
+    black, _ = get_kernels()
 
+    return discount_factor*black(forward, strike, vol, expiry, call_one_else_put_minus_one)
@@ -0,0 +1,127 @@
+""" This module allows for preparing the numba kernels of py_lets_be_rational, which compute the Black prices and
+    implied volatilities, before the first quotes are transformed. Without preparation, the first transformation in a
+    fresh process compiles the kernels or loads them from the numba cache, which takes orders of magnitude longer than
+    the transformation itself.
+
+    A process pool can share the compiled kernels by calling warm_up_kernels with a common cache directory in the parent
+    process, and passing warm_up_kernels with the same directory as initializer to the pool. Alternatively,
+    compile_aot_kernels builds an extension module that is used by all processes without any compilation at run time.
+    """
+
+import os
+import sys
+import numpy as np
+from typing import Optional, final
+from .globals import PriceUnit
+from .internal.volatility_functions import AOT_KERNEL_MODULE_NAME, implied_vol_for_discounted_option, \
+    discounted_black
+from .internal.compiled_solver import get_compiled_implied_vol_solver
+
+NUMBA_CACHE_DIR_KEY: final = "NUMBA_CACHE_DIR"
+KERNEL_MODULE_NAME: final = "py_lets_be_rational.lets_be_rational"
+AOT_KERNEL_OUTPUT_DIR: final = os.path.join(os.path.dirname(os.path.abspath(__file__)), "internal")
+AOT_KERNEL_SIGNATURE: final = "f8(f8, f8, f8, f8, f8)"
+WARM_UP_LOG_MONEYNESS: final = np.linspace(-3.0, 3.0, 13)
+WARM_UP_TOTAL_VOLS: final = np.array([0.01, 0.05, 0.2, 0.5, 1.0, 2.0, 4.0])
+
+
+def set_kernel_cache_dir(cache_dir: str):
+    """ Sets the directory in which numba caches the compiled kernels. The directory is passed on to processes that are
+        started afterwards, and must be set before the kernels are first used in the current process.
+
+    :param cache_dir:
+    :return:
+    """
+
+    cache_dir = os.path.abspath(cache_dir)
+    if KERNEL_MODULE_NAME in sys.modules and _get_numba_cache_dir() != cache_dir:
+        raise RuntimeError("The kernel cache directory must be set before the kernels are first used.")
+
+    os.makedirs(cache_dir, exist_ok=True)
+    os.environ[NUMBA_CACHE_DIR_KEY] = cache_dir
+    if "numba" in sys.modules:
+        from numba.core import config
+        config.CACHE_DIR = cache_dir
+
+
+def warm_up_kernels(cache_dir: Optional[str] = None):
+    """ Compiles the kernels, or loads them from the cache, by transforming prices over a grid of moneyness and
+        volatility levels that covers every branch of the implied volatility solver.
+
+    :param cache_dir: directory in which numba caches the compiled kernels; the default numba location is used if None.
+    :return:
+    """
+
+    if cache_dir is not None:
+        set_kernel_cache_dir(cache_dir)
+
+    forward, expiry, discount_factor = 1.0, 1.0, 1.0
+    for log_moneyness in WARM_UP_LOG_MONEYNESS:
+        strike = forward * np.exp(log_moneyness)
+        for total_vol in WARM_UP_TOTAL_VOLS:
+            for call_one_else_put_minus_one in (1, 1.0):  # the kernels are compiled separately for integers and floats
+                price = discounted_black(forward, strike, total_vol, expiry, discount_factor,
+                                         call_one_else_put_minus_one)
+                implied_vol_for_discounted_option(price, forward, strike, expiry, discount_factor,
+                                                  call_one_else_put_minus_one)
+
+    implied_vol_for_discounted_option(0.0, forward, forward, expiry, discount_factor, 1)  # below intrinsic value
+    implied_vol_for_discounted_option(2.0 * forward, forward, forward, expiry, discount_factor, 1)  # above maximum
+
+    _warm_up_bound_kernels()
+
+
+def compile_aot_kernels(output_dir: str = AOT_KERNEL_OUTPUT_DIR) -> str:
+    """ Compiles the Black function and implied volatility solver of py_lets_be_rational ahead of time into an extension
+        module, which is used instead of the numba kernels when it is found in qproc.internal. The extension module is
+        specific to the platform and Python version, and must be rebuilt when py_lets_be_rational changes.
+
+    :param output_dir: directory of the extension module; the extension module is only used from qproc.internal.
+    :return: the path of the extension module.
+    """
+
+    try:
+        from numba.pycc import CC
+    except ImportError:
+        raise RuntimeError("numba is required for compiling the kernels ahead of time.")
+
+    from py_lets_be_rational.lets_be_rational import black
+    implied_vol = get_compiled_implied_vol_solver()
+
+    def aot_black(forward, strike, sigma, expiry, call_one_else_put_minus_one):
+        return black(forward, strike, sigma, expiry, call_one_else_put_minus_one)
+
+    def aot_implied_vol(price, forward, strike, expiry, call_one_else_put_minus_one):
+        return implied_vol(price, forward, strike, expiry, call_one_else_put_minus_one)
+
+    cc = CC(AOT_KERNEL_MODULE_NAME)
+    cc.output_dir = output_dir
+    cc.export("black", AOT_KERNEL_SIGNATURE)(aot_black)
+    cc.export("implied_volatility_from_a_transformed_rational_guess", AOT_KERNEL_SIGNATURE)(aot_implied_vol)
+    cc.compile()
+
+    return os.path.join(output_dir, cc.output_file)
+
+
+def _warm_up_bound_kernels():
+    """ Compiles the kernels of the bound queries, or loads them from the cache, for every price unit. """
+
+    from .internal import bound_kernels
+
+    set_strikes = np.array([0.0, 1.0, np.inf])
+    set_mids = np.array([1.0, 0.1, 0.0])
+    moneyness = np.exp(WARM_UP_LOG_MONEYNESS)
+    price_bounds = np.empty(moneyness.shape)
+    for price_unit in PriceUnit:
+        for is_lower_bound in (True, False):
+            bound_kernels.compute_price_bounds(set_strikes, set_mids, moneyness, moneyness, price_unit.value,
+                                               is_lower_bound, 1.0, 1.0, 1.0, price_bounds)
+
+
+def _get_numba_cache_dir() -> Optional[str]:
+    if "numba" in sys.modules:
+        from numba.core import config
+        cache_dir = config.CACHE_DIR
+    else:
+        cache_dir = os.environ.get(NUMBA_CACHE_DIR_KEY)
+    return os.path.abspath(cache_dir) if cache_dir else None
@@ -1,6 +1,5 @@
 """ This module allows for plotting quotes in terms of a chosen strike and price unit. """
 
-import matplotlib.pyplot as plt
 from .globals import *
 
 
@@ -10,6 +9,8 @@ def plot_quotes(quote_processor: OptionQuoteProcessor,
                 spt: SurfacePlotType,
                 points_else_lines: bool = True):
 
+    import matplotlib.pyplot as plt  # imported on first use, as importing matplotlib is expensive
+
     plt.figure()
     plot_func = plt.scatter if points_else_lines else plt.plot
 
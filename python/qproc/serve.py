@@ -0,0 +1,220 @@
+""" This module implements a local service that filters quote surfaces, computes bounds and transforms prices for client
+    processes, which thereby avoid the import and compilation costs of qproc and do not need their own process pools.
+
+    The service listens on a Unix domain socket or on a localhost TCP port. Requests that arrive within a short window
+    are grouped into batches, which are split over the worker processes with warm kernels. Run the service with
+
+        python -m qproc.serve --socket /tmp/qproc.sock
+        python -m qproc.serve --port 8765
+
+    and send requests with qproc.ServiceClient. """
+
+import os
+import time
+import queue
+import signal
+import argparse
+import multiprocessing
+import threading
+import socketserver
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import final, Optional, List, Tuple, Union
+from .kernels import warm_up_kernels
+from .internal.service_protocol import send_message, receive_message
+from .internal.service_handlers import Message, process_batch, STATUS_KEY, STATUS_ERROR, MESSAGE_KEY
+
+LOCALHOST: final = "127.0.0.1"
+DEFAULT_BATCH_WINDOW: final = 0.002  # seconds
+DEFAULT_MAX_BATCH_SIZE: final = 32
+
+Address = Union[str, Tuple[str, int]]  # path of a Unix domain socket, or localhost and port
+
+
+class BatchDispatcher:
+    def __init__(self,
+                 n_workers: int,
+                 kernel_cache_dir: Optional[str] = None,
+                 batch_window: float = DEFAULT_BATCH_WINDOW,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE):
+        """ Groups the requests that arrive within batch_window seconds after a first request into batches of at most
+            max_batch_size requests. Every batch is split into at most n_workers chunks of consecutive requests, each
+            of which is processed as a single task of a worker process: the requests share no work, such that batching
+            only saves round trips to the workers, and must not keep the other workers idle.
+
+        :param n_workers: number of worker processes; the batches are processed in the dispatching thread if 0.
+        :param kernel_cache_dir: numba cache directory shared by the worker processes.
+        :param batch_window:
+        :param max_batch_size:
+        """
+
+        self.n_workers: int = n_workers
+        self.batch_window: float = batch_window
+        self.max_batch_size: int = max_batch_size
+        self._requests: queue.Queue = queue.Queue()
+
+        if n_workers > 0:
+            # the workers are spawned rather than forked, as forking a process with threads may copy held locks
+            self._executor: Optional[ProcessPoolExecutor] = ProcessPoolExecutor(
+                max_workers=n_workers, mp_context=multiprocessing.get_context("spawn"), initializer=warm_up_kernels,
+                initargs=(kernel_cache_dir,))
+            for warm_up_future in [self._executor.submit(time.sleep, 0.0) for _ in range(n_workers)]:
+                warm_up_future.result()  # starts the workers, which warm up their kernels
+        else:
+            self._executor = None
+            warm_up_kernels(kernel_cache_dir)
+
+        self._thread: threading.Thread = threading.Thread(target=self._dispatch, daemon=True)
+        self._thread.start()
+
+    def submit(self, request: Message) -> Future:
+        future = Future()
+        self._requests.put((request, future))
+        return future
+
+    def shutdown(self):
+        self._requests.put(None)
+        self._thread.join()
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def _dispatch(self):
+        while True:
+            batch = self._collect_batch()
+            if batch is None:
+                return
+
+            if self._executor is None:
+                _set_results([future for _, future in batch], process_batch([request for request, _ in batch]))
+            else:
+                for chunk in _split_batch(batch, n_chunks=self.n_workers):
+                    futures = [future for _, future in chunk]
+                    chunk_future = self._executor.submit(process_batch, [request for request, _ in chunk])
+                    chunk_future.add_done_callback(lambda f, futures=futures: _set_chunk_results(futures, f))
+
+    def _collect_batch(self) -> Optional[List[Tuple[Message, Future]]]:
+        """ Waits for a request, and collects the requests that follow within the batch window; returns None on
+            shutdown. """
+
+        item = self._requests.get()
+        if item is None:
+            return None
+
+        batch = [item]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch_size:
+            try:
+                item = self._requests.get(timeout=max(deadline - time.monotonic(), 0.0))
+            except queue.Empty:
+                break
+            if item is None:
+                self._requests.put(None)  # shut down after this batch
+                break
+            batch.append(item)
+
+        return batch
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    """ Handles the requests of a client connection in order, until the client closes the connection. """
+
+    def handle(self):
+        while True:
+            try:
+                request = receive_message(self.request)
+            except EOFError:
+                return
+
+            header, arrays = self.server.dispatcher.submit(request).result()
+            send_message(self.request, header, arrays)
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def create_server(address: Address,
+                  dispatcher: BatchDispatcher) -> socketserver.BaseServer:
+    """ Returns a server that passes the requests of its clients to the dispatcher; call serve_forever to serve. """
+
+    if isinstance(address, str):
+        if os.path.exists(address):
+            os.remove(address)
+        server = _UnixServer(address, _RequestHandler)
+    else:
+        server = _TCPServer(address, _RequestHandler)
+
+    server.dispatcher = dispatcher
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serves qproc requests over a local socket.")
+    transport = parser.add_mutually_exclusive_group(required=True)
+    transport.add_argument("--socket", help="path of the Unix domain socket")
+    transport.add_argument("--port", type=int, help="localhost TCP port")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--kernel-cache-dir", default=None, help="numba cache directory shared by the workers")
+    parser.add_argument("--batch-window", type=float, default=DEFAULT_BATCH_WINDOW, help="batch window in seconds")
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    args = parser.parse_args()
+
+    address = args.socket if args.socket is not None else (LOCALHOST, args.port)
+    dispatcher = BatchDispatcher(n_workers=args.workers, kernel_cache_dir=args.kernel_cache_dir,
+                                 batch_window=args.batch_window, max_batch_size=args.max_batch_size)
+    server = create_server(address, dispatcher)
+    signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)  # shut down the workers on termination too
+    print(f"qproc service listening on {address} with {args.workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        dispatcher.shutdown()
+
+
+def _raise_keyboard_interrupt(signal_number, frame):
+    raise KeyboardInterrupt
+
+
+def _split_batch(batch: List[Tuple[Message, Future]],
+                 n_chunks: int) -> List[List[Tuple[Message, Future]]]:
+    """ Splits the batch into min(n_chunks, len(batch)) chunks of consecutive requests, whose sizes differ by at most
+        one. """
+
+    n_chunks = min(n_chunks, len(batch))
+    chunk_size, n_larger_chunks = divmod(len(batch), n_chunks)
+    chunks = []
+    start = 0
+    for i in range(n_chunks):
+        end = start + chunk_size + (1 if i < n_larger_chunks else 0)
+        chunks.append(batch[start:end])
+        start = end
+
+    return chunks
+
+
+def _set_results(futures: List[Future], responses: List[Message]):
+    for future, response in zip(futures, responses):
+        future.set_result(response)
+
+
+def _set_chunk_results(futures: List[Future], chunk_future: Future):
+    """ Passes the responses of a chunk of a batch to its requests; if the worker failed, every request of the chunk
+        gets an error response. """
+
+    exception = chunk_future.exception()
+    if exception is None:
+        _set_results(futures, chunk_future.result())
+    else:
+        error_response = ({STATUS_KEY: STATUS_ERROR, MESSAGE_KEY: f"{type(exception).__name__}: {exception}"}, {})
+        _set_results(futures, [error_response] * len(futures))
+
+
+if __name__ == "__main__":
+    main()
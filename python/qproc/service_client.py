@@ -0,0 +1,150 @@
+""" This module implements the client of the qproc service (see qproc.serve). """
+
+import socket
+import numpy as np
+from typing import Dict, Optional, Union, Tuple
+from .globals import *
+from .internal.service_protocol import send_message, receive_message
+from .internal.service_handlers import FILTER_REQUEST, BOUND_REQUEST, PRICE_REQUEST, STATUS_KEY, STATUS_OK, MESSAGE_KEY
+
+
+class ServiceClient:
+    def __init__(self, address: Union[str, Tuple[str, int]]):
+        """ Connects to a qproc service; requests are sent over a single connection, one at a time.
+
+        :param address: path of the Unix domain socket, or localhost and port of the service.
+        """
+
+        if isinstance(address, str):
+            self._socket: socket.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._socket.connect(address)
+
+    def close(self):
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def filter(self,
+               forwards: np.ndarray,
+               rates: np.ndarray,
+               option_prices: np.ndarray,
+               price_unit: PriceUnit,
+               expiries: np.ndarray,
+               strikes: np.ndarray,
+               filter_type: FilterType,
+               strike_unit: StrikeUnit = StrikeUnit.strike,
+               liquidity_proxies: Optional[np.ndarray] = None,
+               spot: float = np.nan,
+               smoothing_param: Optional[float] = DEFAULT_SMOOTHING_PARAM) -> Dict[str, np.ndarray]:
+        """ Filters the quotes as OptionQuoteProcessor.filter does, with the arguments of create_q_proc.
+
+        :return: the filtered quotes in the input units, as arrays with keys 'expiries', 'strikes', 'bids', 'asks' and
+            'liquidity_proxies'.
+        """
+
+        header, arrays = _get_surface_message(forwards=forwards, rates=rates, option_prices=option_prices,
+                                              price_unit=price_unit, expiries=expiries, strikes=strikes,
+                                              strike_unit=strike_unit, liquidity_proxies=liquidity_proxies, spot=spot,
+                                              filter_type=filter_type, smoothing_param=smoothing_param)
+        header["request"] = FILTER_REQUEST
+        return self._send_request(header, arrays)
+
+    def compute_bounds(self,
+                       forwards: np.ndarray,
+                       rates: np.ndarray,
+                       option_prices: np.ndarray,
+                       price_unit: PriceUnit,
+                       expiries: np.ndarray,
+                       strikes: np.ndarray,
+                       filter_type: FilterType,
+                       query_expiries: np.ndarray,
+                       query_strikes: np.ndarray,
+                       query_strike_unit: StrikeUnit,
+                       query_price_unit: PriceUnit,
+                       strike_unit: StrikeUnit = StrikeUnit.strike,
+                       liquidity_proxies: Optional[np.ndarray] = None,
+                       spot: float = np.nan,
+                       smoothing_param: Optional[float] = DEFAULT_SMOOTHING_PARAM) -> Tuple[np.ndarray, np.ndarray]:
+        """ Filters the quotes, and computes the bounds for the query points, as OptionQuoteProcessor does.
+
+        :return: lower and upper bounds for the query points, in the query price unit.
+        """
+
+        header, arrays = _get_surface_message(forwards=forwards, rates=rates, option_prices=option_prices,
+                                              price_unit=price_unit, expiries=expiries, strikes=strikes,
+                                              strike_unit=strike_unit, liquidity_proxies=liquidity_proxies, spot=spot,
+                                              filter_type=filter_type, smoothing_param=smoothing_param)
+        header.update(request=BOUND_REQUEST, query_strike_unit=query_strike_unit.name,
+                      query_price_unit=query_price_unit.name)
+        arrays.update(query_expiries=np.asarray(query_expiries, dtype=float),
+                      query_strikes=np.asarray(query_strikes, dtype=float))
+
+        response_arrays = self._send_request(header, arrays)
+        return response_arrays["lower_bounds"], response_arrays["upper_bounds"]
+
+    def transform_prices(self,
+                         spot: float,
+                         curve_times: np.ndarray,
+                         forwards: np.ndarray,
+                         rates: np.ndarray,
+                         query_expiries: np.ndarray,
+                         query_strikes: np.ndarray,
+                         query_prices: np.ndarray,
+                         strike_unit: StrikeUnit,
+                         input_price_unit: PriceUnit,
+                         output_price_unit: PriceUnit) -> np.ndarray:
+        """ Transforms the query prices to the output price unit, using the forward and rate curves through the given
+            forwards and zero rates at the curve times.
+
+        :return: the transformed prices.
+        """
+
+        header = {"request": PRICE_REQUEST, "spot": float(spot), "strike_unit": strike_unit.name,
+                  "input_price_unit": input_price_unit.name, "output_price_unit": output_price_unit.name}
+        arrays = {"curve_times": np.asarray(curve_times, dtype=float), "forwards": np.asarray(forwards, dtype=float),
+                  "rates": np.asarray(rates, dtype=float), "query_expiries": np.asarray(query_expiries, dtype=float),
+                  "query_strikes": np.asarray(query_strikes, dtype=float),
+                  "query_prices": np.asarray(query_prices, dtype=float)}
+
+        return self._send_request(header, arrays)["prices"]
+
+    def _send_request(self,
+                      header: dict,
+                      arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+
+        send_message(self._socket, header, arrays)
+        response_header, response_arrays = receive_message(self._socket)
+        if response_header[STATUS_KEY] != STATUS_OK:
+            raise RuntimeError(f"qproc service error: {response_header[MESSAGE_KEY]}")
+
+        return response_arrays
+
+
+def _get_surface_message(forwards: np.ndarray,
+                         rates: np.ndarray,
+                         option_prices: np.ndarray,
+                         price_unit: PriceUnit,
+                         expiries: np.ndarray,
+                         strikes: np.ndarray,
+                         strike_unit: StrikeUnit,
+                         liquidity_proxies: Optional[np.ndarray],
+                         spot: float,
+                         filter_type: FilterType,
+                         smoothing_param: Optional[float]) -> Tuple[dict, Dict[str, np.ndarray]]:
+
+    header = {"price_unit": price_unit.name, "strike_unit": strike_unit.name, "spot": float(spot),
+              "filter_type": filter_type.name, "smoothing_param": smoothing_param}
+    arrays = {"forwards": np.asarray(forwards, dtype=float), "rates": np.asarray(rates, dtype=float),
+              "option_prices": np.asarray(option_prices, dtype=float), "expiries": np.asarray(expiries, dtype=float),
+              "strikes": np.asarray(strikes, dtype=float)}
+    if liquidity_proxies is not None:
+        arrays["liquidity_proxies"] = np.asarray(liquidity_proxies, dtype=float)
+
+    return header, arrays
@@ -0,0 +1,311 @@
+""" This module runs a historical backtest over a history store: for every date in a date range, the option data set is
+    filtered, volatility surfaces are calibrated for the given smile interpolation types, and the surfaces are scored
+    by their pricing errors with respect to the raw quotes.
+
+    The dates are processed by a pool of worker processes, and the results of every date are appended to a columnar
+    output directory as soon as the date is done. The output is the checkpoint of the run: a run that is interrupted
+    resumes with the dates that are not in the output yet. Run the backtest with
+
+        python -m scripts.backtest --store STORE_DIR --output OUTPUT_DIR --start 2018-01-01 --end 2018-12-31
+
+    and load the results with load_backtest_results. """
+
+import os
+import json
+import time
+import argparse
+import multiprocessing
+import numpy as np
+from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple, final
+
+import qproc
+import volsurface as vs
+from data import HistoryStore
+
+OUTPUT_FORMAT_VERSION: final = 1
+METADATA_FILE_NAME: final = "metadata.json"
+DATE_UNIT: final = "datetime64[D]"
+
+DATES_KEY: final = "dates"
+METHODS_KEY: final = "methods"  # index into the method names of the metadata
+N_QUOTES_KEY: final = "n_quotes"
+MAE_KEY: final = "mae"
+RMSE_KEY: final = "rmse"
+SECONDS_KEY: final = "seconds"  # processing time of the date, shared by its methods
+
+COLUMN_DTYPES: final = {DATES_KEY: np.int64,
+                        METHODS_KEY: np.int64,
+                        N_QUOTES_KEY: np.int64,
+                        MAE_KEY: np.float64,
+                        RMSE_KEY: np.float64,
+                        SECONDS_KEY: np.float64}
+
+DateResults = Dict[str, np.ndarray]  # columns of the rows of a date
+
+_worker_store: Optional[HistoryStore] = None
+
+
+class BacktestSettings:
+    def __init__(self,
+                 smile_inter_types: List["vs.InterpolationType"],
+                 filter_type: qproc.FilterType = qproc.FilterType.strike,
+                 smoothing_param: Optional[float] = qproc.DEFAULT_SMOOTHING_PARAM,
+                 extrapolation_param: Optional[float] = 0.5,
+                 price_unit: qproc.PriceUnit = qproc.PriceUnit.vol,
+                 filter_cache_dir: Optional[str] = None):
+        """ Collects the settings that determine the results of a backtest; a run can only be resumed with the same
+            settings.
+
+        :param smile_inter_types: smile interpolation types of the calibrated volatility surfaces.
+        :param filter_type:
+        :param smoothing_param:
+        :param extrapolation_param:
+        :param price_unit: unit of the pricing errors.
+        :param filter_cache_dir: optional directory of a filter cache shared by the workers.
+        """
+
+        self.smile_inter_types: List["vs.InterpolationType"] = list(smile_inter_types)
+        self.filter_type: qproc.FilterType = filter_type
+        self.smoothing_param: Optional[float] = smoothing_param
+        self.extrapolation_param: Optional[float] = extrapolation_param
+        self.price_unit: qproc.PriceUnit = price_unit
+        self.filter_cache_dir: Optional[str] = filter_cache_dir
+
+    def method_names(self) -> List[str]:
+        return [sit.name for sit in self.smile_inter_types]
+
+    def to_metadata(self) -> dict:
+        """ Returns the settings that must match for a run to be resumed; the filter cache does not change results. """
+
+        return {"methods": self.method_names(),
+                "filter_type": self.filter_type.name,
+                "smoothing_param": self.smoothing_param,
+                "extrapolation_param": self.extrapolation_param,
+                "price_unit": self.price_unit.name}
+
+
+def run_backtest(store_dir: str,
+                 output_dir: str,
+                 settings: BacktestSettings,
+                 start_date=None,
+                 end_date=None,
+                 n_workers: int = os.cpu_count(),
+                 kernel_cache_dir: Optional[str] = None,
+                 retry_failed: bool = False) -> int:
+    """ Runs the backtest for the dates of the store with start_date <= date <= end_date, skipping the dates whose
+        results are already in the output directory. Dates that fail are recorded with their error message in the
+        metadata of the output, and are skipped on resumption unless retry_failed.
+
+    :param store_dir: directory of a history store.
+    :param output_dir: directory of the results, which is created if it does not exist.
+    :param settings:
+    :param start_date: optional, if None starts from the first date of the store.
+    :param end_date: optional, if None runs up to and including the last date of the store.
+    :param n_workers: number of worker processes; the dates are processed in this process if 0.
+    :param kernel_cache_dir: numba cache directory shared by the worker processes.
+    :param retry_failed: whether to process the dates that failed in an earlier run again.
+    :return: the number of dates processed by this call.
+    """
+
+    metadata = _open_output(output_dir=output_dir, settings=settings)
+    done_dates = set(_read_column(output_dir, DATES_KEY, metadata).tolist())
+    if not retry_failed:
+        done_dates.update(int(day) for day in metadata["failed_dates"])
+
+    store = HistoryStore(store_dir)
+    dates = store.dates()
+    start_index = 0 if start_date is None else int(np.searchsorted(dates, np.datetime64(start_date, "D"), side="left"))
+    end_index = store.n_dates() if end_date is None else int(np.searchsorted(dates, np.datetime64(end_date, "D"),
+                                                                             side="right"))
+    pending_days = [day for day in dates[start_index:end_index].astype(np.int64).tolist() if day not in done_dates]
+
+    if n_workers == 0:
+        _init_worker(store_dir, kernel_cache_dir)
+        for day in pending_days:
+            metadata = _append_date_results(output_dir, metadata, day, *_run_date_safely(day, settings))
+    else:
+        # the workers are spawned rather than forked, as in qproc.serve
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(store_dir, kernel_cache_dir)) as executor:
+            futures = {executor.submit(_run_date_safely, day, settings): day for day in pending_days}
+            for future in as_completed(futures):
+                metadata = _append_date_results(output_dir, metadata, futures[future], *future.result())
+
+    return len(pending_days)
+
+
+def load_backtest_results(output_dir: str) -> "pd.DataFrame":
+    """ Returns the results of a backtest with a row per date and method, sorted by date and method. """
+
+    import pandas as pd
+
+    metadata = _read_metadata(output_dir)
+    columns = {name: _read_column(output_dir, name, metadata) for name in COLUMN_DTYPES}
+    order = np.lexsort((columns[METHODS_KEY], columns[DATES_KEY]))  # the dates are appended in order of completion
+    columns = {name: column[order] for name, column in columns.items()}
+    return pd.DataFrame({"date": columns[DATES_KEY].view(DATE_UNIT),
+                         "method": np.array(metadata["methods"], dtype=object)[columns[METHODS_KEY]],
+                         N_QUOTES_KEY: columns[N_QUOTES_KEY],
+                         MAE_KEY: columns[MAE_KEY],
+                         RMSE_KEY: columns[RMSE_KEY],
+                         SECONDS_KEY: columns[SECONDS_KEY]})
+
+
+def _init_worker(store_dir: str,
+                 kernel_cache_dir: Optional[str]):
+
+    global _worker_store
+    qproc.warm_up_kernels(kernel_cache_dir)
+    _worker_store = HistoryStore(store_dir)
+
+
+def _run_date_safely(day: int,
+                     settings: BacktestSettings) -> Tuple[Optional[DateResults], Optional[str]]:
+    """ Returns the results of the date, or the error message if the date fails, such that a single failing date does
+        not stop the run. """
+
+    try:
+        return _run_date(day, settings), None
+    except Exception as exception:
+        return None, f"{type(exception).__name__}: {exception}"
+
+
+def _run_date(day: int,
+              settings: BacktestSettings) -> DateResults:
+
+    start = time.perf_counter()
+    date = np.datetime64(day, "D")
+    (_, raw_data), = _worker_store.iter_q_procs(start_date=date, end_date=date)
+    filter_cache = None if settings.filter_cache_dir is None else qproc.create_filter_cache(settings.filter_cache_dir)
+
+    filtered_data = deepcopy(raw_data)
+    filtered_data.filter(filter_type=settings.filter_type, smoothing_param=settings.smoothing_param,
+                         cache=filter_cache)
+    vol_surfaces = vs.create_calibrated(smile_inter_types=settings.smile_inter_types, oqp=filtered_data,
+                                        extrapolation_param=settings.extrapolation_param)
+
+    n_methods = len(settings.smile_inter_types)
+    results = {DATES_KEY: np.full(n_methods, day),
+               METHODS_KEY: np.arange(n_methods),
+               N_QUOTES_KEY: np.full(n_methods, _worker_store.get_option_data(date).strikes.size),
+               MAE_KEY: np.empty(n_methods),
+               RMSE_KEY: np.empty(n_methods)}
+    for i, sit in enumerate(settings.smile_inter_types):
+        pricing_errors = vs.compute_pricing_errors(quote_processor=raw_data, vol_surface=vol_surfaces[sit],
+                                                   price_unit=settings.price_unit)
+        results[MAE_KEY][i] = np.mean(np.abs(pricing_errors))
+        results[RMSE_KEY][i] = np.sqrt(np.mean(pricing_errors ** 2))
+
+    results[SECONDS_KEY] = np.full(n_methods, time.perf_counter() - start)
+    return results
+
+
+def _open_output(output_dir: str,
+                 settings: BacktestSettings) -> dict:
+    """ Returns the metadata of the output directory, which is created if it does not exist. """
+
+    if os.path.isfile(os.path.join(output_dir, METADATA_FILE_NAME)):
+        metadata = _read_metadata(output_dir)
+        if {key: metadata[key] for key in settings.to_metadata()} != settings.to_metadata():
+            raise RuntimeError(f"the settings do not match the settings of the backtest in {output_dir}; use another "
+                               f"output directory.")
+        return metadata
+
+    metadata = dict(settings.to_metadata(), format_version=OUTPUT_FORMAT_VERSION, n_rows=0, failed_dates={})
+    os.makedirs(output_dir, exist_ok=True)
+    for name in COLUMN_DTYPES:
+        open(os.path.join(output_dir, name + ".bin"), "wb").close()
+
+    _write_metadata(output_dir, metadata)
+    return metadata
+
+
+def _append_date_results(output_dir: str,
+                         metadata: dict,
+                         day: int,
+                         results: Optional[DateResults],
+                         error_message: Optional[str]) -> dict:
+    """ Appends the results of a date, or records its failure, and returns the updated metadata. The metadata is
+        written last, as in data.history_store, such that an interrupted append leaves the previous dates intact. """
+
+    metadata = deepcopy(metadata)
+    if results is None:
+        metadata["failed_dates"][str(day)] = error_message
+        print(f"{np.datetime64(day, 'D')} failed: {error_message}")
+    else:
+        for name, dtype in COLUMN_DTYPES.items():
+            with open(os.path.join(output_dir, name + ".bin"), "r+b") as f:
+                f.truncate(metadata["n_rows"] * np.dtype(dtype).itemsize)  # discard an interrupted append
+                f.seek(0, os.SEEK_END)
+                f.write(np.ascontiguousarray(results[name], dtype=dtype).tobytes())
+        metadata["n_rows"] += results[DATES_KEY].size
+        metadata["failed_dates"].pop(str(day), None)
+
+    _write_metadata(output_dir, metadata)
+    return metadata
+
+
+def _read_column(output_dir: str,
+                 name: str,
+                 metadata: dict) -> np.ndarray:
+
+    return np.fromfile(os.path.join(output_dir, name + ".bin"), dtype=COLUMN_DTYPES[name], count=metadata["n_rows"])
+
+
+def _read_metadata(output_dir: str) -> dict:
+    with open(os.path.join(output_dir, METADATA_FILE_NAME), "r") as f:
+        metadata = json.load(f)
+
+    if metadata["format_version"] != OUTPUT_FORMAT_VERSION:
+        raise RuntimeError(f"Unsupported backtest output format version {metadata['format_version']}.")
+
+    return metadata
+
+
+def _write_metadata(output_dir: str,
+                    metadata: dict):
+    """ Writes the metadata to a temporary file first, such that the metadata file is replaced atomically. """
+
+    metadata_file_path = os.path.join(output_dir, METADATA_FILE_NAME)
+    tmp_file_path = metadata_file_path + ".tmp"
+    with open(tmp_file_path, "w") as f:
+        json.dump(metadata, f)
+
+    os.replace(tmp_file_path, metadata_file_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs a resumable backtest over a history store.")
+    parser.add_argument("--store", required=True, help="directory of the history store")
+    parser.add_argument("--output", required=True, help="directory of the results, which is also the checkpoint")
+    parser.add_argument("--start", default=None, help="first date, e.g. 2018-01-01")
+    parser.add_argument("--end", default=None, help="last date, e.g. 2018-12-31")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--inter-types", nargs="+", default=["linear"], help="smile interpolation types")
+    parser.add_argument("--filter-type", default=qproc.FilterType.strike.name,
+                        choices=[ft.name for ft in qproc.FilterType])
+    parser.add_argument("--smoothing-param", type=float, default=qproc.DEFAULT_SMOOTHING_PARAM)
+    parser.add_argument("--extrapolation-param", type=float, default=0.5)
+    parser.add_argument("--price-unit", default=qproc.PriceUnit.vol.name, choices=[pu.name for pu in qproc.PriceUnit])
+    parser.add_argument("--filter-cache-dir", default=None, help="directory of a filter cache shared by the workers")
+    parser.add_argument("--kernel-cache-dir", default=None, help="numba cache directory shared by the workers")
+    parser.add_argument("--retry-failed", action="store_true", help="process dates that failed before again")
+    args = parser.parse_args()
+
+    settings = BacktestSettings(smile_inter_types=[vs.InterpolationType[name] for name in args.inter_types],
+                                filter_type=qproc.FilterType[args.filter_type],
+                                smoothing_param=args.smoothing_param,
+                                extrapolation_param=args.extrapolation_param,
+                                price_unit=qproc.PriceUnit[args.price_unit],
+                                filter_cache_dir=args.filter_cache_dir)
+    start = time.perf_counter()
+    n_dates = run_backtest(store_dir=args.store, output_dir=args.output, settings=settings, start_date=args.start,
+                           end_date=args.end, n_workers=args.workers, kernel_cache_dir=args.kernel_cache_dir,
+                           retry_failed=args.retry_failed)
+    print(f"processed {n_dates} dates in {time.perf_counter() - start:.1f}s; results in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@ from data import DataSetName, get_option_data
 
 MAE_KEY: final = "MAE"
 RMSE_KEY: final = "RMSE"
+FILTER_CACHE_DIR: final = qproc.DEFAULT_FILTER_CACHE_DIR  # private to the user, and shared by the result scripts
 
 
 def main():
@@ -22,6 +23,7 @@ def main():
                                    forwards=option_data.forwards,
                                    rates=option_data.rates,
                                    spot=option_data.spot)
+    filter_cache = qproc.create_filter_cache(FILTER_CACHE_DIR)
 
     # The results from the discard filter may depend on the extrapolation method of the final points are discarded.
     extrapolation_param = 0.5
@@ -29,16 +31,18 @@ def main():
     smile_inter_types = [vs.InterpolationType.linear, vs.InterpolationType.ncs, vs.InterpolationType.ccs,
                          vs.InterpolationType.pchip]
     print_pricing_errors(price_unit=price_unit, raw_data=raw_data, smile_inter_types=smile_inter_types,
-                         filter_type=qproc.FilterType.discard, extrapolation_param=extrapolation_param)
+                         filter_type=qproc.FilterType.discard, extrapolation_param=extrapolation_param,
+                         filter_cache=filter_cache)
 
     # The results only depend on the interpolation method when the discard filter is used
     smoothness_params = [0.0, 0.1, 0.2, 0.5]
     for sm in smoothness_params:
         print_pricing_errors(price_unit=price_unit, raw_data=raw_data, smile_inter_types=[vs.InterpolationType.pchip],
-                             filter_type=qproc.FilterType.strike, filter_smoothness_param=sm)
+                             filter_type=qproc.FilterType.strike, filter_smoothness_param=sm,
+                             filter_cache=filter_cache)
 
     create_plots(raw_data=raw_data, inter_type=vs.InterpolationType.pmc, smoothness_param=0.01,
-                 extrapolation_param=extrapolation_param)
+                 extrapolation_param=extrapolation_param, filter_cache=filter_cache)
     
     
 def print_pricing_errors(price_unit: qproc.PriceUnit, 
@@ -46,11 +50,13 @@ def print_pricing_errors(price_unit: qproc.PriceUnit,
                          smile_inter_types: List[vs.InterpolationType],
                          filter_type: qproc.FilterType,
                          filter_smoothness_param: Optional[float] = None,
-                         extrapolation_param: Optional[float] = None):
+                         extrapolation_param: Optional[float] = None,
+                         filter_cache: Optional[qproc.FilterCache] = None):
 
     aggregate_pricing_errors = get_aggregate_pricing_errors(
         price_unit=price_unit, raw_data=raw_data, smile_inter_types=smile_inter_types, filter_type=filter_type,
-        filter_smoothness_param=filter_smoothness_param, extrapolation_param=extrapolation_param)
+        filter_smoothness_param=filter_smoothness_param, extrapolation_param=extrapolation_param,
+        filter_cache=filter_cache)
 
     formatted_output = "Method"
     if filter_smoothness_param is not None:
@@ -71,16 +77,18 @@ def get_aggregate_pricing_errors(price_unit: qproc.PriceUnit,
                                  smile_inter_types: List[vs.InterpolationType],
                                  filter_type: qproc.FilterType,
                                  filter_smoothness_param: Optional[float],
-                                 extrapolation_param: Optional[float]) -> dict:
+                                 extrapolation_param: Optional[float],
+                                 filter_cache: Optional[qproc.FilterCache] = None) -> dict:
     """ Returns a nested dict (first by smile interpolation type, then by MAE / RMSE) with aggregate pricing errors. """
 
-    aggregate_pricing_errors = dict()
-    for sit in smile_inter_types:
-        vol_surface = vs.create(smile_inter_type=sit, oqp=deepcopy(raw_data), filter_type=filter_type,
-                                filter_smoothness_param=filter_smoothness_param,
-                                extrapolation_param=extrapolation_param)
-        vol_surface.calibrate()
+    # the quotes are filtered once for all smile interpolation types
+    filtered_data = deepcopy(raw_data)
+    filtered_data.filter(filter_type=filter_type, smoothing_param=filter_smoothness_param, cache=filter_cache)
+    vol_surfaces = vs.create_calibrated(smile_inter_types=smile_inter_types, oqp=filtered_data,
+                                        extrapolation_param=extrapolation_param)
 
+    aggregate_pricing_errors = dict()
+    for sit, vol_surface in vol_surfaces.items():
         method_results = dict()
         method_results[MAE_KEY] = vs.compute_pricing_mae(quote_processor=raw_data, vol_surface=vol_surface,
                                                          price_unit=price_unit)
@@ -102,15 +110,17 @@ def get_method_name(inter_type: vs.InterpolationType,
 def create_plots(raw_data: qproc.OptionQuoteProcessor,
                  inter_type: vs.InterpolationType,
                  smoothness_param: float,
-                 extrapolation_param: float):
+                 extrapolation_param: float,
+                 filter_cache: Optional[qproc.FilterCache] = None):
 
     discard_vol_surface = vs.create(smile_inter_type=inter_type, oqp=deepcopy(raw_data),
-                                    filter_type=qproc.FilterType.discard, extrapolation_param=extrapolation_param)
+                                    filter_type=qproc.FilterType.discard, extrapolation_param=extrapolation_param,
+                                    filter_cache=filter_cache)
     discard_vol_surface.calibrate()
 
     filtered_vol_surface = vs.create(smile_inter_type=inter_type, oqp=deepcopy(raw_data),
                                      filter_type=qproc.FilterType.strike, filter_smoothness_param=smoothness_param,
-                                     extrapolation_param=None)
+                                     extrapolation_param=None, filter_cache=filter_cache)
     filtered_vol_surface.calibrate()
 
     plot_vol_smiles(raw_data=raw_data, discard_vol_surface=discard_vol_surface,
@@ -8,7 +8,7 @@ from typing import Optional, Tuple, final
 import qproc
 import volsurface
 from data import DataSetName, get_option_data
-from scripts.filter_vs_discard_filter import print_pricing_errors
+from scripts.filter_vs_discard_filter import print_pricing_errors, FILTER_CACHE_DIR
 import volsurface as vs
 
 FILTER_SMOOTHNESS_PARAM: final = 0.0
@@ -39,7 +39,8 @@ def main():
 
     print_pricing_errors(price_unit=qproc.PriceUnit.vol, raw_data=raw_data,
                          smile_inter_types=[SMILE_INTER_TYPE],
-                         filter_type=qproc.FilterType.strike, filter_smoothness_param=FILTER_SMOOTHNESS_PARAM)
+                         filter_type=qproc.FilterType.strike, filter_smoothness_param=FILTER_SMOOTHNESS_PARAM,
+                         filter_cache=qproc.create_filter_cache(FILTER_CACHE_DIR))
 
 
 def create_plots(raw_data: qproc.OptionQuoteProcessor,
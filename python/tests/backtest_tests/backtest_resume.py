@@ -0,0 +1,57 @@
+""" This module provides a test of the resumable backtest: a run that is interrupted after some dates, including an
+    append that is cut off, must resume with the remaining dates and give the same results as an uninterrupted run. """
+
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from typing import final
+import volsurface as vs
+from data import OptionDataSet, append_to_history_store
+from scripts.backtest import BacktestSettings, run_backtest, load_backtest_results, MAE_KEY, RMSE_KEY, N_QUOTES_KEY
+from tests.synthetic_data import get_synthetic_surface
+
+DATES: final = np.arange(np.datetime64("2018-06-11"), np.datetime64("2018-06-17"))
+COMPARED_COLUMNS: final = ["date", "method", N_QUOTES_KEY, MAE_KEY, RMSE_KEY]
+
+
+def main():
+    settings = BacktestSettings(smile_inter_types=[vs.InterpolationType.linear, vs.InterpolationType.pchip])
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store_dir = os.path.join(tmp_dir, "store")
+        for seed, date in enumerate(DATES):
+            surface = get_synthetic_surface(seed)
+            append_to_history_store(store_dir, date, OptionDataSet(
+                spot=surface["spot"], option_prices=surface["option_prices"], price_unit=surface["price_unit"],
+                strikes=surface["strikes"], expiries=surface["expiries"], forwards=surface["forwards"],
+                rates=surface["rates"]))
+
+        expected_dir = os.path.join(tmp_dir, "expected")
+        run_backtest(store_dir, expected_dir, settings, n_workers=0)
+        expected_results = load_backtest_results(expected_dir)
+
+        resumed_dir = os.path.join(tmp_dir, "resumed")
+        n_dates = run_backtest(store_dir, resumed_dir, settings, end_date=DATES[2], n_workers=2)
+        with open(os.path.join(resumed_dir, MAE_KEY + ".bin"), "ab") as f:
+            f.write(b"interrupted append")
+        n_resumed_dates = run_backtest(store_dir, resumed_dir, settings, n_workers=2)
+        n_repeated_dates = run_backtest(store_dir, resumed_dir, settings, n_workers=2)
+        if (n_dates, n_resumed_dates, n_repeated_dates) != (3, DATES.size - 3, 0):
+            raise RuntimeError(f"the runs processed {n_dates}, {n_resumed_dates} and {n_repeated_dates} dates.")
+
+        resumed_results = load_backtest_results(resumed_dir)
+        pd.testing.assert_frame_equal(resumed_results[COMPARED_COLUMNS], expected_results[COMPARED_COLUMNS])
+
+        try:
+            run_backtest(store_dir, resumed_dir, BacktestSettings(smile_inter_types=[vs.InterpolationType.ncs]),
+                         n_workers=0)
+            raise AssertionError("a run with other settings was resumed.")
+        except RuntimeError:
+            pass
+
+    print("the resumed backtest matches the uninterrupted backtest")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+""" This module provides a test of OptionQuoteProcessor.compute_bounds: the bound grid must equal the bounds computed
+    separately by compute_lower_bound and compute_upper_bound, for every price unit. """
+
+import time
+import numpy as np
+from typing import final
+import qproc
+from tests.synthetic_data import get_synthetic_surface
+
+QUERY_LOG_MONEYNESS: final = np.linspace(-3.5, 3.5, 29)
+
+
+def main():
+    surface = get_synthetic_surface(seed=0)
+    q_proc = qproc.create_q_proc(**surface)
+    q_proc.filter(filter_type=qproc.FilterType.strike)
+    expiries = np.unique(surface["expiries"])
+
+    for price_unit in qproc.PriceUnit:
+        lower_bounds, upper_bounds = q_proc.compute_bounds(expiries=expiries, strikes=QUERY_LOG_MONEYNESS,
+                                                           strike_unit=qproc.StrikeUnit.log_moneyness,
+                                                           price_unit=price_unit)
+        for i, expiry in enumerate(expiries):
+            expected_lower_bounds = q_proc.compute_lower_bound(expiry=expiry, strike=QUERY_LOG_MONEYNESS,
+                                                               strike_unit=qproc.StrikeUnit.log_moneyness,
+                                                               price_unit=price_unit)
+            expected_upper_bounds = q_proc.compute_upper_bound(expiry=expiry, strike=QUERY_LOG_MONEYNESS,
+                                                               strike_unit=qproc.StrikeUnit.log_moneyness,
+                                                               price_unit=price_unit)
+            if not np.array_equal(lower_bounds[i], expected_lower_bounds, equal_nan=True) or \
+                    not np.array_equal(upper_bounds[i], expected_upper_bounds, equal_nan=True):
+                raise RuntimeError(f"bound grid differs for {price_unit.name} and expiry {expiry}.")
+
+    start = time.perf_counter()
+    q_proc.compute_bounds(expiries=expiries, strikes=QUERY_LOG_MONEYNESS, strike_unit=qproc.StrikeUnit.log_moneyness,
+                          price_unit=qproc.PriceUnit.vol)
+    grid_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for expiry in expiries:
+        for compute_bound in (q_proc.compute_lower_bound, q_proc.compute_upper_bound):
+            compute_bound(expiry=expiry, strike=QUERY_LOG_MONEYNESS, strike_unit=qproc.StrikeUnit.log_moneyness,
+                          price_unit=qproc.PriceUnit.vol)
+    separate_time = time.perf_counter() - start
+
+    print(f"vol bounds: grid {grid_time * 1e3:.2f}ms, separate bounds {separate_time * 1e3:.2f}ms")
+    print("bound grids match the separately computed bounds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+""" This module provides a test of the bounds for expiries other than the quote expiries: the normalized call bounds in
+    moneyness must be those of the neighbouring quote expiries, and the bound query must agree with the processor. """
+
+import numpy as np
+from typing import final
+import qproc
+from tests.synthetic_data import get_synthetic_surface
+
+QUERY_MONEYNESS: final = np.linspace(0.2, 3.0, 29)
+
+
+def main():
+    surface = get_synthetic_surface(seed=0)
+    q_proc = qproc.create_q_proc(**surface)
+    q_proc.filter(filter_type=qproc.FilterType.strike)
+    bound_query = q_proc.get_bound_query()
+
+    quote_expiries = np.unique(surface["expiries"])
+    expiries = np.concatenate(([0.5 * quote_expiries[0]], 0.5 * (quote_expiries[:-1] + quote_expiries[1:]),
+                               [2.0 * quote_expiries[-1]]))
+    lower_bounds, upper_bounds = _compute_normalized_call_bounds(q_proc, expiries)
+    quote_lower_bounds, quote_upper_bounds = _compute_normalized_call_bounds(q_proc, quote_expiries)
+
+    # without a quote expiry on one side, only the absence of arbitrage bounds the prices from that side
+    _check_equal(lower_bounds[0], np.maximum(1.0 - QUERY_MONEYNESS, 0.0), "lower bounds before the first expiry")
+    _check_equal(lower_bounds[1:], quote_lower_bounds, "lower bounds between and after the quote expiries")
+    _check_equal(upper_bounds[:-1], quote_upper_bounds, "upper bounds before and between the quote expiries")
+    _check_equal(upper_bounds[-1], np.ones(QUERY_MONEYNESS.shape), "upper bounds after the last expiry")
+
+    for expiry in expiries:
+        for price_unit in (qproc.PriceUnit.call, qproc.PriceUnit.vol):
+            for compute_bound in ("compute_lower_bound", "compute_upper_bound"):
+                bounds = getattr(q_proc, compute_bound)(expiry, QUERY_MONEYNESS, qproc.StrikeUnit.moneyness,
+                                                        price_unit)
+                query_bounds = getattr(bound_query, compute_bound)(expiry, QUERY_MONEYNESS,
+                                                                   qproc.StrikeUnit.moneyness, price_unit)
+                _check_equal(query_bounds, bounds, f"bound query results for expiry {expiry}")
+
+    print("bounds for other expiries follow from the neighbouring quote expiries")
+
+
+def _compute_normalized_call_bounds(q_proc: qproc.OptionQuoteProcessor,
+                                    expiries: np.ndarray):
+
+    return q_proc.compute_bounds(expiries=expiries, strikes=QUERY_MONEYNESS, strike_unit=qproc.StrikeUnit.moneyness,
+                                 price_unit=qproc.PriceUnit.normalized_call)
+
+
+def _check_equal(actual: np.ndarray,
+                 expected: np.ndarray,
+                 name: str):
+
+    if not np.array_equal(actual, expected, equal_nan=True):
+        raise RuntimeError(f"{name} differ from the expected bounds.")
+
+
+if __name__ == "__main__":
+    main()
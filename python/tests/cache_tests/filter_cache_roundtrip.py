@@ -0,0 +1,110 @@
+""" This module provides a test of the filter cache: a filter run that is served from the cache must give the same
+    quotes and bounds as the original run for every filter type, different inputs must not share results, entries that
+    cannot be decoded must be recomputed, and the cache must stay within its size. """
+
+import os
+import stat
+import time
+import pickle
+import tempfile
+import numpy as np
+from typing import final
+import qproc
+from tests.synthetic_data import get_synthetic_surface, get_emptied_surface
+
+QUERY_STRIKES: final = np.linspace(60.0, 150.0, 19)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = qproc.create_filter_cache(cache_dir)
+        surface = get_synthetic_surface(seed=0)
+
+        start = time.perf_counter()
+        filtered = _filter(surface, cache, smoothing_param=0.0)
+        filter_time = time.perf_counter() - start
+        start = time.perf_counter()
+        cached = _filter(surface, cache, smoothing_param=0.0)
+        cached_time = time.perf_counter() - start
+        _check_same_results(cached, filtered)
+        print(f"filter: {filter_time:.3f}s, cached filter: {cached_time:.3f}s")
+
+        n_bytes = cache.size()
+        _filter(surface, cache, smoothing_param=0.1)  # different parameters
+        _filter(get_synthetic_surface(seed=1), cache, smoothing_param=0.0)  # different quotes
+        if cache.size() <= n_bytes:
+            raise RuntimeError("different inputs share a cached result.")
+
+        small_cache = qproc.create_filter_cache(cache_dir, max_size=n_bytes)
+        _filter(get_synthetic_surface(seed=2), small_cache, smoothing_param=0.0)
+        if small_cache.size() > n_bytes:
+            raise RuntimeError(f"cache size {small_cache.size()} exceeds the maximal size {n_bytes}.")
+
+        cache.clear()
+        if cache.size() != 0:
+            raise RuntimeError("cache not empty after clear.")
+
+        for filter_type in qproc.FilterType:
+            for surface in (get_synthetic_surface(seed=3, vol_noise=0.03), get_emptied_surface(seed=3)):
+                filtered = _filter(surface, cache, smoothing_param=0.0, filter_type=filter_type)
+                _check_same_results(_filter(surface, cache, smoothing_param=0.0, filter_type=filter_type), filtered)
+        _test_undecodable_entries(cache_dir)
+
+    with tempfile.TemporaryDirectory() as parent_dir:
+        cache_dir = os.path.join(parent_dir, "cache")
+        qproc.create_filter_cache(cache_dir)
+        if stat.S_IMODE(os.stat(cache_dir).st_mode) & 0o077:
+            raise RuntimeError("the cache directory is accessible to other users.")
+
+    print("cached filter results match the original results")
+
+
+def _test_undecodable_entries(cache_dir: str):
+    """ Replaces the entry of a filter result by a pickle, which must not be loaded, and by arrays that lack the quotes,
+        as an entry of an older format; both must be treated as not cached and be replaced by a valid entry. """
+
+    surface = get_synthetic_surface(seed=4)
+    cache = qproc.create_filter_cache(cache_dir)
+    cache.clear()
+    filtered = _filter(surface, cache, smoothing_param=0.0)
+    entry_path, = (os.path.join(cache_dir, name) for name in os.listdir(cache_dir))
+
+    for write_entry in (lambda file: pickle.dump(filtered, file), lambda file: np.savez(file, price_unit=np.array(1))):
+        with open(entry_path, "wb") as file:
+            write_entry(file)
+        _check_same_results(_filter(surface, cache, smoothing_param=0.0), filtered)
+        with np.load(entry_path, allow_pickle=False) as arrays:
+            if "quote_strikes" not in arrays:
+                raise RuntimeError("the undecodable entry was not replaced.")
+
+
+def _filter(surface: dict,
+            cache: qproc.FilterCache,
+            smoothing_param: float,
+            filter_type: qproc.FilterType = qproc.FilterType.strike) -> qproc.OptionQuoteProcessor:
+
+    q_proc = qproc.create_q_proc(**surface)
+    q_proc.filter(filter_type=filter_type, smoothing_param=smoothing_param, cache=cache)
+    return q_proc
+
+
+def _check_same_results(actual: qproc.OptionQuoteProcessor,
+                        expected: qproc.OptionQuoteProcessor):
+
+    actual_quotes = actual.get_quotes(strike_unit=qproc.StrikeUnit.strike, price_unit=qproc.PriceUnit.call)
+    expected_quotes = expected.get_quotes(strike_unit=qproc.StrikeUnit.strike, price_unit=qproc.PriceUnit.call)
+    if not actual_quotes.equals(expected_quotes):
+        raise RuntimeError("cached quotes differ from the filtered quotes.")
+
+    for expiry in expected_quotes[qproc.EXPIRY_KEY].unique():
+        for compute_bound in ("compute_lower_bound", "compute_upper_bound"):
+            actual_bounds = getattr(actual, compute_bound)(expiry, QUERY_STRIKES, qproc.StrikeUnit.strike,
+                                                           qproc.PriceUnit.call)
+            expected_bounds = getattr(expected, compute_bound)(expiry, QUERY_STRIKES, qproc.StrikeUnit.strike,
+                                                               qproc.PriceUnit.call)
+            if not np.array_equal(actual_bounds, expected_bounds, equal_nan=True):
+                raise RuntimeError(f"cached bounds differ from the filtered bounds for expiry {expiry}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+""" This module provides an accuracy test of history stores with float32 prices: for synthetic surfaces and every
+    bundled data set that is available, the quotes filtered from a float32 store must agree with those filtered from a
+    float64 store up to float32 precision, and the price columns of the float32 store must take half the memory. """
+
+import tempfile
+import numpy as np
+from typing import final
+import qproc
+from data import DataSetName, OptionDataSet, HistoryStore, get_option_data, append_to_history_store
+from data.history_store import PRICE_COLUMNS
+from tests.synthetic_data import get_synthetic_surface
+
+N_SEEDS: final = 10
+DATE: final = "2000-01-03"  # arbitrary, as every store holds a single data set
+# float32 rounds to a relative precision of 6e-8, which the filter amplifies for volatilities of far out-of-the-money
+# quotes by converting them to call prices and back
+PRICE_RTOL: final = 1e-5
+
+
+def main():
+    data_sets = {f"synthetic {seed}": OptionDataSet(**get_synthetic_surface(seed, n_expiries=3 + seed % 6,
+                                                                             n_strikes=15 + 5 * (seed % 3)))
+                 for seed in range(N_SEEDS)}
+    for name in DataSetName:
+        if name is not DataSetName.na:
+            try:
+                data_sets[name.name] = get_option_data(name)
+            except (KeyError, OSError):  # the data files are missing, or are pointers of git lfs
+                print(f"{name.name}: unavailable")
+
+    for name, option_data in data_sets.items():
+        max_relative_error = check_data_set(option_data)
+        print(f"{name}: max relative error of the filtered prices {max_relative_error:.2e}")
+
+    print("float32 stores agree with float64 stores")
+
+
+def check_data_set(option_data: OptionDataSet) -> float:
+    """ Filters the data set from a float32 and a float64 store, compares the filtered prices and the memory of the
+        price columns, and returns the maximal relative error of the filtered prices. """
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        stores = {}
+        for price_dtype in (np.float32, np.float64):
+            dtype_dir = f"{store_dir}/{np.dtype(price_dtype).name}"
+            append_to_history_store(dtype_dir, DATE, option_data, price_dtype=price_dtype)
+            stores[price_dtype] = HistoryStore(dtype_dir)
+
+        for column_name in PRICE_COLUMNS:
+            if column_name in stores[np.float64]._columns and 2 * stores[np.float32]._columns[column_name].nbytes != \
+                    stores[np.float64]._columns[column_name].nbytes:
+                raise RuntimeError(f"{column_name} of the float32 store does not take half the memory.")
+
+        quotes = {}
+        for price_dtype, store in stores.items():
+            (_, q_proc), = store.iter_q_procs()
+            q_proc.filter(filter_type=qproc.FilterType.strike)
+            quotes[price_dtype] = q_proc.get_quotes(strike_unit=qproc.StrikeUnit.strike,
+                                                    price_unit=option_data.price_unit)
+
+    if not quotes[np.float32][[qproc.EXPIRY_KEY, qproc.STRIKE_KEY]].equals(
+            quotes[np.float64][[qproc.EXPIRY_KEY, qproc.STRIKE_KEY]]):
+        raise RuntimeError("the filters of the float32 and float64 stores kept different quotes.")
+
+    prices = quotes[np.float64][[qproc.BID_KEY, qproc.ASK_KEY]].to_numpy()
+    float32_prices = quotes[np.float32][[qproc.BID_KEY, qproc.ASK_KEY]].to_numpy()
+    relative_errors = np.abs(float32_prices - prices) / np.maximum(np.abs(prices), np.finfo(np.float32).tiny)
+    max_relative_error = float(np.max(relative_errors, initial=0.0))
+    if max_relative_error > PRICE_RTOL:
+        raise RuntimeError(f"filtered prices of the float32 store differ by up to {max_relative_error:.2e}.")
+
+    return max_relative_error
+
+
+if __name__ == "__main__":
+    main()
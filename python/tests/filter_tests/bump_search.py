@@ -0,0 +1,138 @@
+""" This module provides a test of the bump searches of the forward filter of filter_implementation: the bisection
+    search must filter every surface as the linear search does when feasibility is monotone in the number of bump
+    steps, both for slices that need a bump and for slices for which every bump fails, where the final check of the
+    previous premium against the upper bound decides whether the slice is filtered in the strike dimension instead. """
+
+import numpy as np
+from typing import final, List, Tuple
+from filter_implementation.convert_price_data import strikes_vols_and_premia_to_quote_surface
+from filter_implementation.quote_surface import QuoteSurface
+from filter_implementation.mutation_journal import MutationJournal
+from filter_implementation.filter_constants import MAXIMUM_NUMBER_OF_FAILED_ATTEMPTS, LINEAR_BUMP_SEARCH, \
+    BISECTION_BUMP_SEARCH
+from tests.synthetic_data import get_normalized_call_slices
+
+N_SEEDS: final = 40
+PRICE_NOISES: final = (0.01, 0.02, 0.05)
+SPOT: final = 100.0
+RATE: final = 0.03
+DIVIDEND_YIELD: final = 0.01
+
+
+class ProbedQuoteSurface(QuoteSurface):
+    """ The forward filter, which first probes for every filtered slice (and every reordering of the safeguard) for
+        which numbers of bump steps the attempt is feasible, and which records the outcomes of the final checks of the
+        previous premium against the upper bound (rather than those within the attempts). """
+
+    def __init__(self, quote_slices):
+        super().__init__(quote_slices)
+        self.feasible_steps: List[List[bool]] = []
+        self.final_check_outcomes: List[bool] = []
+        self._is_in_attempt = False
+
+    def forward_surface_filter_for_index(self, index, bump_search = LINEAR_BUMP_SEARCH,
+                                         maximum_number_of_failed_attempts = MAXIMUM_NUMBER_OF_FAILED_ATTEMPTS):
+        quote_slice = self.sorted_quote_slices[index]
+        is_journal_owner = quote_slice.journal is None
+        if is_journal_owner:
+            quote_slice.journal = MutationJournal()
+        checkpoint = quote_slice.journal.checkpoint()
+
+        self.truncate_first_ranked_quote_forward_filtering(quote_slice)
+        bump_step = self.compute_scaled_distance_first_ranked_to_max_call_price(quote_slice,
+                                                                                 maximum_number_of_failed_attempts)
+        self.feasible_steps.append([
+            self.attempt_forward_surface_filter_with_bump(quote_slice, bump_step, number_of_steps) is not None
+            for number_of_steps in range(maximum_number_of_failed_attempts)])
+
+        quote_slice.journal.rollback(checkpoint)
+        if is_journal_owner:
+            quote_slice.journal = None
+        super().forward_surface_filter_for_index(index, bump_search, maximum_number_of_failed_attempts)
+
+    def attempt_forward_surface_filter_of_quote_slice(self, quote_slice):
+        self._is_in_attempt = True
+        try:
+            super().attempt_forward_surface_filter_of_quote_slice(quote_slice)
+        finally:
+            self._is_in_attempt = False
+
+    def previous_premium_exceeds_upper_bound(self, quote_slice):
+        exceeds_upper_bound = super().previous_premium_exceeds_upper_bound(quote_slice)
+        if not self._is_in_attempt:
+            self.final_check_outcomes.append(exceeds_upper_bound)
+        return exceeds_upper_bound
+
+
+def main():
+    n_surfaces = n_compared_surfaces = n_bumped_slices = 0
+    final_check_outcomes = set()
+    for is_normalized in (True, False):
+        for price_noise in PRICE_NOISES:
+            for seed in range(N_SEEDS):
+                expiries, strike_price_lists = get_normalized_call_slices(seed=seed, price_noise=price_noise)
+                for use_safeguard in (False, True):
+                    n_surfaces += 1
+                    quote_surface = _create_quote_surface(ProbedQuoteSurface, expiries, strike_price_lists,
+                                                          is_normalized)
+                    quote_surface.filter_surface_forward(use_safeguard=use_safeguard, bump_search=LINEAR_BUMP_SEARCH)
+
+                    # bisection may settle on a larger bump than the linear search if feasibility is not monotone
+                    if not all(_is_monotone(feasible) for feasible in quote_surface.feasible_steps):
+                        continue
+
+                    bisection_surface = _create_quote_surface(QuoteSurface, expiries, strike_price_lists, is_normalized)
+                    bisection_surface.filter_surface_forward(use_safeguard=use_safeguard,
+                                                             bump_search=BISECTION_BUMP_SEARCH)
+                    if _get_filtered_quotes(bisection_surface) != _get_filtered_quotes(quote_surface):
+                        raise RuntimeError(f"the bisection search differs from the linear search for seed {seed}, "
+                                           f"price noise {price_noise}, is_normalized {is_normalized} and "
+                                           f"use_safeguard {use_safeguard}.")
+
+                    n_compared_surfaces += 1
+                    n_bumped_slices += sum(not feasible[0] and any(feasible)
+                                           for feasible in quote_surface.feasible_steps)
+                    final_check_outcomes.update(quote_surface.final_check_outcomes)
+
+    if n_bumped_slices == 0:
+        raise RuntimeError("no compared slice needs a bump.")
+    if final_check_outcomes != {False, True}:
+        raise RuntimeError(f"the final checks of the compared slices only have the outcomes {final_check_outcomes}.")
+
+    print(f"{n_compared_surfaces} of {n_surfaces} surfaces with monotone feasibility compared, with {n_bumped_slices} "
+          f"slices that need a bump")
+    print("the bisection search filters as the linear search does")
+
+
+def _create_quote_surface(quote_surface_class: type,
+                          expiries: List[float],
+                          strike_price_lists: List[List[Tuple[float, float]]],
+                          is_normalized: bool) -> QuoteSurface:
+    """ Creates the quote surface of the normalized call prices, or of the call prices for the forwards and discount
+        factors of SPOT, RATE and DIVIDEND_YIELD. """
+
+    if is_normalized:
+        forwards = discount_factors = [1.0] * len(expiries)
+    else:
+        forwards = [SPOT * np.exp((RATE - DIVIDEND_YIELD) * expiry) for expiry in expiries]
+        discount_factors = [np.exp(-RATE * expiry) for expiry in expiries]
+        strike_price_lists = [[(strike * forward, price * forward * discount_factor) for strike, price in strike_prices]
+                              for strike_prices, forward, discount_factor in
+                              zip(strike_price_lists, forwards, discount_factors)]
+
+    quote_surface = strikes_vols_and_premia_to_quote_surface(strike_price_lists, expiries[:], forwards,
+                                                             discount_factors)
+    return quote_surface_class(quote_surface.sorted_quote_slices)
+
+
+def _is_monotone(feasible: List[bool]) -> bool:
+    return all(feasible[i] <= feasible[i + 1] for i in range(len(feasible) - 1))
+
+
+def _get_filtered_quotes(quote_surface: QuoteSurface) -> List[List[Tuple[float, float, float, bool]]]:
+    return [[(q.strike, q.call_premium, q.implied_vol, q.is_adjusted) for q in quote_slice.sorted_quote_list]
+            for quote_slice in quote_surface.sorted_quote_slices]
+
+
+if __name__ == "__main__":
+    main()
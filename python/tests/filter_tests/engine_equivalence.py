@@ -0,0 +1,237 @@
+""" This module provides the cross-engine harness of the arbitrage filters: the legacy implementation of
+    filter_implementation and the arbitrage filters of qproc are run on the same normalized quotes, and their
+    arbitrage-free sets and adjusted prices are compared, along with their run times and peak memory.
+
+    The engines are configured to be equivalent: the quotes are normalized call prices in moneyness, such that the
+    forward and discount factor of every slice are one, the legacy ranking quantity is the negative liquidity proxy,
+    and the smoothing parameter of qproc is zero, the ALPHA of the legacy implementation. The legacy forward filter
+    runs without the safeguard, for the first slice too, as the ForwardExpiryFilter of qproc does not reorder quotes.
+    The filters must then keep and adjust the same quotes, except that the legacy forward filter adjusts the
+    first-ranked quote of a slice before filtering it: it truncates the quote to the lower bound implied by the
+    previous slices, and bumps it if the slice cannot be filtered, while qproc adjusts infeasible quotes after the
+    feasible ones. The slices from the first slice with such an adjustment on, whose bounds are implied by it, are
+    therefore reported but not checked; all other slices are. """
+
+import time
+import tracemalloc
+import numpy as np
+from math import inf
+from typing import final, Callable, Dict, List, Tuple
+import qproc
+from qproc.internal.quote_structures import Quote, QuoteSlice, QuoteSurface
+from qproc.internal.arbitrage_filter import create_filter
+from filter_implementation.quote import Quote as LegacyQuote
+from filter_implementation.quote_slice import QuoteSlice as LegacyQuoteSlice
+from filter_implementation.quote_surface import QuoteSurface as LegacyQuoteSurface
+from filter_implementation.filter_exceptions import LowerBoundMoneynessTooHighException, \
+    PreviousPremiumTooHighException
+from filter_implementation.volatility_functions import implied_vol_for_discounted_option
+from data import DataSetName, get_option_data
+from tests.synthetic_data import get_synthetic_surface
+
+N_SEEDS: final = 30
+PRICE_TOLERANCE: final = 1e-12
+FILTER_TYPES: final = (qproc.FilterType.strike, qproc.FilterType.expiry_forward)
+
+QuoteArrays = List[Tuple[float, np.ndarray, np.ndarray, np.ndarray]]  # expiry, strikes, prices and liquidity proxies
+FilteredQuotes = Dict[float, Tuple[np.ndarray, np.ndarray]]  # strikes and prices in the order of the strikes
+
+
+class FirstRankedRecordingQuoteSurface(LegacyQuoteSurface):
+    """ The legacy forward filter without the safeguard, which records the expiries of the slices whose first-ranked
+        quote it truncates, or bumps after a failed attempt. """
+
+    def __init__(self, quote_slices):
+        super().__init__(quote_slices)
+        self.first_ranked_adjusted_expiries: List[float] = []
+
+    def filter_surface_forward_without_safeguard(self):
+        self.sorted_quote_slices[0].filter_in_strike_dimension()
+        self.filtered_slices_indices.append(0)
+        for index in range(1, self.number_of_slices):
+            self.forward_surface_filter_for_index(index)
+            self.filtered_slices_indices.append(index)
+
+        self.is_filtered = True
+
+    def truncate_first_ranked_quote_forward_filtering(self, quote_slice):
+        first_ranked_quote = quote_slice.get_first_ranked_quote()
+        call_premium = first_ranked_quote.call_premium
+        super().truncate_first_ranked_quote_forward_filtering(quote_slice)
+        if first_ranked_quote.call_premium != call_premium:
+            self._record_first_ranked_adjustment(quote_slice)
+
+    def attempt_forward_surface_filter_of_quote_slice(self, quote_slice):
+        try:
+            super().attempt_forward_surface_filter_of_quote_slice(quote_slice)
+        except (LowerBoundMoneynessTooHighException, PreviousPremiumTooHighException):
+            self._record_first_ranked_adjustment(quote_slice)  # the quote is bumped before the next attempt
+            raise
+
+    def _record_first_ranked_adjustment(self, quote_slice):
+        if quote_slice.expiry not in self.first_ranked_adjusted_expiries:
+            self.first_ranked_adjusted_expiries.append(quote_slice.expiry)
+
+
+def main():
+    surfaces = {f"synthetic {seed}": get_synthetic_surface(seed, n_expiries=3 + seed % 6, n_strikes=15 + 5 * (seed % 3))
+                for seed in range(N_SEEDS)}
+    for name in DataSetName:
+        if name is not DataSetName.na:
+            try:
+                option_data = get_option_data(name)
+            except (KeyError, OSError):  # the data files are missing, or are pointers of git lfs
+                print(f"{name.name}: unavailable")
+                continue
+
+            surfaces[name.name] = dict(spot=option_data.spot, forwards=option_data.forwards, rates=option_data.rates,
+                                       option_prices=option_data.option_prices, price_unit=option_data.price_unit,
+                                       expiries=option_data.expiries, strikes=option_data.strikes,
+                                       liquidity_proxies=option_data.liquidity_proxies)
+
+    engines = {'legacy': (_create_legacy_surface, _filter_legacy_surface),
+               'qproc': (_create_qproc_surface, _filter_qproc_surface)}
+    n_checked_quotes = {filter_type: 0 for filter_type in FILTER_TYPES}
+    for name, surface in surfaces.items():
+        quote_arrays = _get_normalized_quotes(surface)
+        for filter_type in FILTER_TYPES:
+            results = {engine: _run_engine(create, run, quote_arrays, filter_type)
+                       for engine, (create, run) in engines.items()}
+            (legacy_quotes, first_adjusted_expiry), _, _ = results['legacy']
+            (qproc_quotes, _), _, _ = results['qproc']
+            n_quotes, n_adjusted, n_different, max_price_difference = _compare(quote_arrays, legacy_quotes,
+                                                                               qproc_quotes)
+
+            checked_quote_arrays = [arrays for arrays in quote_arrays if arrays[0] < first_adjusted_expiry]
+            n_checked, _, n_checked_different, max_checked_price_difference = _compare(
+                checked_quote_arrays, legacy_quotes, qproc_quotes)
+            if n_checked_different > 0 or max_checked_price_difference > PRICE_TOLERANCE:
+                raise RuntimeError(f"the {filter_type.name} filters of the engines differ for {name}: "
+                                   f"{n_checked_different} checked quotes differ in their adjustment, and the adjusted "
+                                   f"prices by up to {max_checked_price_difference}.")
+            n_checked_quotes[filter_type] += n_checked
+
+            timings = ", ".join(f"{engine} {run_time * 1e3:.1f}ms {peak / 1024:.0f}KiB"
+                                for engine, (_, run_time, peak) in results.items())
+            print(f"{name}, {filter_type.name}: {n_quotes} quotes of which {n_checked} checked, adjusted "
+                  f"{n_adjusted[0]} legacy and {n_adjusted[1]} qproc, {n_different} different, max price difference "
+                  f"{max_price_difference:.3g}; {timings}")
+
+    print(f"the filters of the engines keep and adjust the same quotes, checked on "
+          f"{', '.join(f'{n} {filter_type.name}' for filter_type, n in n_checked_quotes.items())} quotes")
+
+
+def _get_normalized_quotes(surface: dict) -> QuoteArrays:
+    """ Returns the normalized call prices in moneyness and the liquidity proxies of the surface, slice by slice. """
+
+    expiries, offsets, arrays = qproc.create_q_proc(**surface).get_quote_arrays(
+        strike_unit=qproc.StrikeUnit.moneyness, price_unit=qproc.PriceUnit.normalized_call)
+    quote_arrays = []
+    for i, expiry in enumerate(expiries.tolist()):
+        s = slice(offsets[i], offsets[i + 1])
+        quote_arrays.append((expiry, arrays[qproc.STRIKE_KEY][s], arrays[qproc.MID_KEY][s], arrays[qproc.LIQ_KEY][s]))
+
+    return quote_arrays
+
+
+def _run_engine(create: Callable,
+                run: Callable,
+                quote_arrays: QuoteArrays,
+                filter_type: qproc.FilterType) -> Tuple[Tuple[FilteredQuotes, float], float, int]:
+    """ Runs the filter of an engine on fresh quotes twice: first for the peak memory traced by tracemalloc, which
+        slows the run down and warms up the engine, and then for the run time. The quotes are created outside of both
+        measurements.
+
+    :return: the filtered quotes and the first expiry of which the legacy engine adjusted the first-ranked quote before
+        filtering (inf if none), the run time in seconds and the peak memory in bytes.
+    """
+
+    engine_surface = create(quote_arrays)
+    tracemalloc.start()
+    run(engine_surface, filter_type)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    engine_surface = create(quote_arrays)
+    start = time.perf_counter()
+    result = run(engine_surface, filter_type)
+    return result, time.perf_counter() - start, peak
+
+
+def _create_legacy_surface(quote_arrays: QuoteArrays) -> List[LegacyQuoteSlice]:
+    legacy_slices = []
+    for expiry, strikes, prices, liq_proxies in quote_arrays:
+        quotes = [LegacyQuote(k, expiry, implied_vol_for_discounted_option(p, 1.0, k, expiry, 1.0, 1), p, -liq, 1.0)
+                  for k, p, liq in zip(strikes.tolist(), prices.tolist(), liq_proxies.tolist())]
+        legacy_slices.append(LegacyQuoteSlice(1.0, 1.0, expiry, quotes))
+
+    return legacy_slices
+
+
+def _filter_legacy_surface(legacy_slices: List[LegacyQuoteSlice],
+                           filter_type: qproc.FilterType) -> Tuple[FilteredQuotes, float]:
+    first_adjusted_expiry = inf
+    if filter_type is qproc.FilterType.strike:
+        for legacy_slice in legacy_slices:
+            legacy_slice.filter_in_strike_dimension()
+    else:
+        legacy_surface = FirstRankedRecordingQuoteSurface(legacy_slices)
+        legacy_surface.filter_surface_forward_without_safeguard()
+        first_adjusted_expiry = min(legacy_surface.first_ranked_adjusted_expiries, default=inf)
+
+    return {s.expiry: (np.array([q.strike for q in s.sorted_quote_list]),
+                       np.array([q.call_premium for q in s.sorted_quote_list])) for s in legacy_slices}, \
+        first_adjusted_expiry
+
+
+def _create_qproc_surface(quote_arrays: QuoteArrays) -> QuoteSurface:
+    quote_surface = QuoteSurface(price_unit=qproc.PriceUnit.normalized_call, strike_unit=qproc.StrikeUnit.moneyness)
+    for expiry, strikes, prices, liq_proxies in quote_arrays:
+        quote_slice = QuoteSlice(expiry)
+        for k, p, liq in zip(strikes.tolist(), prices.tolist(), liq_proxies.tolist()):
+            quote_slice.add_quote(Quote(bid=p, ask=p, strike=k, liq_proxy=liq))
+        quote_surface.add_slice(quote_slice)
+
+    return quote_surface
+
+
+def _filter_qproc_surface(quote_surface: QuoteSurface,
+                          filter_type: qproc.FilterType) -> Tuple[FilteredQuotes, float]:
+    create_filter(quote_surface=quote_surface, filter_type=filter_type, smoothing_param=0.0,
+                  smoothing_param_grid=qproc.DEFAULT_SMOOTHING_PARAM_GRID).filter()
+    return {s.expiry: (np.array([q.strike for q in s.quotes]), np.array([q.mid() for q in s.quotes]))
+            for s in quote_surface.slices}, inf
+
+
+def _compare(quote_arrays: QuoteArrays,
+             legacy_quotes: FilteredQuotes,
+             qproc_quotes: FilteredQuotes) -> Tuple[int, Tuple[int, int], int, float]:
+    """ Compares the filtered quotes of the engines with each other and with the input quotes, of which a quote is
+        adjusted if its filtered price differs from its input price by more than the tolerance.
+
+    :return: the number of quotes, the numbers of adjusted quotes of the legacy and qproc engines, the number of quotes
+        that only one engine adjusts or keeps, and the maximum absolute difference of the filtered prices.
+    """
+
+    n_quotes = n_legacy_adjusted = n_qproc_adjusted = n_different = 0
+    max_price_difference = 0.0
+    for expiry, strikes, prices, _ in quote_arrays:
+        legacy_strikes, legacy_prices = legacy_quotes[expiry]
+        qproc_strikes, qproc_prices = qproc_quotes[expiry]
+        input_prices = prices[np.argsort(strikes, kind='stable')]
+        if not (np.array_equal(legacy_strikes, np.sort(strikes)) and np.array_equal(qproc_strikes, np.sort(strikes))):
+            raise RuntimeError(f"the engines do not return every quote of expiry {expiry}.")
+
+        is_legacy_adjusted = np.abs(legacy_prices - input_prices) > PRICE_TOLERANCE
+        is_qproc_adjusted = np.abs(qproc_prices - input_prices) > PRICE_TOLERANCE
+        n_quotes += strikes.size
+        n_legacy_adjusted += np.count_nonzero(is_legacy_adjusted)
+        n_qproc_adjusted += np.count_nonzero(is_qproc_adjusted)
+        n_different += np.count_nonzero(is_legacy_adjusted != is_qproc_adjusted)
+        max_price_difference = max(max_price_difference, np.max(np.abs(legacy_prices - qproc_prices), initial=0.0))
+
+    return n_quotes, (n_legacy_adjusted, n_qproc_adjusted), n_different, max_price_difference
+
+
+if __name__ == "__main__":
+    main()
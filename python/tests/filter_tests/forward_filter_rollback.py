@@ -0,0 +1,132 @@
+""" This module provides a test of the rollback of failed attempts in the forward filter of filter_implementation: the
+    quote slices that are rolled back by the mutation journal must be filtered exactly as the quote slices that are
+    restored from deep copies, with and without the safeguard, including slices that need several failed attempts and
+    slices for which every attempt fails. """
+
+import numpy as np
+from copy import deepcopy
+from typing import final, Dict, List, Tuple
+from filter_implementation.convert_price_data import strikes_vols_and_premia_to_quote_surface
+from filter_implementation.quote_surface import QuoteSurface
+from filter_implementation.filter_constants import MAXIMUM_NUMBER_OF_ATTEMPTS, MAXIMUM_NUMBER_OF_FAILED_ATTEMPTS, \
+    MAXIMUM_PERCENTAGE_OF_QUOTES_ADJUSTED, PROPER_RANDOM_SEED, LINEAR_BUMP_SEARCH
+from filter_implementation.filter_exceptions import LowerBoundMoneynessTooHighException, \
+    PreviousPremiumTooHighException
+from tests.synthetic_data import get_normalized_call_slices
+
+N_SEEDS: final = 40
+PRICE_NOISES: final = (0.01, 0.02, 0.05)
+MIN_SEVERAL_FAILED_ATTEMPTS: final = 3
+
+
+class DeepCopyQuoteSurface(QuoteSurface):
+    """ The forward filter as it was before the mutation journal, which restores deep copies of the quote slices after
+        failed attempts, and which counts the failed attempts of every slice. """
+
+    def __init__(self, quote_slices):
+        super().__init__(quote_slices)
+        self.numbers_of_failed_attempts: Dict[int, int] = {}
+
+    def forward_surface_filter_for_index(self, index, bump_search = LINEAR_BUMP_SEARCH,
+                                         maximum_number_of_failed_attempts = MAXIMUM_NUMBER_OF_FAILED_ATTEMPTS):
+        quote_slice = self.sorted_quote_slices[index]
+        original_quote_slice = deepcopy(quote_slice)
+
+        self.truncate_first_ranked_quote_forward_filtering(quote_slice)
+        scaled_distance_first_ranked_to_max_call_price = self.compute_scaled_distance_first_ranked_to_max_call_price(
+            quote_slice, maximum_number_of_failed_attempts)
+
+        filtering_procedure_failed = False
+        number_of_failed_attempts = 0
+        for number_of_failed_filtering_attempts in range(0, maximum_number_of_failed_attempts):
+            quote_slice_copy = deepcopy(quote_slice)
+            try:
+                self.attempt_forward_surface_filter_of_quote_slice(quote_slice)
+                break
+            except (LowerBoundMoneynessTooHighException, PreviousPremiumTooHighException):
+                number_of_failed_attempts += 1
+                quote_slice = quote_slice_copy
+                if number_of_failed_filtering_attempts == maximum_number_of_failed_attempts - 1:
+                    quote_slice.final_safeguard_attempt_surface()
+                    filtering_procedure_failed = self.previous_premium_exceeds_upper_bound(quote_slice)
+                else:
+                    self.bump_first_ranked_call_price(quote_slice, scaled_distance_first_ranked_to_max_call_price)
+
+        if filtering_procedure_failed:
+            quote_slice = original_quote_slice
+            quote_slice.filter_in_strike_dimension_with_safeguard()
+
+        self.sorted_quote_slices[index] = quote_slice
+        quote_slice.is_filtered = True
+        self.numbers_of_failed_attempts[index] = max(self.numbers_of_failed_attempts.get(index, 0),
+                                                     number_of_failed_attempts)
+
+    def forward_surface_filter_for_index_with_safeguard(self, index, bump_search = LINEAR_BUMP_SEARCH,
+                                                        maximum_number_of_failed_attempts =
+                                                        MAXIMUM_NUMBER_OF_FAILED_ATTEMPTS):
+        np.random.seed(PROPER_RANDOM_SEED)
+        percentage_quotes_adjusted = np.inf
+        adjustments_are_acceptable = False
+        master_quote_slice = deepcopy(self.sorted_quote_slices[index])
+        best_quote_slice = None
+
+        for number_of_attempts in range(1, MAXIMUM_NUMBER_OF_ATTEMPTS + 1):
+            self.forward_surface_filter_for_index(index, bump_search, maximum_number_of_failed_attempts)
+            new_percentage_quotes_adjusted = self.sorted_quote_slices[index].compute_percentage_of_quotes_adjusted()
+
+            if new_percentage_quotes_adjusted < percentage_quotes_adjusted:
+                percentage_quotes_adjusted = new_percentage_quotes_adjusted
+                best_quote_slice = self.sorted_quote_slices[index]
+                adjustments_are_acceptable = percentage_quotes_adjusted <= MAXIMUM_PERCENTAGE_OF_QUOTES_ADJUSTED
+
+            if adjustments_are_acceptable:
+                break
+            elif number_of_attempts < MAXIMUM_NUMBER_OF_ATTEMPTS:
+                self.sorted_quote_slices[index] = deepcopy(master_quote_slice)
+                np.random.shuffle(self.sorted_quote_slices[index].sorted_quote_list)
+
+        self.sorted_quote_slices[index] = best_quote_slice
+
+
+def main():
+    max_numbers_of_failed_attempts = []
+    for price_noise in PRICE_NOISES:
+        for seed in range(N_SEEDS):
+            expiries, strike_price_lists = get_normalized_call_slices(seed=seed, price_noise=price_noise)
+            for use_safeguard in (False, True):
+                quote_surface = _create_quote_surface(QuoteSurface, expiries, strike_price_lists)
+                quote_surface.filter_surface_forward(use_safeguard=use_safeguard)
+                expected_surface = _create_quote_surface(DeepCopyQuoteSurface, expiries, strike_price_lists)
+                expected_surface.filter_surface_forward(use_safeguard=use_safeguard)
+
+                if _get_filtered_quotes(quote_surface) != _get_filtered_quotes(expected_surface):
+                    raise RuntimeError(f"the rolled back forward filter differs from the deep copies for seed {seed}, "
+                                       f"price noise {price_noise} and use_safeguard {use_safeguard}.")
+                max_numbers_of_failed_attempts.extend(expected_surface.numbers_of_failed_attempts.values())
+
+    # the slices must cover rollbacks of several attempts, and the final safeguard after the last failed attempt
+    if not any(MIN_SEVERAL_FAILED_ATTEMPTS <= n < MAXIMUM_NUMBER_OF_FAILED_ATTEMPTS
+               for n in max_numbers_of_failed_attempts) or \
+            MAXIMUM_NUMBER_OF_FAILED_ATTEMPTS not in max_numbers_of_failed_attempts:
+        raise RuntimeError("no slice needs several failed attempts, or no slice fails every attempt.")
+
+    print(f"{len(max_numbers_of_failed_attempts)} slices, of which "
+          f"{sum(n > 0 for n in max_numbers_of_failed_attempts)} with failed attempts")
+    print("the forward filter rolls back failed attempts as restoring deep copies does")
+
+
+def _create_quote_surface(quote_surface_class: type,
+                          expiries: List[float],
+                          strike_price_lists: List[List[Tuple[float, float]]]) -> QuoteSurface:
+    quote_surface = strikes_vols_and_premia_to_quote_surface(strike_price_lists, expiries[:], [1.0] * len(expiries),
+                                                             [1.0] * len(expiries))
+    return quote_surface_class(quote_surface.sorted_quote_slices)
+
+
+def _get_filtered_quotes(quote_surface: QuoteSurface) -> List[List[Tuple[float, float, float, bool]]]:
+    return [[(q.strike, q.call_premium, q.implied_vol, q.is_adjusted) for q in quote_slice.sorted_quote_list]
+            for quote_slice in quote_surface.sorted_quote_slices]
+
+
+if __name__ == "__main__":
+    main()
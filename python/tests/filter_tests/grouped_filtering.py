@@ -0,0 +1,81 @@
+""" This module provides a test of the grouped filtering: filtering a universe of underlyings with one call of
+    filter_grouped_quotes must keep and adjust the same quotes as filtering every underlying with its own
+    OptionQuoteProcessor, for every filter type. """
+
+import time
+import numpy as np
+from typing import final, Dict
+import qproc
+from tests.synthetic_data import get_call_surface
+
+N_UNDERLYINGS: final = 20
+
+
+def main():
+    # the shapes vary between the underlyings, such that the filters adjust and remove different shares of the quotes
+    surfaces = {f"STOCK{i:02d}": get_call_surface(seed=i, n_expiries=3 + i % 4, n_strikes=15 + 5 * (i % 3),
+                                                  vol_noise=0.005 * (1 + i % 5)) for i in range(N_UNDERLYINGS)}
+    table = _get_table(surfaces, seed=N_UNDERLYINGS)
+
+    for filter_type in qproc.FilterType:
+        for smoothing_param in (0.0, 0.3):
+            start = time.perf_counter()
+            keep_mask, filtered_prices = qproc.filter_grouped_quotes(filter_type=filter_type,
+                                                                     smoothing_param=smoothing_param, **table)
+            grouped_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for underlying_id, surface in surfaces.items():
+                q_proc = qproc.create_q_proc(**surface)
+                q_proc.filter(filter_type=filter_type, smoothing_param=smoothing_param)
+                is_underlying = table["underlying_ids"] == underlying_id
+                _check_same_quotes(q_proc, expiries=table["expiries"][is_underlying],
+                                   strikes=table["strikes"][is_underlying], keep_mask=keep_mask[is_underlying],
+                                   filtered_prices=filtered_prices[is_underlying])
+            processor_time = time.perf_counter() - start
+
+            print(f"{filter_type.name}, smoothing_param {smoothing_param}: {np.count_nonzero(keep_mask)} of "
+                  f"{keep_mask.size} quotes kept, grouped {grouped_time:.3f}s, per underlying {processor_time:.3f}s")
+
+    print("grouped filtering matches the filtering per underlying")
+
+
+def _get_table(surfaces: Dict[str, dict],
+               seed: int) -> dict:
+    """ Returns the arguments of filter_grouped_quotes for the quotes of all surfaces, in random order. """
+
+    underlying_ids = np.concatenate([np.full(s["strikes"].size, u) for u, s in surfaces.items()])
+    order = np.random.default_rng(seed).permutation(underlying_ids.size)
+    curve_expiries = [np.unique(s["expiries"]) for s in surfaces.values()]
+
+    return dict(underlying_ids=underlying_ids[order],
+                expiries=np.concatenate([s["expiries"] for s in surfaces.values()])[order],
+                strikes=np.concatenate([s["strikes"] for s in surfaces.values()])[order],
+                option_prices=np.concatenate([s["option_prices"] for s in surfaces.values()])[order],
+                price_unit=qproc.PriceUnit.call,
+                curve_underlying_ids=np.concatenate([np.full(e.size, u) for u, e in zip(surfaces, curve_expiries)]),
+                curve_expiries=np.concatenate(curve_expiries),
+                forwards=np.concatenate([s["forwards"] for s in surfaces.values()]),
+                rates=np.concatenate([s["rates"] for s in surfaces.values()]))
+
+
+def _check_same_quotes(q_proc: qproc.OptionQuoteProcessor,
+                       expiries: np.ndarray,
+                       strikes: np.ndarray,
+                       keep_mask: np.ndarray,
+                       filtered_prices: np.ndarray):
+
+    # the quote processor maps the strikes to moneyness and back, which changes their last digits
+    quotes = q_proc.get_quotes(strike_unit=qproc.StrikeUnit.strike, price_unit=qproc.PriceUnit.call)
+    kept = np.lexsort((strikes[keep_mask], expiries[keep_mask]))
+    if not (np.array_equal(expiries[keep_mask][kept], quotes[qproc.EXPIRY_KEY].to_numpy()) and
+            np.allclose(strikes[keep_mask][kept], quotes[qproc.STRIKE_KEY].to_numpy(), rtol=1e-12, atol=0.0)):
+        raise RuntimeError("the grouped filter kept other quotes than the quote processor.")
+
+    expected_prices = quotes[[qproc.BID_KEY, qproc.ASK_KEY]].to_numpy()
+    if not np.allclose(filtered_prices[keep_mask][kept], expected_prices, rtol=1e-10, atol=1e-12, equal_nan=True):
+        raise RuntimeError("the grouped filter adjusted the quotes differently from the quote processor.")
+
+
+if __name__ == "__main__":
+    main()
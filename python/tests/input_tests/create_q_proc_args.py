@@ -0,0 +1,140 @@
+""" This module provides a test of the argument checks of create_q_proc: invalid quotes, forwards and rates must raise a
+    RuntimeError that names the offending rows or expiries, create_q_proc(check_args=False) must skip the checks, and
+    checking many rows must take a small fraction of the construction of the OptionQuoteProcessor. """
+
+import time
+import numpy as np
+from typing import final, Callable, Optional, Sequence, Tuple
+import qproc
+from qproc.internal.input_checking import check_create_q_proc_args, MAX_REPORTED_ROWS
+from tests.synthetic_data import get_call_surface
+
+N_LARGE_EXPIRIES: final = 20
+N_LARGE_STRIKES: final = 10000  # 200k rows in total
+NUMBER_OF_MEASUREMENTS: final = 3
+MAX_CHECK_TIME_FRACTION: final = 0.1  # of the time taken to construct the OptionQuoteProcessor without checks
+
+
+def main():
+    surface = get_call_surface(seed=0)
+    n_quotes = surface["strikes"].size
+    n_expiries = surface["forwards"].size
+    many_rows = list(range(3, 3 + MAX_REPORTED_ROWS + 5))
+
+    invalid_surfaces = {
+        "option_prices contains non-finite values in rows 3, 7.":
+            _replace_values(surface, "option_prices", [3, 7], np.nan),
+        f"option_prices contains non-finite values in rows {', '.join(map(str, many_rows[:MAX_REPORTED_ROWS]))} and 5 "
+        f"more.":
+            _replace_values(surface, "option_prices", many_rows, np.inf),
+        "option_prices contains negative values in rows 11.":
+            _replace_values(surface, "option_prices", [11], -1.0),
+        "option_prices contains bid prices above ask prices in rows 2.":
+            dict(surface, option_prices=_swap_bid_and_ask(surface["option_prices"], row=2)),
+        "strikes contains non-positive values in rows 5.":
+            _replace_values(surface, "strikes", [5], -100.0),
+        f"strikes contains non-finite values in rows 0, {n_quotes - 1}.":
+            _replace_values(surface, "strikes", [0, n_quotes - 1], np.nan),
+        "expiries contains non-positive or non-finite values in rows 4.":
+            _replace_values(surface, "expiries", [4], 0.0),
+        "liquidity_proxies contains non-finite values in rows 9.":
+            _replace_values(dict(surface, liquidity_proxies=np.ones(n_quotes)), "liquidity_proxies", [9], np.nan),
+        f"strikes must be an ({n_quotes},) array like the rows of option_prices, not an array of shape "
+        f"({n_quotes - 1},).":
+            dict(surface, strikes=surface["strikes"][:-1]),
+        f"option_prices must be an (n,) or (n,2) array, not an array of shape ({n_quotes}, 3).":
+            dict(surface, option_prices=np.column_stack((surface["option_prices"], surface["option_prices"][:, 1]))),
+        f"forwards must be an ({n_expiries},) array with a value for every unique expiry, not an array of shape ().":
+            dict(surface, forwards=None),
+        f"rates must be an ({n_expiries},) array with a value for every unique expiry, not an array of shape "
+        f"({n_expiries - 1},).":
+            dict(surface, rates=surface["rates"][1:]),
+        "forwards contains non-positive or non-finite values for the expiries with indices 1 (in ascending order of "
+        "the unique expiries).":
+            _replace_values(surface, "forwards", [1], -1.0),
+        "price_unit must be a PriceUnit, not str.":
+            dict(surface, price_unit="call"),
+    }
+
+    for expected_message, invalid_surface in invalid_surfaces.items():
+        message = _get_error_message(lambda: qproc.create_q_proc(**invalid_surface))
+        if message != expected_message:
+            raise RuntimeError(f"create_q_proc raised '{message}' instead of '{expected_message}'.")
+
+    valid_surfaces = {
+        "valid": surface,
+        "negative log-moneyness strikes": dict(surface, strikes=np.log(surface["strikes"] / surface["spot"]),
+                                               strike_unit=qproc.StrikeUnit.log_moneyness),
+    }
+    for name, valid_surface in valid_surfaces.items():
+        message = _get_error_message(lambda: qproc.create_q_proc(**valid_surface))
+        if message is not None:
+            raise RuntimeError(f"create_q_proc raised '{message}' for the {name} quotes.")
+
+    unchecked_surface = invalid_surfaces["option_prices contains non-finite values in rows 3, 7."]
+    message = _get_error_message(lambda: qproc.create_q_proc(check_args=False, **unchecked_surface))
+    if message is not None:
+        raise RuntimeError(f"create_q_proc(check_args=False) raised '{message}'.")
+
+    print(f"{len(invalid_surfaces)} invalid arguments raise errors that name the offending rows or expiries")
+
+    check_time, construction_time = _time_check(get_call_surface(seed=0, n_expiries=N_LARGE_EXPIRIES,
+                                                                 n_strikes=N_LARGE_STRIKES))
+    print(f"checking {N_LARGE_EXPIRIES * N_LARGE_STRIKES} rows takes {check_time * 1e3:.1f}ms, and constructing "
+          f"without checks {construction_time * 1e3:.1f}ms")
+    if check_time > MAX_CHECK_TIME_FRACTION * construction_time:
+        raise RuntimeError(f"checking the arguments takes more than {MAX_CHECK_TIME_FRACTION:.0%} of the "
+                           f"construction.")
+
+    print("create_q_proc checks its arguments")
+
+
+def _replace_values(surface: dict,
+                    key: str,
+                    indices: Sequence[int],
+                    value: float) -> dict:
+    """ Returns a copy of the surface in which the values of the array of the key at the indices are replaced. """
+
+    array = np.array(surface[key], dtype=float)
+    array[indices] = value
+    return dict(surface, **{key: array})
+
+
+def _swap_bid_and_ask(option_prices: np.ndarray,
+                      row: int) -> np.ndarray:
+    option_prices = option_prices.copy()
+    option_prices[row] = option_prices[row, ::-1]
+    return option_prices
+
+
+def _get_error_message(create: Callable) -> Optional[str]:
+    """ Returns the message of the RuntimeError raised by create, or None if it raises none. """
+
+    try:
+        create()
+    except RuntimeError as error:
+        return str(error)
+
+    return None
+
+
+def _time_check(surface: dict) -> Tuple[float, float]:
+    """ Returns the fastest times in seconds of checking the arguments and of constructing the OptionQuoteProcessor
+        without checks. """
+
+    check_args = {key: value for key, value in surface.items() if key != "spot"}
+    check_times, construction_times = [], []
+    for _ in range(NUMBER_OF_MEASUREMENTS):
+        start = time.perf_counter()
+        check_create_q_proc_args(strike_unit=qproc.StrikeUnit.strike, liquidity_proxies=None, **check_args)
+        check_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        qproc.create_q_proc(check_args=False, **surface)
+        construction_times.append(time.perf_counter() - start)
+
+    return min(check_times), min(construction_times)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+""" This module provides a test of the import time of the qproc and volsurface packages, which must not load the heavy
+    dependencies until the functions that need them are first used. """
+
+import os
+import sys
+import subprocess
+from typing import final, Tuple
+
+IMPORT_TIME_BUDGET: final = 0.5  # seconds, per package, including the import of numpy
+NUMBER_OF_MEASUREMENTS: final = 3
+DEFERRED_MODULES: final = ("pandas", "matplotlib", "computils", "numba", "scipy", "py_lets_be_rational")
+PYTHON_DIR: final = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MEASUREMENT_SCRIPT: final = """
+import sys
+import time
+start = time.perf_counter()
+import {package}
+elapsed = time.perf_counter() - start
+print(elapsed)
+print(",".join(m for m in {deferred_modules} if m in sys.modules))
+"""
+
+
+def main():
+    for package in ("qproc", "volsurface"):
+        elapsed, loaded_modules = measure_import(package)
+        print(f"import {package}: {elapsed:.3f}s")
+
+        if loaded_modules:
+            raise RuntimeError(f"import {package} loads {', '.join(loaded_modules)}.")
+        if elapsed > IMPORT_TIME_BUDGET:
+            raise RuntimeError(f"import {package} takes {elapsed:.3f}s, which exceeds the budget of "
+                               f"{IMPORT_TIME_BUDGET}s.")
+
+
+def measure_import(package: str) -> Tuple[float, Tuple[str, ...]]:
+    """ Imports the package in fresh interpreters, and returns the fastest import time along with the deferred modules
+        that were loaded by the import. """
+
+    script = MEASUREMENT_SCRIPT.format(package=package, deferred_modules=DEFERRED_MODULES)
+    elapsed_times = []
+    loaded_modules = ()
+    for _ in range(NUMBER_OF_MEASUREMENTS):
+        output = subprocess.run([sys.executable, "-c", script], cwd=PYTHON_DIR, capture_output=True, text=True,
+                                check=True).stdout.splitlines()
+        elapsed_times.append(float(output[0]))
+        loaded_modules = tuple(m for m in output[1].split(",") if m)
+
+    return min(elapsed_times), loaded_modules
+
+
+if __name__ == "__main__":
+    main()
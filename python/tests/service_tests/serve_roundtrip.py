@@ -0,0 +1,105 @@
+""" This module provides a test of the qproc service: it starts the service in a separate process, sends concurrent
+    filter, bound and price requests, and compares the responses with the results computed in this process. It also
+    checks that the batches of requests are split over the workers. """
+
+import os
+import sys
+import time
+import tempfile
+import subprocess
+import numpy as np
+from typing import final
+from concurrent.futures import ThreadPoolExecutor
+import qproc
+from qproc.serve import DEFAULT_MAX_BATCH_SIZE, _split_batch
+from tests.synthetic_data import get_synthetic_surface
+
+PYTHON_DIR: final = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+STARTUP_TIMEOUT: final = 120.0  # seconds
+N_CONCURRENT_CLIENTS: final = 8
+
+
+def main():
+    _check_batch_split()
+
+    socket_path = os.path.join(tempfile.mkdtemp(), "qproc.sock")
+    service = subprocess.Popen([sys.executable, "-m", "qproc.serve", "--socket", socket_path, "--workers", "2"],
+                               cwd=PYTHON_DIR)
+    try:
+        _wait_for_service(socket_path)
+        with ThreadPoolExecutor(N_CONCURRENT_CLIENTS) as executor:
+            for _ in executor.map(check_requests, [socket_path] * N_CONCURRENT_CLIENTS, range(N_CONCURRENT_CLIENTS)):
+                pass
+        print("service responses match the in-process results")
+    finally:
+        service.terminate()
+        service.wait()
+
+
+def check_requests(socket_path: str, seed: int):
+    surface = get_synthetic_surface(seed)
+    q_proc = qproc.create_q_proc(**surface)
+    q_proc.filter(qproc.FilterType.strike)
+    expiry = np.unique(surface["expiries"])[1]
+    query_strikes = np.linspace(80.0, 120.0, 9)
+
+    with qproc.ServiceClient(socket_path) as client:
+        filtered_quotes = client.filter(filter_type=qproc.FilterType.strike, **surface)
+        quotes = q_proc.get_quotes(strike_unit=qproc.StrikeUnit.strike, price_unit=qproc.PriceUnit.vol)
+        _check_equal(filtered_quotes["bids"], quotes[qproc.BID_KEY].to_numpy(), "filtered quotes")
+
+        lower_bounds, upper_bounds = client.compute_bounds(
+            filter_type=qproc.FilterType.strike, query_expiries=np.full(query_strikes.shape, expiry),
+            query_strikes=query_strikes, query_strike_unit=qproc.StrikeUnit.strike,
+            query_price_unit=qproc.PriceUnit.call, **surface)
+        _check_equal(lower_bounds, q_proc.compute_lower_bound(expiry, query_strikes, qproc.StrikeUnit.strike,
+                                                              qproc.PriceUnit.call), "lower bounds")
+        _check_equal(upper_bounds, q_proc.compute_upper_bound(expiry, query_strikes, qproc.StrikeUnit.strike,
+                                                              qproc.PriceUnit.call), "upper bounds")
+
+        vols = np.full(query_strikes.shape, 0.2)
+        prices = client.transform_prices(spot=surface["spot"], curve_times=np.unique(surface["expiries"]),
+                                         forwards=surface["forwards"], rates=surface["rates"],
+                                         query_expiries=np.full(query_strikes.shape, expiry),
+                                         query_strikes=query_strikes, query_prices=vols,
+                                         strike_unit=qproc.StrikeUnit.strike, input_price_unit=qproc.PriceUnit.vol,
+                                         output_price_unit=qproc.PriceUnit.call)
+        _check_equal(prices, q_proc.transform_price(query_strikes, qproc.StrikeUnit.strike, vols, qproc.PriceUnit.vol,
+                                                    qproc.PriceUnit.call, expiry), "prices")
+
+        invalid_surface = dict(surface, option_prices=-surface["option_prices"])
+        try:
+            client.filter(filter_type=qproc.FilterType.strike, **invalid_surface)
+            raise RuntimeError("the service did not report the invalid prices.")
+        except RuntimeError as error:
+            if "negative values" not in str(error):
+                raise
+
+
+def _check_batch_split():
+    """ Checks that batches are split into chunks of consecutive requests for all workers, whose sizes differ by at most
+        one, and that a batch smaller than the number of workers is split into single requests. """
+
+    for batch_size, n_workers, expected_chunk_sizes in ((DEFAULT_MAX_BATCH_SIZE, 2, [16, 16]), (10, 4, [3, 3, 2, 2]),
+                                                        (3, 8, [1, 1, 1]), (1, 1, [1])):
+        batch = list(range(batch_size))
+        chunks = _split_batch(batch, n_chunks=n_workers)
+        if [len(chunk) for chunk in chunks] != expected_chunk_sizes or sum(chunks, []) != batch:
+            raise RuntimeError(f"a batch of {batch_size} requests is split into {chunks} for {n_workers} workers.")
+
+
+def _wait_for_service(socket_path: str):
+    start = time.monotonic()
+    while not os.path.exists(socket_path):
+        if time.monotonic() - start > STARTUP_TIMEOUT:
+            raise RuntimeError("the service did not start.")
+        time.sleep(0.1)
+
+
+def _check_equal(actual: np.ndarray, expected: np.ndarray, name: str):
+    if not np.array_equal(actual, expected, equal_nan=True):
+        raise RuntimeError(f"{name} of the service differ from the in-process results.")
+
+
+if __name__ == "__main__":
+    main()
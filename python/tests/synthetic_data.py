@@ -0,0 +1,103 @@
+""" This module provides synthetic option quotes for the tests, as arguments of create_q_proc. The shapes of the
+    surfaces are varied by the number of expiries and strikes and by the noise of the volatilities, which determines
+    how many quotes the filters adjust or remove. """
+
+import numpy as np
+from typing import final, List, Tuple
+import qproc
+
+SPOT: final = 100.0
+MAX_EXPIRY: final = 2.0
+MIN_STRIKE: final = 50.0
+MAX_STRIKE: final = 160.0
+
+
+def get_synthetic_surface(seed: int,
+                          n_expiries: int = 5,
+                          n_strikes: int = 25,
+                          vol_noise: float = 0.01) -> dict:
+    """ Returns noisy implied volatilities on a quadratic smile.
+
+    :param seed:
+    :param n_expiries: number of expiries, which are equidistant in [0.1, 2.0].
+    :param n_strikes: number of strikes of every expiry, which are equidistant in [50.0, 160.0].
+    :param vol_noise: standard deviation of the noise that is added to the volatilities.
+    :return: the arguments of create_q_proc.
+    """
+
+    rng = np.random.default_rng(seed)
+    unique_expiries = np.linspace(0.1, MAX_EXPIRY, n_expiries)
+    rates = 0.02 + 0.005 * unique_expiries
+    forwards = SPOT * np.exp(rates * unique_expiries)
+    strikes = np.tile(np.linspace(MIN_STRIKE, MAX_STRIKE, n_strikes), unique_expiries.size)
+    expiries = np.repeat(unique_expiries, n_strikes)
+    log_moneyness = np.log(strikes / np.repeat(forwards, n_strikes))
+    vols = np.abs(0.2 - 0.1 * log_moneyness + 0.3 * log_moneyness ** 2 + vol_noise * rng.standard_normal(strikes.size))
+
+    return dict(spot=SPOT, forwards=forwards, rates=rates, option_prices=vols, price_unit=qproc.PriceUnit.vol,
+                expiries=expiries, strikes=strikes)
+
+
+def get_call_surface(seed: int,
+                     half_spread: float = 0.02,
+                     **shape) -> dict:
+    """ Returns bid and ask call prices around the synthetic volatility surface of the seed.
+
+    :param seed:
+    :param half_spread: half of the bid-ask spread relative to the mid price.
+    :param shape: optional arguments of get_synthetic_surface.
+    :return: the arguments of create_q_proc.
+    """
+
+    surface = get_synthetic_surface(seed, **shape)
+    q_proc = qproc.create_q_proc(**surface)
+    calls = np.empty(surface["strikes"].shape)
+    for expiry in np.unique(surface["expiries"]):
+        is_expiry = surface["expiries"] == expiry
+        calls[is_expiry] = q_proc.transform_price(surface["strikes"][is_expiry], qproc.StrikeUnit.strike,
+                                                  surface["option_prices"][is_expiry], qproc.PriceUnit.vol,
+                                                  qproc.PriceUnit.call, expiry)
+
+    option_prices = np.column_stack(((1.0 - half_spread) * calls, (1.0 + half_spread) * calls))
+    return dict(surface, option_prices=option_prices, price_unit=qproc.PriceUnit.call)
+
+
+def get_emptied_surface(seed: int) -> dict:
+    """ Returns mid call prices of two expiries, where every call of the second expiry is priced above the forward,
+        such that the discard filter removes the whole slice.
+
+    :return: the arguments of create_q_proc.
+    """
+
+    surface = get_call_surface(seed, half_spread=0.0, n_expiries=2)
+    call_prices = surface["option_prices"][:, 0]
+    call_prices[surface["expiries"] == surface["expiries"][-1]] = 1.1 * surface["forwards"][-1]
+    return dict(surface, option_prices=call_prices)
+
+
+def get_normalized_call_slices(seed: int,
+                               n_expiries: int = 4,
+                               price_noise: float = 0.02) -> Tuple[List[float], List[List[Tuple[float, float]]]]:
+    """ Returns noisy normalized call prices in moneyness, i.e., for forwards and discount factors of one, at random
+        strikes and expiries, in the format of strikes_vols_and_premia_to_quote_surface of filter_implementation. Noise
+        of a few percent of the forward yields slices that the forward filter of filter_implementation cannot filter
+        at the first attempt.
+
+    :param seed:
+    :param n_expiries:
+    :param price_noise: standard deviation of the noise that is added to the prices.
+    :return: the expiries in ascending order, and a list of (strike, price) tuples for every expiry.
+    """
+
+    rng = np.random.default_rng(seed)
+    expiries = sorted(rng.uniform(0.05, 3.0, n_expiries).tolist())
+    strike_price_lists = []
+    for expiry in expiries:
+        strike_price_list = []
+        for _ in range(int(rng.integers(5, 15))):
+            strike = float(rng.uniform(0.0, 3.0))
+            price = max(1.0 - strike ** 2 / 20.0, 0.0) / (1.0 + expiry / 20.0) + price_noise * rng.standard_normal()
+            strike_price_list.append((strike, max(price, 1e-4)))
+        strike_price_lists.append(strike_price_list)
+
+    return expiries, strike_price_lists
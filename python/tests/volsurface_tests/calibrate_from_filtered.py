@@ -0,0 +1,57 @@
+""" This module provides a test of the calibration of volatility surfaces from a filtered processor: the surfaces must
+    price as the surfaces that filter their own copy of the processor, and the shared processor must not change. """
+
+import numpy as np
+from copy import deepcopy
+from typing import final
+import qproc
+import volsurface as vs
+from tests.synthetic_data import get_synthetic_surface
+
+FILTER_SMOOTHNESS_PARAM: final = 0.01
+EXTRAPOLATION_PARAM: final = 0.5
+QUERY_STRIKES: final = np.linspace(60.0, 150.0, 19)
+
+
+def main():
+    raw_data = qproc.create_q_proc(**get_synthetic_surface(seed=0))
+    smile_inter_types = [vs.InterpolationType.linear, vs.InterpolationType.ncs, vs.InterpolationType.pchip]
+
+    filtered_data = deepcopy(raw_data)
+    filtered_data.filter(filter_type=qproc.FilterType.strike, smoothing_param=FILTER_SMOOTHNESS_PARAM)
+    filtered_quotes = filtered_data.get_quotes(strike_unit=qproc.StrikeUnit.strike, price_unit=qproc.PriceUnit.call)
+    vol_surfaces = vs.create_calibrated(smile_inter_types=smile_inter_types, oqp=filtered_data,
+                                        extrapolation_param=EXTRAPOLATION_PARAM)
+
+    for sit in smile_inter_types:
+        expected_surface = vs.create(smile_inter_type=sit, oqp=deepcopy(raw_data), filter_type=qproc.FilterType.strike,
+                                     filter_smoothness_param=FILTER_SMOOTHNESS_PARAM,
+                                     extrapolation_param=EXTRAPOLATION_PARAM)
+        expected_surface.calibrate()
+        single_surface = vs.create_from_filtered(smile_inter_type=sit, oqp=filtered_data,
+                                                 extrapolation_param=EXTRAPOLATION_PARAM)
+        single_surface.calibrate()
+
+        for expiry in filtered_quotes[qproc.EXPIRY_KEY].unique():
+            expected_prices = expected_surface.get_price(price_unit=qproc.PriceUnit.call, expiry=expiry,
+                                                         strike=QUERY_STRIKES)
+            for vol_surface in (vol_surfaces[sit], single_surface):
+                prices = vol_surface.get_price(price_unit=qproc.PriceUnit.call, expiry=expiry, strike=QUERY_STRIKES)
+                if not np.array_equal(prices, expected_prices):
+                    raise RuntimeError(f"prices of the {sit.name} surface differ for expiry {expiry}.")
+
+    quotes = filtered_data.get_quotes(strike_unit=qproc.StrikeUnit.strike, price_unit=qproc.PriceUnit.call)
+    if not quotes.equals(filtered_quotes):
+        raise RuntimeError("the filtered processor changed during calibration.")
+
+    try:
+        vs.create_from_filtered(smile_inter_type=vs.InterpolationType.linear, oqp=raw_data)
+        raise AssertionError("an unfiltered processor was accepted.")
+    except RuntimeError:
+        pass
+
+    print("volatility surfaces from the filtered processor match the surfaces that filter themselves")
+
+
+if __name__ == "__main__":
+    main()
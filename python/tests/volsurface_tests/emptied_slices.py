@@ -0,0 +1,47 @@
+""" This module provides a test of volatility surfaces whose filter empties a slice: the quote arrays must leave out
+    the emptied expiry as get_quotes does, and the surfaces must calibrate to the remaining expiries and price as the
+    surfaces without the emptied expiry. """
+
+import numpy as np
+from typing import final
+import qproc
+import volsurface as vs
+from tests.synthetic_data import get_emptied_surface
+
+QUERY_STRIKES: final = np.linspace(60.0, 150.0, 19)
+
+
+def main():
+    surface = get_emptied_surface(seed=0)
+    q_proc = qproc.create_q_proc(**surface)
+    q_proc.filter(filter_type=qproc.FilterType.discard)
+    expiries, offsets, _ = q_proc.get_quote_arrays(strike_unit=qproc.StrikeUnit.strike,
+                                                   price_unit=qproc.PriceUnit.call)
+    quotes = q_proc.get_quotes(strike_unit=qproc.StrikeUnit.strike, price_unit=qproc.PriceUnit.call)
+    if not np.array_equal(expiries, quotes[qproc.EXPIRY_KEY].unique()) or np.any(np.diff(offsets) == 0):
+        raise RuntimeError("the quote arrays contain the emptied slice.")
+
+    first_expiry = surface["expiries"][0]
+    is_first_expiry = surface["expiries"] == first_expiry
+    remaining_surface = dict(surface, forwards=surface["forwards"][:1], rates=surface["rates"][:1],
+                             option_prices=surface["option_prices"][is_first_expiry],
+                             expiries=surface["expiries"][is_first_expiry], strikes=surface["strikes"][is_first_expiry])
+
+    for sit in (vs.InterpolationType.linear, vs.InterpolationType.ncs, vs.InterpolationType.pchip):
+        vol_surface = vs.create(smile_inter_type=sit, oqp=qproc.create_q_proc(**surface),
+                                filter_type=qproc.FilterType.discard)
+        vol_surface.calibrate()
+        expected_surface = vs.create(smile_inter_type=sit, oqp=qproc.create_q_proc(**remaining_surface),
+                                     filter_type=qproc.FilterType.discard)
+        expected_surface.calibrate()
+
+        prices = vol_surface.get_price(price_unit=qproc.PriceUnit.call, expiry=first_expiry, strike=QUERY_STRIKES)
+        if not np.array_equal(prices, expected_surface.get_price(price_unit=qproc.PriceUnit.call, expiry=first_expiry,
+                                                                 strike=QUERY_STRIKES)):
+            raise RuntimeError(f"prices of the {sit.name} surface differ from the surface without the emptied slice.")
+
+    print("volatility surfaces calibrate to the expiries that the filter did not empty")
+
+
+if __name__ == "__main__":
+    main()
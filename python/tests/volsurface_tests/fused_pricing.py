@@ -0,0 +1,72 @@
+""" This module provides a test of the compiled kernel of the volatility surface: the prices of get_price must agree
+    with the prices from the separate transformations up to rounding, for every smile interpolation type, strike unit
+    and price unit, and for expiries before, between, at and beyond the quote expiries. """
+
+import time
+import numpy as np
+from typing import final
+import qproc
+import volsurface as vs
+from tests.synthetic_data import get_synthetic_surface
+
+RELATIVE_TOLERANCE: final = 1e-12  # the kernel uses the log and exp of libm instead of those of numpy
+ABSOLUTE_TOLERANCE: final = 1e-12  # for deep out-of-the-money prices, which amplify the rounding of the strikes
+EXTRAPOLATION_PARAM: final = 0.5
+QUERY_STRIKES: final = {qproc.StrikeUnit.strike: np.linspace(20.0, 250.0, 47),
+                        qproc.StrikeUnit.moneyness: np.linspace(0.2, 2.5, 47),
+                        qproc.StrikeUnit.log_moneyness: np.linspace(-3.5, 3.5, 47)}
+N_TIMED_STRIKES: final = 1000
+
+
+def main():
+    query_expiries = None
+    for sit in (vs.InterpolationType.linear, vs.InterpolationType.ncs, vs.InterpolationType.ccs,
+                vs.InterpolationType.pchip, vs.InterpolationType.pmc):
+        vol_surface = vs.create(smile_inter_type=sit, oqp=qproc.create_q_proc(**get_synthetic_surface(seed=1)),
+                                filter_type=qproc.FilterType.strike, filter_smoothness_param=0.01,
+                                extrapolation_param=EXTRAPOLATION_PARAM)
+        vol_surface.calibrate()
+        if query_expiries is None:
+            expiries = np.unique(get_synthetic_surface(seed=1)["expiries"])
+            query_expiries = np.concatenate(([expiries[0] / 2.0], expiries, (expiries[1:] + expiries[:-1]) / 2.0,
+                                             [2.0 * expiries[-1]]))
+
+        for strike_unit, strikes in QUERY_STRIKES.items():
+            for price_unit in qproc.PriceUnit:
+                for expiry in query_expiries:
+                    prices = vol_surface.get_price(price_unit=price_unit, expiry=expiry, strike=strikes,
+                                                   strike_unit=strike_unit)
+                    expected_prices = vol_surface._get_price_from_transformations(
+                        price_unit=price_unit, expiry=expiry, strike=strikes, strike_unit=strike_unit)
+                    if not np.allclose(prices, expected_prices, rtol=RELATIVE_TOLERANCE, atol=ABSOLUTE_TOLERANCE,
+                                       equal_nan=True):
+                        raise RuntimeError(f"prices of the {sit.name} surface differ for {strike_unit.name}, "
+                                           f"{price_unit.name} and expiry {expiry}.")
+
+                    if sit is vs.InterpolationType.pmc:  # the pmc spline of computils cannot be evaluated at scalars
+                        continue
+                    price = vol_surface.get_price(price_unit=price_unit, expiry=expiry, strike=float(strikes[1]),
+                                                  strike_unit=strike_unit)
+                    if np.ndim(price) != 0 or not np.allclose(price, prices[1], rtol=0.0, atol=0.0, equal_nan=True):
+                        raise RuntimeError("the price of a scalar strike differs from the price in an array.")
+
+        print(f"{sit.name}: {_time_get_price(vol_surface)}")
+
+    print("prices of the compiled kernel match the prices from the separate transformations")
+
+
+def _time_get_price(vol_surface: vs.VolSurface) -> str:
+    strikes = np.linspace(50.0, 150.0, N_TIMED_STRIKES)
+    vol_surface.get_price(price_unit=qproc.PriceUnit.call, expiry=0.7, strike=strikes)
+    start = time.perf_counter()
+    vol_surface.get_price(price_unit=qproc.PriceUnit.call, expiry=0.7, strike=strikes)
+    fused_time = time.perf_counter() - start
+    start = time.perf_counter()
+    vol_surface._get_price_from_transformations(price_unit=qproc.PriceUnit.call, expiry=0.7, strike=strikes,
+                                                strike_unit=qproc.StrikeUnit.strike)
+    chained_time = time.perf_counter() - start
+    return f"get_price {fused_time * 1e3:.3f}ms, separate transformations {chained_time * 1e3:.3f}ms"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+""" This module provides a test of the prices and Greeks of volatility surfaces: the prices must agree with those of
+    get_price, and the Greeks with central differences of the Black prices for the implied volatilities of the surface,
+    for pairs of expiries and strikes before, between, at and beyond the quote expiries, for which get_price returns
+    nan. """
+
+import time
+import numpy as np
+from typing import final
+from py_lets_be_rational.lets_be_rational import black
+import qproc
+import volsurface as vs
+from tests.synthetic_data import get_synthetic_surface
+
+RELATIVE_TOLERANCE: final = 1e-12
+ABSOLUTE_TOLERANCE: final = 1e-12
+DIFFERENCE_RELATIVE_TOLERANCE: final = 1e-5  # the truncation and rounding errors of the central differences
+DIFFERENCE_ABSOLUTE_TOLERANCE: final = 1e-7
+DELTA_FORWARD_BUMP: final = 1e-6  # relative to the forward
+GAMMA_FORWARD_BUMP: final = 1e-4
+VOL_BUMP: final = 1e-5
+QUERY_STRIKES: final = np.linspace(40.0, 180.0, 15)
+N_TIMED_POINTS: final = 100000
+
+
+def main():
+    quote_expiries = np.unique(get_synthetic_surface(seed=0)["expiries"])
+    query_expiries = np.concatenate(([quote_expiries[0] / 2.0], quote_expiries,
+                                     (quote_expiries[1:] + quote_expiries[:-1]) / 2.0, [2.0 * quote_expiries[-1]]))
+    expiries, strikes = (a.ravel() for a in np.meshgrid(query_expiries, QUERY_STRIKES))
+    oqp = qproc.create_q_proc(**get_synthetic_surface(seed=0))
+
+    for sit in (vs.InterpolationType.linear, vs.InterpolationType.ncs, vs.InterpolationType.pchip,
+                vs.InterpolationType.pmc):
+        vol_surface = vs.create(smile_inter_type=sit, oqp=qproc.create_q_proc(**get_synthetic_surface(seed=0)))
+        vol_surface.calibrate()
+        results = vol_surface.get_price_and_greeks(expiries=expiries, strikes=strikes)
+
+        prices = np.array([vol_surface.get_price(price_unit=qproc.PriceUnit.call, expiry=e, strike=np.array([k]))[0]
+                           for e, k in zip(expiries, strikes)])
+        if not np.allclose(results[vs.PRICE_KEY], prices, rtol=RELATIVE_TOLERANCE, atol=ABSOLUTE_TOLERANCE,
+                           equal_nan=True):
+            raise RuntimeError(f"prices of the {sit.name} surface differ from those of get_price.")
+
+        vols = np.array([vol_surface.get_price(price_unit=qproc.PriceUnit.vol, expiry=e, strike=np.array([k]))[0]
+                         for e, k in zip(expiries, strikes)])
+        expected_greeks = {key: np.empty(expiries.size) for key in (vs.DELTA_KEY, vs.VEGA_KEY, vs.GAMMA_KEY)}
+        for i, (expiry, strike, vol) in enumerate(zip(expiries, strikes, vols)):
+            forward, discount_factor = oqp.get_forward(expiry), oqp.get_discount_factor(expiry)
+            price = lambda f, v: discount_factor * black(f, strike, v, expiry, 1.0)
+            h = DELTA_FORWARD_BUMP * forward
+            expected_greeks[vs.DELTA_KEY][i] = (price(forward + h, vol) - price(forward - h, vol)) / (2.0 * h)
+            h = GAMMA_FORWARD_BUMP * forward
+            expected_greeks[vs.GAMMA_KEY][i] = (price(forward + h, vol) - 2.0 * price(forward, vol) +
+                                                price(forward - h, vol)) / h ** 2
+            expected_greeks[vs.VEGA_KEY][i] = (price(forward, vol + VOL_BUMP) - price(forward, vol - VOL_BUMP)) / \
+                (2.0 * VOL_BUMP)
+
+        for key, values in expected_greeks.items():
+            if not np.allclose(results[key], values, rtol=DIFFERENCE_RELATIVE_TOLERANCE,
+                               atol=DIFFERENCE_ABSOLUTE_TOLERANCE, equal_nan=True):
+                raise RuntimeError(f"the {key} of the {sit.name} surface differs from the central differences.")
+
+        moneyness_results = vol_surface.get_price_and_greeks(
+            expiries=expiries, strikes=strikes / np.array([oqp.get_forward(e) for e in expiries]),
+            strike_unit=qproc.StrikeUnit.moneyness)
+        for key, values in results.items():
+            if not np.allclose(moneyness_results[key], values, rtol=RELATIVE_TOLERANCE, atol=ABSOLUTE_TOLERANCE,
+                               equal_nan=True):
+                raise RuntimeError(f"the {key} of the {sit.name} surface depends on the strike unit.")
+
+        scalar_results = vol_surface.get_price_and_greeks(expiries=float(expiries[1]), strikes=float(strikes[1]))
+        if any(np.ndim(v) != 0 or v != results[k][1] for k, v in scalar_results.items()):
+            raise RuntimeError("the results for a scalar pair differ from the results in an array.")
+
+        print(f"{sit.name}: {_time_get_price_and_greeks(vol_surface, query_expiries)}")
+
+    print("prices and Greeks of the volatility surfaces match get_price and the central differences")
+
+
+def _time_get_price_and_greeks(vol_surface: vs.VolSurface, query_expiries: np.ndarray) -> str:
+    rng = np.random.default_rng(0)
+    expiries = rng.choice(query_expiries, size=N_TIMED_POINTS)
+    strikes = rng.uniform(50.0, 150.0, size=N_TIMED_POINTS)
+    vol_surface.get_price_and_greeks(expiries=expiries, strikes=strikes)
+    start = time.perf_counter()
+    vol_surface.get_price_and_greeks(expiries=expiries, strikes=strikes)
+    return f"{N_TIMED_POINTS / (time.perf_counter() - start):.3g} prices with Greeks per second"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+""" This module provides a test of the risk-neutral sampler of volatility surfaces: the CDF tables must be monotone even
+    for call prices with arbitrage, their monotone fit must preserve the forward, the quantiles must invert the CDF
+    tables, and the samples must follow the tabulated CDFs and have the forwards as their means. """
+
+import time
+import numpy as np
+from typing import final
+from py_lets_be_rational.lets_be_rational import black
+import qproc
+import volsurface as vs
+from volsurface.internal.risk_neutral_sampler import compute_monotone_cdf
+from tests.synthetic_data import get_synthetic_surface
+
+N_SAMPLES: final = 1000000
+KS_TOLERANCE: final = 2.0 / np.sqrt(N_SAMPLES)  # beyond the 99.9% quantile of the Kolmogorov-Smirnov statistic
+FORWARD_RELATIVE_TOLERANCE: final = 1e-3  # the standard error of the means, and the mass beyond the strike grids
+INVERSION_TOLERANCE: final = 1e-12
+PROBABILITIES: final = np.linspace(0.001, 0.999, 999)
+
+
+def main():
+    _test_monotone_cdf()
+
+    quote_expiries = np.unique(get_synthetic_surface(seed=0)["expiries"])
+    expiries = np.concatenate((quote_expiries, (quote_expiries[1:] + quote_expiries[:-1]) / 2.0))
+    oqp = qproc.create_q_proc(**get_synthetic_surface(seed=0))
+    for sit in (vs.InterpolationType.linear, vs.InterpolationType.ncs, vs.InterpolationType.pchip):
+        vol_surface = vs.create(smile_inter_type=sit, oqp=qproc.create_q_proc(**get_synthetic_surface(seed=0)))
+        vol_surface.calibrate()
+        sampler = vol_surface.create_risk_neutral_sampler(expiries=expiries)
+
+        rng = np.random.default_rng(0)
+        for expiry in expiries:
+            quantiles = sampler.get_quantiles(expiry=expiry, u=PROBABILITIES)
+            if np.any(np.diff(quantiles) < 0.0) or \
+                    not np.allclose(sampler.compute_cdf(expiry=expiry, x=quantiles), PROBABILITIES, rtol=0.0,
+                                    atol=INVERSION_TOLERANCE):
+                raise RuntimeError(f"the quantiles of the {sit.name} surface do not invert its CDF for expiry "
+                                   f"{expiry}.")
+
+            samples = sampler.sample(expiry=expiry, n_samples=N_SAMPLES, rng=rng)
+            sorted_samples = np.sort(samples)
+            ks_statistic = np.max(np.abs(sampler.compute_cdf(expiry=expiry, x=sorted_samples) -
+                                         np.arange(1, N_SAMPLES + 1) / N_SAMPLES))
+            if ks_statistic > KS_TOLERANCE:
+                raise RuntimeError(f"the samples of the {sit.name} surface do not follow its CDF for expiry {expiry}, "
+                                   f"with a Kolmogorov-Smirnov statistic of {ks_statistic}.")
+
+            forward = oqp.get_forward(expiry)
+            if not np.isclose(np.mean(samples), forward, rtol=FORWARD_RELATIVE_TOLERANCE, atol=0.0):
+                raise RuntimeError(f"the mean of the samples of the {sit.name} surface is {np.mean(samples)} instead "
+                                   f"of the forward {forward} for expiry {expiry}.")
+
+        if not np.array_equal(sampler.sample(expiry=expiries[0], n_samples=10, rng=np.random.default_rng(1)),
+                              sampler.sample(expiry=expiries[0], n_samples=10, rng=np.random.default_rng(1))):
+            raise RuntimeError("the samples of a seeded generator are not reproducible.")
+        if np.ndim(sampler.get_quantiles(expiry=expiries[0], u=0.5)) != 0:
+            raise RuntimeError("the quantile of a scalar probability is not a scalar.")
+        try:
+            sampler.sample(expiry=2.0 * expiries[-1], n_samples=10)
+            raise AssertionError("an expiry without a CDF table was sampled.")
+        except RuntimeError:
+            pass
+
+        print(f"{sit.name}: {_time_sample(sampler, expiries[0])}")
+
+    print("samples of the risk-neutral samplers follow the tabulated CDFs")
+
+
+def _test_monotone_cdf():
+    """ Black prices with a bump, which introduces butterfly arbitrage, yield a CDF that is not monotone; its monotone
+        fit must be monotone and preserve the integral of the CDF, on which the forward depends. """
+
+    strikes = np.linspace(50.0, 150.0, 1001)
+    call_prices = np.array([black(100.0, k, 0.2, 1.0, 1.0) for k in strikes])
+    call_prices += 0.2 * np.exp(-0.5 * ((strikes - 110.0) / 3.0) ** 2)
+    raw_cdf = 1.0 + np.diff(call_prices) / np.diff(strikes)
+    if np.all(np.diff(raw_cdf) >= 0.0) or raw_cdf.min() < 0.0 or raw_cdf.max() > 1.0:
+        raise RuntimeError("the bumped prices do not yield a non-monotone CDF within [0, 1].")
+
+    points, cdf = compute_monotone_cdf(strikes=strikes, undiscounted_call_prices=call_prices)
+    if np.any(np.diff(cdf) < 0.0) or not np.isclose(np.sum(cdf * np.diff(strikes)),
+                                                     np.sum(raw_cdf * np.diff(strikes)), rtol=1e-14, atol=0.0):
+        raise RuntimeError("the monotone fit of the CDF is not monotone, or does not preserve the forward.")
+
+
+def _time_sample(sampler: vs.RiskNeutralSampler, expiry: float) -> str:
+    rng = np.random.default_rng(0)
+    sampler.sample(expiry=expiry, n_samples=10, rng=rng)
+    start = time.perf_counter()
+    sampler.sample(expiry=expiry, n_samples=N_SAMPLES, rng=rng)
+    return f"{N_SAMPLES / (time.perf_counter() - start):.3g} samples per second"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+""" This module provides a test of saving and loading calibrated volatility surfaces: the loaded surfaces must price as
+    the saved surfaces, exactly for the quote expiries and up to rounding for other expiries, for which the forwards and
+    discount factors are interpolated from the saved values. """
+
+import os
+import time
+import tempfile
+import numpy as np
+from typing import final
+import qproc
+import volsurface as vs
+from tests.synthetic_data import get_synthetic_surface
+
+RELATIVE_TOLERANCE: final = 1e-12
+ABSOLUTE_TOLERANCE: final = 1e-12
+QUERY_STRIKES: final = np.linspace(50.0, 150.0, 21)
+
+
+def main():
+    quote_expiries = np.unique(get_synthetic_surface(seed=2)["expiries"])
+    other_expiries = np.concatenate(([quote_expiries[0] / 2.0], (quote_expiries[1:] + quote_expiries[:-1]) / 2.0,
+                                     [2.0 * quote_expiries[-1]]))
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for sit in (vs.InterpolationType.linear, vs.InterpolationType.ncs, vs.InterpolationType.ccs,
+                    vs.InterpolationType.pchip, vs.InterpolationType.pmc):
+            vol_surface = vs.create(smile_inter_type=sit, oqp=qproc.create_q_proc(**get_synthetic_surface(seed=2)))
+            vol_surface.calibrate()
+            path = os.path.join(temp_dir, f"{sit.name}.npy")
+            if sit is vs.InterpolationType.pmc:
+                try:
+                    vol_surface.save(path)
+                    raise AssertionError("a surface with pmc smiles was saved.")
+                except RuntimeError:
+                    continue
+
+            vol_surface.save(path)
+            start = time.perf_counter()
+            loaded_surface = vs.load(path)
+            load_time = time.perf_counter() - start
+
+            for expiry in np.concatenate((quote_expiries, other_expiries)):
+                for price_unit in qproc.PriceUnit:
+                    prices = vol_surface.get_price(price_unit=price_unit, expiry=expiry, strike=QUERY_STRIKES)
+                    loaded_prices = loaded_surface.get_price(price_unit=price_unit, expiry=expiry, strike=QUERY_STRIKES)
+                    if expiry in quote_expiries:
+                        is_equal = np.array_equal(loaded_prices, prices, equal_nan=True)
+                    else:
+                        is_equal = np.allclose(loaded_prices, prices, rtol=RELATIVE_TOLERANCE, atol=ABSOLUTE_TOLERANCE,
+                                               equal_nan=True)
+                    if not is_equal:
+                        raise RuntimeError(f"prices of the loaded {sit.name} surface differ for {price_unit.name} and "
+                                           f"expiry {expiry}.")
+
+            densities = vol_surface.compute_risk_neutral_density(expiry=quote_expiries[1], x=QUERY_STRIKES)
+            loaded_densities = loaded_surface.compute_risk_neutral_density(expiry=quote_expiries[1], x=QUERY_STRIKES)
+            if not np.array_equal(loaded_densities, densities, equal_nan=True):
+                raise RuntimeError(f"densities of the loaded {sit.name} surface differ.")
+
+            try:
+                loaded_surface.calibrate()
+                raise AssertionError("a loaded surface was recalibrated.")
+            except RuntimeError:
+                pass
+
+            print(f"{sit.name}: {os.path.getsize(path)} bytes, loaded in {load_time * 1e6:.0f}us")
+
+    print("loaded volatility surfaces match the saved surfaces")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+""" This module provides a test of the tabulated mode of volatility surfaces: the implied volatilities at the quote
+    expiries must be within the tolerance of the exact volatilities, a table that exceeds the tolerance must be
+    rejected, and the next calibration must end the tabulated mode. """
+
+import time
+import numpy as np
+from typing import final
+import qproc
+import volsurface as vs
+from tests.synthetic_data import get_synthetic_surface
+
+VOL_TOLERANCE: final = 1e-4
+QUERY_STRIKES: final = np.linspace(20.0, 250.0, 10001)
+N_COARSE_POINTS: final = 11
+N_PMC_POINTS: final = 2001  # the pmc splines of computils are slow to evaluate
+PMC_VOL_TOLERANCE: final = 1e-3
+
+
+def main():
+    quote_expiries = np.unique(get_synthetic_surface(seed=0)["expiries"])
+    other_expiries = np.concatenate(([quote_expiries[0] / 2.0], (quote_expiries[1:] + quote_expiries[:-1]) / 2.0,
+                                     [2.0 * quote_expiries[-1]]))
+
+    for sit in (vs.InterpolationType.linear, vs.InterpolationType.ncs, vs.InterpolationType.pchip,
+                vs.InterpolationType.pmc):
+        vol_surface = vs.create(smile_inter_type=sit, oqp=qproc.create_q_proc(**get_synthetic_surface(seed=0)))
+        vol_surface.calibrate()
+        exact_vols = {e: vol_surface.get_price(price_unit=qproc.PriceUnit.vol, expiry=e, strike=QUERY_STRIKES)
+                      for e in np.concatenate((quote_expiries, other_expiries))}
+
+        try:
+            vol_surface.tabulate(n_points=N_COARSE_POINTS, vol_tolerance=VOL_TOLERANCE)
+            raise AssertionError(f"a table of {N_COARSE_POINTS} points was accepted for the {sit.name} surface.")
+        except RuntimeError:
+            pass
+
+        if sit is vs.InterpolationType.pmc:
+            vol_tolerance = PMC_VOL_TOLERANCE
+            vol_surface.tabulate(n_points=N_PMC_POINTS, vol_tolerance=vol_tolerance)
+        else:
+            vol_tolerance = VOL_TOLERANCE
+            vol_surface.tabulate(vol_tolerance=vol_tolerance)
+
+        for expiry in quote_expiries:
+            vols = vol_surface.get_price(price_unit=qproc.PriceUnit.vol, expiry=expiry, strike=QUERY_STRIKES)
+            if not np.all(np.abs(vols - exact_vols[expiry]) <= vol_tolerance):
+                raise RuntimeError(f"tabulated volatilities of the {sit.name} surface exceed the tolerance for expiry "
+                                   f"{expiry}.")
+
+        vol_surface.get_price(price_unit=qproc.PriceUnit.call, expiry=other_expiries[1], strike=QUERY_STRIKES)
+        start = time.perf_counter()
+        vol_surface.get_price(price_unit=qproc.PriceUnit.vol, expiry=other_expiries[1], strike=QUERY_STRIKES)
+        vol_time = time.perf_counter() - start
+        start = time.perf_counter()
+        vol_surface.get_price(price_unit=qproc.PriceUnit.call, expiry=other_expiries[1], strike=QUERY_STRIKES)
+        call_time = time.perf_counter() - start
+
+        vol_surface.calibrate()
+        for expiry, vols in exact_vols.items():
+            if not np.array_equal(vol_surface.get_price(price_unit=qproc.PriceUnit.vol, expiry=expiry,
+                                                        strike=QUERY_STRIKES), vols, equal_nan=True):
+                raise RuntimeError(f"the {sit.name} surface is still tabulated after the calibration.")
+
+        print(f"{sit.name}: {QUERY_STRIKES.size / vol_time:.3g} volatilities and {QUERY_STRIKES.size / call_time:.3g} "
+              f"call prices per second")
+
+    print("tabulated volatility surfaces are within the tolerance of the exact surfaces")
+
+
+if __name__ == "__main__":
+    main()
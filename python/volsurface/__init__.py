@@ -1,5 +1,15 @@
 """ This module serves as the interface of the package. """
 
-from .globals import VolSurface
-from .factory import create, InterpolationType, FilterType
+from .globals import VolSurface, RiskNeutralSampler, PRICE_KEY, DELTA_KEY, VEGA_KEY, GAMMA_KEY
+from .factory import create, create_from_filtered, create_calibrated, load, FilterType
 from .performance_evaluation import compute_pricing_errors, compute_pricing_mae, compute_pricing_rmse
+
+
+def __getattr__(name: str):
+    """ Exposes computils.InterpolationType as volsurface.InterpolationType, while deferring the import of computils to
+        its first use. """
+
+    if name == "InterpolationType":
+        from computils import InterpolationType
+        return InterpolationType
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,23 +1,86 @@
 """ This module allows for creating instances of the VolSurface class. """
 
-from typing import Optional
-from computils import InterpolationType
-from qproc import OptionQuoteProcessor, FilterType
+from typing import Optional, List, Dict, TYPE_CHECKING
+from qproc import OptionQuoteProcessor, FilterType, FilterCache
 from .globals import VolSurface
-from .internal.vol_surface import InternalVolSurface
 
+if TYPE_CHECKING:  # computils is imported on first use only, as it loads numba and scipy
+    from computils import InterpolationType
 
-def create(smile_inter_type: InterpolationType,
+
+def create(smile_inter_type: "InterpolationType",
            oqp: OptionQuoteProcessor,
            filter_type: Optional[FilterType] = FilterType.strike,
            filter_smoothness_param: float = 0.01,
-           extrapolation_param: Optional[float] = 0.5) -> VolSurface:
+           extrapolation_param: Optional[float] = 0.5,
+           filter_cache: Optional[FilterCache] = None) -> VolSurface:
 
     if filter_type is None and extrapolation_param is not None:
         raise RuntimeError("filter_type must not be None for extrapolation.")
 
+    from .internal.vol_surface import InternalVolSurface
+
     return InternalVolSurface(smile_inter_type=smile_inter_type,
                               oqp=oqp,
                               filter_type=filter_type,
                               filter_smoothness_param=filter_smoothness_param,
+                              extrapolation_param=extrapolation_param,
+                              filter_cache=filter_cache)
+
+
+def create_from_filtered(smile_inter_type: "InterpolationType",
+                         oqp: OptionQuoteProcessor,
+                         extrapolation_param: Optional[float] = 0.5) -> VolSurface:
+    """ Creates a volatility surface from a processor whose quotes have already been filtered. The processor is neither
+        filtered again nor modified, such that it may be shared by several volatility surfaces.
+
+    :param smile_inter_type:
+    :param oqp: filtered processor.
+    :param extrapolation_param:
+    :return:
+    """
+
+    if not oqp.is_filtered():
+        raise RuntimeError("the quotes of oqp must be filtered. Call its 'filter' method, or use 'create' instead.")
+
+    from .internal.vol_surface import InternalVolSurface
+
+    return InternalVolSurface(smile_inter_type=smile_inter_type,
+                              oqp=oqp,
+                              filter_type=None,
+                              filter_smoothness_param=None,
                               extrapolation_param=extrapolation_param)
+
+
+def create_calibrated(smile_inter_types: List["InterpolationType"],
+                      oqp: OptionQuoteProcessor,
+                      extrapolation_param: Optional[float] = 0.5) -> Dict["InterpolationType", VolSurface]:
+    """ Creates and calibrates a volatility surface for every smile interpolation type from a processor whose quotes
+        have already been filtered, as create_from_filtered does. The smiles are extracted from the processor once, and
+        shared by all surfaces.
+
+    :param smile_inter_types:
+    :param oqp: filtered processor.
+    :param extrapolation_param:
+    :return: calibrated volatility surfaces by smile interpolation type.
+    """
+
+    if not oqp.is_filtered():
+        raise RuntimeError("the quotes of oqp must be filtered. Call its 'filter' method, or use 'create' instead.")
+
+    from .internal.vol_surface import calibrate_vol_surfaces
+
+    return calibrate_vol_surfaces(smile_inter_types=smile_inter_types, oqp=oqp, extrapolation_param=extrapolation_param)
+
+
+def load(path: str) -> VolSurface:
+    """ Loads a calibrated volatility surface from a file written by VolSurface.save. The loaded surface prices as the
+        saved surface, and cannot be recalibrated.
+
+    :param path:
+    :return:
+    """
+
+    from .internal.vol_surface import load_vol_surface
+
+    return load_vol_surface(path=path)
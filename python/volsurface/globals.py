@@ -1,8 +1,56 @@
 """ This module collects the exposed types from the package. """
 
 from abc import ABC, abstractmethod
-from computils import ScalarOrArray
-from qproc import StrikeUnit, PriceUnit
+import numpy as np
+from typing import Dict, Optional, final
+from qproc import ScalarOrArray, StrikeUnit, PriceUnit
+
+DEFAULT_N_TABULATED_POINTS: final = 20001
+DEFAULT_TABULATION_VOL_TOLERANCE: final = 1e-4
+PRICE_KEY: final = 'price'
+DELTA_KEY: final = 'delta'
+VEGA_KEY: final = 'vega'
+GAMMA_KEY: final = 'gamma'
+DEFAULT_N_CDF_POINTS: final = 4001
+
+
+class RiskNeutralSampler(ABC):
+
+    @abstractmethod
+    def compute_cdf(self,
+                    expiry: float,
+                    x: ScalarOrArray) -> ScalarOrArray:
+        """ Computes the tabulated risk-neutral CDF for values of the underlying asset at expiry.
+
+        :param expiry: one of the expiries of the sampler.
+        :param x:
+        :return: CDF values: an object of the same type and dimension as x.
+        """
+
+    @abstractmethod
+    def get_quantiles(self,
+                      expiry: float,
+                      u: ScalarOrArray) -> ScalarOrArray:
+        """ Returns the values of the underlying asset at expiry for probabilities, i.e., the inverse of the CDF, which
+            turns uniform random numbers of any generator into samples.
+
+        :param expiry: one of the expiries of the sampler.
+        :param u: probabilities in [0, 1].
+        :return: an object of the same type and dimension as u.
+        """
+
+    @abstractmethod
+    def sample(self,
+               expiry: float,
+               n_samples: int,
+               rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """ Draws values of the underlying asset at expiry from the risk-neutral distribution.
+
+        :param expiry: one of the expiries of the sampler.
+        :param n_samples:
+        :param rng: optional, if None a generator is created from fresh entropy.
+        :return: (n_samples,) array.
+        """
 
 
 class VolSurface(ABC):
@@ -29,6 +77,45 @@ class VolSurface(ABC):
         :return: prices: an object with prices for each given strike that is of the same type and dimension as strike.
         """
 
+    @abstractmethod
+    def get_price_and_greeks(self,
+                             expiries: ScalarOrArray,
+                             strikes: ScalarOrArray,
+                             strike_unit: StrikeUnit = StrikeUnit.strike) -> Dict[str, np.ndarray]:
+        """ Returns the call prices and their Greeks for pairs of expiries and strikes in one pass. The Greeks are the
+            Black sensitivities for the implied volatilities of the surface, i.e., the volatility of every pair is held
+            fixed, and delta and gamma are taken with respect to the forward.
+
+        :param expiries: scalar or array of expiries, which is broadcast against strikes.
+        :param strikes: scalar or array of strikes.
+        :param strike_unit:
+        :return: arrays of the broadcast shape with the keys PRICE_KEY, DELTA_KEY, VEGA_KEY and GAMMA_KEY.
+        """
+
+    @abstractmethod
+    def tabulate(self,
+                 n_points: int = DEFAULT_N_TABULATED_POINTS,
+                 vol_tolerance: float = DEFAULT_TABULATION_VOL_TOLERANCE):
+        """ Switches to the tabulated mode, in which get_price looks up the total variances in a dense table of the
+            calibrated smiles instead of evaluating the smiles, which suits many queries of the same surface. The
+            error of the table is checked against the smiles, and the mode ends with the next calibration.
+
+        :param n_points: number of points of the uniform grid of log-moneyness of the table.
+        :param vol_tolerance: maximum absolute error in implied volatility; a RuntimeError is raised if the table
+            exceeds it.
+        :return:
+        """
+
+    @abstractmethod
+    def save(self, path: str):
+        """ Saves the calibrated volatility surface to a compact binary file, from which it is restored by
+            volsurface.load without the quotes. The file is memory-mapped when loaded, such that processes that load
+            the same file share its memory.
+
+        :param path: path of the file, which should end with .npy.
+        :return:
+        """
+
     @abstractmethod
     def compute_risk_neutral_density(self,
                                      expiry: float,
@@ -40,6 +127,19 @@ class VolSurface(ABC):
         :return: risk-neutral density values: an object of the same time and dimension as x.
         """
 
+    @abstractmethod
+    def create_risk_neutral_sampler(self,
+                                    expiries: ScalarOrArray,
+                                    n_points: int = DEFAULT_N_CDF_POINTS) -> RiskNeutralSampler:
+        """ Creates a sampler from the risk-neutral distributions of the given expiries, whose CDFs are tabulated once
+            on strike grids of n_points strikes and made monotone, such that samples are drawn by vectorized
+            interpolation instead of evaluating the surface.
+
+        :param expiries:
+        :param n_points: number of strikes of the grid of every expiry.
+        :return:
+        """
+
     @abstractmethod
     def compute_risk_neutral_cdf(self,
                                  expiry: float,
@@ -3,8 +3,8 @@
 import numpy as np
 from enum import Enum
 from bisect import bisect_left
-from typing import List, Callable, Tuple, Union
-import computils as nc
+from typing import List, Callable, Tuple, Union, Optional
+from qproc import Scalar, ScalarOrArray
 
 
 class FuncInterType(Enum):
@@ -27,33 +27,51 @@ def compute_weights(z: float,
 class FunctionalInterpolator:
     def __init__(self,
                  independent_variables: np.ndarray,
-                 funcs: List[Callable[[nc.ScalarOrArray], nc.ScalarOrArray]],
+                 funcs: List[Callable[[ScalarOrArray], ScalarOrArray]],
                  f_inter_type: FuncInterType):
 
         self.independent_variables: np.ndarray = independent_variables
-        self.funcs: List[Callable[[nc.ScalarOrArray], nc.ScalarOrArray]] = funcs
+        self.funcs: List[Callable[[ScalarOrArray], ScalarOrArray]] = funcs
         self.f_inter_type: FuncInterType = f_inter_type
 
     def __call__(self,
-                 x: nc.ScalarOrArray,
-                 y: nc.Scalar) -> nc.ScalarOrArray:
+                 x: ScalarOrArray,
+                 y: Scalar) -> ScalarOrArray:
 
         func = self.get_func(y)
         return func(x)
 
-    def get_func(self, y: nc.Scalar) -> Callable[[nc.ScalarOrArray], nc.ScalarOrArray]:
+    def get_func(self, y: Scalar) -> Callable[[ScalarOrArray], ScalarOrArray]:
+        funcs, weights = self.get_funcs_and_weights(y)
+        if weights is None:
+            return funcs[0]
+
+        w_left, w_right = weights
+        func = lambda z: w_left * funcs[0](z) + w_right * funcs[1](z)
+        return func
+
+    def get_funcs_and_weights(self, y: Scalar) -> Tuple[List[Callable[[ScalarOrArray], ScalarOrArray]],
+                                                        Optional[Tuple[float, float]]]:
+        """ Returns the functions that are combined for y, which are the left and right functions with their weights
+            if y is bracketed by two independent variables, and a single function with weights None otherwise. """
+
+        indices, weights = self.get_indices_and_weights(y)
+        return [self.funcs[i] for i in indices], weights
+
+    def get_indices_and_weights(self, y: Scalar) -> Tuple[List[int], Optional[Tuple[float, float]]]:
+        """ Returns the indices of the functions that are combined for y, with their weights as in
+            get_funcs_and_weights. """
+
         indices = self._get_indices(y)
         if isinstance(indices, int):
-            return self.funcs[indices]
+            return [indices % len(self.funcs)], None
 
         y_left = self.independent_variables[indices[0]]
         y_right = self.independent_variables[indices[1]]
-        w_left, w_right = compute_weights(z=y, z_left=y_left, z_right=y_right, f_inter_type=self.f_inter_type)
-
-        func = lambda z: w_left * self.funcs[indices[0]](z) + w_right * self.funcs[indices[1]](z)
-        return func
+        weights = compute_weights(z=y, z_left=y_left, z_right=y_right, f_inter_type=self.f_inter_type)
+        return list(indices), weights
 
-    def _get_indices(self, y: nc.Scalar) -> Union[int, Tuple[int, int]]:
+    def _get_indices(self, y: Scalar) -> Union[int, Tuple[int, int]]:
         i = bisect_left(self.independent_variables, y)
         if i == self.independent_variables.size:  # exceeds rhs
             return -1
@@ -0,0 +1,160 @@
+""" This module implements the sampler of terminal prices from the risk-neutral distributions of a volatility surface.
+    The CDF of every expiry is tabulated once from the undiscounted call prices of the surface on a strike grid, as
+    1 + dC/dK by differences of the prices, and samples are drawn by inverting the table by linear interpolation. A
+    guide table, which holds the first point of the CDF table for every interval of probabilities of equal length,
+    replaces the binary search of the inversion by a few comparisons. """
+
+import numpy as np
+from math import isnan, nan
+from typing import Dict, Tuple, Optional, final
+from py_lets_be_rational.numba_helper import maybe_jit
+from qproc import ScalarOrArray, PriceUnit
+from ..globals import VolSurface, RiskNeutralSampler
+
+N_STD_DEVS: final = 8.0  # half width of the strike grid in maximum standard deviations of the log-moneyness
+
+
+def compute_monotone_cdf(strikes: np.ndarray,
+                         undiscounted_call_prices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """ Computes the CDF at the midpoints of the strikes as 1 + dC/dK, by differences of the call prices. The CDF of
+        arbitrage-free prices, which are convex in the strike, is non-decreasing and lies in [0, 1]. For prices with
+        butterfly or call spread arbitrage, the CDF is replaced by its least-squares non-decreasing fit with the strike
+        spacings as weights, which preserves the integral of the CDF over the grid and thus the forward, and is then
+        clipped to [0, 1]. The running maximum would shift the mass of the distribution towards low prices instead.
+
+    :param strikes: (n,) array of increasing strikes.
+    :param undiscounted_call_prices: (n,) array.
+    :return: the (n - 1,) midpoints of the strikes and the CDF at the midpoints.
+    """
+
+    spacings = np.diff(strikes)
+    cdf = _pool_adjacent_violators(values=1.0 + np.diff(undiscounted_call_prices) / spacings, weights=spacings)
+    return 0.5 * (strikes[1:] + strikes[:-1]), np.clip(cdf, 0.0, 1.0)
+
+
+@maybe_jit(cache=True, nopython=True, nogil=True)
+def _pool_adjacent_violators(values, weights):
+    """ Returns the non-decreasing sequence that minimizes the weighted squared distance to values, by pooling adjacent
+        blocks of values that violate the order into their weighted means. """
+
+    block_values = np.empty(values.size)
+    block_weights = np.empty(values.size)
+    block_ends = np.empty(values.size, dtype=np.int64)
+    n_blocks = 0
+    for i in range(values.size):
+        block_values[n_blocks] = values[i]
+        block_weights[n_blocks] = weights[i]
+        block_ends[n_blocks] = i + 1
+        n_blocks += 1
+        while n_blocks > 1 and block_values[n_blocks - 2] > block_values[n_blocks - 1]:
+            pooled_weight = block_weights[n_blocks - 2] + block_weights[n_blocks - 1]
+            block_values[n_blocks - 2] = (block_weights[n_blocks - 2] * block_values[n_blocks - 2] +
+                                          block_weights[n_blocks - 1] * block_values[n_blocks - 1]) / pooled_weight
+            block_weights[n_blocks - 2] = pooled_weight
+            block_ends[n_blocks - 2] = block_ends[n_blocks - 1]
+            n_blocks -= 1
+
+    fitted_values = np.empty(values.size)
+    start = 0
+    for b in range(n_blocks):
+        fitted_values[start:block_ends[b]] = block_values[b]
+        start = block_ends[b]
+
+    return fitted_values
+
+
+@maybe_jit(cache=True, nopython=True, nogil=True)
+def _compute_quantiles(points, cdf, guide, u, quantiles):
+    """ Fills quantiles with the inverse of the CDF table at the probabilities u by linear interpolation between the
+        points i - 1 and i, where i is the first point with cdf[i] >= u, such that the flat parts of the CDF are
+        skipped. Probabilities beyond the CDF table map to the first and last points.
+
+    :param points: (n,) array of the points of the CDF table.
+    :param cdf: (n,) array of the non-decreasing CDF at the points.
+    :param guide: (n + 1,) array, whose j-th value is the first i with cdf[i] >= j / n.
+    :param u: (m,) array of probabilities.
+    :param quantiles: (m,) array that is filled with the quantiles.
+    """
+
+    n_intervals = guide.size - 1
+    for k in range(u.size):
+        if isnan(u[k]):
+            quantiles[k] = nan
+            continue
+
+        i = guide[min(max(int(u[k] * n_intervals), 0), n_intervals - 1)]
+        while i < cdf.size and cdf[i] < u[k]:
+            i += 1
+        i = min(max(i, 1), cdf.size - 1)
+
+        weight = 1.0
+        if cdf[i] > cdf[i - 1]:
+            weight = min(max((u[k] - cdf[i - 1]) / (cdf[i] - cdf[i - 1]), 0.0), 1.0)
+        quantiles[k] = points[i - 1] + weight * (points[i] - points[i - 1])
+
+
+class InternalRiskNeutralSampler(RiskNeutralSampler):
+    def __init__(self,
+                 vol_surface: VolSurface,
+                 expiries: np.ndarray,
+                 forwards: np.ndarray,
+                 max_total_vars: np.ndarray,
+                 n_points: int):
+        """
+
+        :param vol_surface: calibrated volatility surface.
+        :param expiries: (n,) array of distinct expiries.
+        :param forwards: (n,) array of the forwards for the expiries, at which the strike grids are centered.
+        :param max_total_vars: (n,) array of the maximum total variances of the surface for the expiries, which
+            determine the widths of the strike grids, such that the mass beyond the grids is negligible.
+        :param n_points: number of strikes of the grid of every expiry.
+        """
+
+        if n_points < 3:
+            raise RuntimeError("the strike grid must have at least three points.")
+
+        self._cdf_tables: Dict[float, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        for expiry, forward, max_total_var in zip(expiries.tolist(), forwards.tolist(), max_total_vars.tolist()):
+            half_width = N_STD_DEVS * np.sqrt(max_total_var)
+            if not half_width > 0.0:
+                raise RuntimeError(f"the surface has no positive variance for expiry {expiry}.")
+
+            strikes = forward * np.exp(np.linspace(-half_width, half_width, n_points))
+            points, cdf = compute_monotone_cdf(strikes=strikes, undiscounted_call_prices=vol_surface.get_price(
+                price_unit=PriceUnit.undiscounted_call, expiry=expiry, strike=strikes))
+            guide = np.searchsorted(cdf, np.arange(cdf.size + 1) / cdf.size, side='left')
+            self._cdf_tables[expiry] = (points, cdf, guide)
+
+    def compute_cdf(self,
+                    expiry: float,
+                    x: ScalarOrArray) -> ScalarOrArray:
+
+        points, cdf, _ = self._get_cdf_table(expiry)
+        return np.interp(x, points, cdf, left=0.0, right=1.0)
+
+    def get_quantiles(self,
+                      expiry: float,
+                      u: ScalarOrArray) -> ScalarOrArray:
+
+        points, cdf, guide = self._get_cdf_table(expiry)
+        u = np.asarray(u, dtype=float)
+        quantiles = np.empty(u.shape)
+        _compute_quantiles(points, cdf, guide, u.ravel(), quantiles.reshape(-1))
+        return quantiles if quantiles.ndim > 0 else quantiles[()]
+
+    def sample(self,
+               expiry: float,
+               n_samples: int,
+               rng: Optional[np.random.Generator] = None) -> np.ndarray:
+
+        if rng is None:
+            rng = np.random.default_rng()
+
+        return self.get_quantiles(expiry=expiry, u=rng.random(n_samples))
+
+    def _get_cdf_table(self, expiry: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        cdf_table = self._cdf_tables.get(float(expiry))
+        if cdf_table is None:
+            raise RuntimeError(f"the sampler has no CDF table for expiry {expiry}; create it with this expiry.")
+
+        return cdf_table
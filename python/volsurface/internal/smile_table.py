@@ -0,0 +1,68 @@
+""" This module implements the table of the tabulated mode of volatility surfaces, which holds the total variances of
+    all smiles on a uniform grid of log-moneyness. Since the surface interpolates the total variance linearly between
+    the smile expiries, interpolating the table linearly in the expiry is exact, and the error of the tabulated mode is
+    that of the linear interpolation in log-moneyness. """
+
+import numpy as np
+from typing import List, Callable, final
+from qproc import ScalarOrArray
+
+N_CHECKED_POINTS_PER_CELL: final = 3  # at a quarter, half and three quarters of each grid cell
+
+
+class SmileTable:
+    def __init__(self,
+                 total_vars: np.ndarray,
+                 log_moneyness_start: float,
+                 log_moneyness_step: float):
+        """
+
+        :param total_vars: (n_smiles, n_points) array of total variances.
+        :param log_moneyness_start: the first point of the grid.
+        :param log_moneyness_step: the distance between the points of the grid.
+        """
+
+        self.total_vars: np.ndarray = total_vars
+        self.log_moneyness_start: float = log_moneyness_start
+        self.log_moneyness_step: float = log_moneyness_step
+
+
+def create_smile_table(smiles: List[Callable[[ScalarOrArray], ScalarOrArray]],
+                       expiries: np.ndarray,
+                       log_moneyness_start: float,
+                       log_moneyness_end: float,
+                       n_points: int,
+                       vol_tolerance: float) -> SmileTable:
+    """ Tabulates the smiles, which are flat beyond [log_moneyness_start, log_moneyness_end], and checks the error of
+        the linear interpolation of the table against the smiles inside every grid cell.
+
+    :param smiles: functions that return the total variances of the smiles for log-moneyness.
+    :param expiries: expiries of the smiles.
+    :param log_moneyness_start:
+    :param log_moneyness_end:
+    :param n_points: number of points of the grid.
+    :param vol_tolerance: maximum absolute error in implied volatility.
+    :return:
+    """
+
+    if n_points < 2 or not log_moneyness_end > log_moneyness_start:
+        raise RuntimeError("the grid must have at least two points, and span a positive range of log-moneyness.")
+
+    grid, log_moneyness_step = np.linspace(log_moneyness_start, log_moneyness_end, n_points, retstep=True)
+    total_vars = np.array([smile(grid) for smile in smiles], dtype=float)
+
+    fractions = np.arange(1, N_CHECKED_POINTS_PER_CELL + 1) / (N_CHECKED_POINTS_PER_CELL + 1)
+    checked_points = (grid[:-1, np.newaxis] + fractions * log_moneyness_step).ravel()
+    interpolated_total_vars = (total_vars[:, :-1, np.newaxis] * (1.0 - fractions) +
+                               total_vars[:, 1:, np.newaxis] * fractions).reshape((len(smiles), -1))
+    exact_total_vars = np.array([smile(checked_points) for smile in smiles], dtype=float)
+    vol_errors = np.abs(np.sqrt(interpolated_total_vars / expiries[:, np.newaxis]) -
+                        np.sqrt(exact_total_vars / expiries[:, np.newaxis]))
+    if np.nanmax(vol_errors, initial=0.0) > vol_tolerance:
+        smile_index, point_index = np.unravel_index(np.nanargmax(vol_errors), vol_errors.shape)
+        raise RuntimeError(f"the error of the table exceeds the tolerance of {vol_tolerance} with "
+                           f"{vol_errors[smile_index, point_index]} for expiry {expiries[smile_index]} and "
+                           f"log-moneyness {checked_points[point_index]}; increase the number of points of the grid.")
+
+    return SmileTable(total_vars=total_vars, log_moneyness_start=float(log_moneyness_start),
+                      log_moneyness_step=float(log_moneyness_step))
@@ -0,0 +1,143 @@
+""" This module implements the file format of calibrated volatility surfaces. A surface file holds the smile expiries,
+    the forwards and discount factors for these expiries, and the knots, volatilities and piecewise polynomial
+    coefficients of every smile, as a single float64 array in NumPy's .npy format. The file is loaded as a read-only
+    memory map, such that a surface file is shared by all processes that load it, and loading takes microseconds.
+
+    Layout of the array, with n_e expiries and n_k knots in total:
+        header:             [format version, smile interpolation type, n_e, n_k]
+        expiries:           n_e values, in ascending order
+        forwards:           n_e values
+        discount factors:   n_e values
+        knot offsets:       n_e + 1 values, such that the knots of the i-th smile are those from offsets[i] to
+                            offsets[i + 1]
+        knots:              n_k values, in log-moneyness
+        volatilities:       n_k values
+        coefficients:       4 * (n_k - n_e) values, the (4, n_i - 1) coefficients of every smile in C order """
+
+import os
+import numpy as np
+from typing import List, Tuple, Dict, final
+from qproc import ScalarOrArray, PriceUnit, StrikeUnit, ForwardCurve, RateCurve, create_forward_curve, \
+    create_rate_curve
+from qproc.internal.quote_transformation import transform_strike, transform_price
+
+SURFACE_FORMAT_VERSION: final = 1
+HEADER_SIZE: final = 4
+N_COEFFICIENTS: final = 4
+
+PiecewisePolynomial: final = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+class TabulatedCurves:
+    """ Forwards and discount factors of a loaded surface, which take the place of the processor of a calibrated
+        surface. The values for the smile expiries are those of the processor, and the values for other expiries are
+        interpolated as by the curves that create_q_proc creates from arrays. """
+
+    def __init__(self,
+                 expiries: np.ndarray,
+                 forwards: np.ndarray,
+                 discount_factors: np.ndarray):
+
+        self._forward_curve: ForwardCurve = create_forward_curve(spot=forwards[0], times=expiries, forwards=forwards)
+        self._rate_curve: RateCurve = create_rate_curve(times=expiries, zero_rates=-np.log(discount_factors) / expiries)
+        self._forwards_for_expiries: Dict[float, float] = dict(zip(expiries.tolist(), forwards.tolist()))
+        self._discount_factors_for_expiries: Dict[float, float] = dict(zip(expiries.tolist(),
+                                                                           discount_factors.tolist()))
+
+    def get_forward(self, expiry: float) -> float:
+        forward = self._forwards_for_expiries.get(expiry)
+        if forward is None:  # expiry not tabulated
+            forward = self._forward_curve.get_forward(expiry)
+
+        return forward
+
+    def get_discount_factor(self, expiry: float) -> float:
+        discount_factor = self._discount_factors_for_expiries.get(expiry)
+        if discount_factor is None:  # expiry not tabulated
+            discount_factor = self._rate_curve.get_discount_factor(expiry)
+
+        return discount_factor
+
+    def transform_strike(self,
+                         expiry: float,
+                         strike: ScalarOrArray,
+                         input_strike_unit: StrikeUnit,
+                         output_strike_unit: StrikeUnit) -> ScalarOrArray:
+
+        return transform_strike(strike=strike, input_strike_unit=input_strike_unit,
+                                output_strike_unit=output_strike_unit, forward=self.get_forward(expiry))
+
+    def transform_price(self,
+                        strike: ScalarOrArray,
+                        strike_unit: StrikeUnit,
+                        price: ScalarOrArray,
+                        input_price_unit: PriceUnit,
+                        output_price_unit: PriceUnit,
+                        expiry: float) -> ScalarOrArray:
+
+        return transform_price(strike=strike, strike_unit=strike_unit, price=price, input_price_unit=input_price_unit,
+                               output_price_unit=output_price_unit, expiry=expiry,
+                               discount_factor=self.get_discount_factor(expiry), forward=self.get_forward(expiry))
+
+
+def write_surface_file(path: str,
+                       inter_type_value: int,
+                       expiries: np.ndarray,
+                       forwards: np.ndarray,
+                       discount_factors: np.ndarray,
+                       piecewise_polynomials: List[PiecewisePolynomial]):
+    """ Writes a surface file; the file is written to a temporary path first, such that a surface file that is read
+        concurrently is replaced as a whole.
+
+    :param path: path of the surface file, which should end with .npy.
+    :param inter_type_value: value of the smile interpolation type.
+    :param expiries: (n_e,) array of smile expiries.
+    :param forwards: (n_e,) array.
+    :param discount_factors: (n_e,) array.
+    :param piecewise_polynomials: knots, volatilities and coefficients of every smile.
+    :return:
+    """
+
+    n_knots = np.array([p[0].size for p in piecewise_polynomials], dtype=np.int64)
+    knot_offsets = np.concatenate(([0], np.cumsum(n_knots)))
+    header = np.array([SURFACE_FORMAT_VERSION, inter_type_value, expiries.size, knot_offsets[-1]], dtype=float)
+    sections = [header, expiries, forwards, discount_factors, knot_offsets] + \
+               [p[0] for p in piecewise_polynomials] + [p[1] for p in piecewise_polynomials] + \
+               [p[2].ravel() for p in piecewise_polynomials]
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        np.save(f, np.concatenate([np.asarray(s, dtype=float) for s in sections]))
+    os.replace(temp_path, path)
+
+
+def read_surface_file(path: str) -> Tuple[int, np.ndarray, np.ndarray, np.ndarray, List[PiecewisePolynomial]]:
+    """ Reads a surface file as a read-only memory map; the returned arrays are views of the memory map.
+
+    :param path:
+    :return: the value of the smile interpolation type, the expiries, forwards and discount factors, and the knots,
+        volatilities and coefficients of every smile.
+    """
+
+    data = np.asarray(np.load(path, mmap_mode="r"))  # a view as an ndarray, which can be passed to compiled code
+    if data.ndim != 1 or data.size < HEADER_SIZE or data[0] != SURFACE_FORMAT_VERSION:
+        raise RuntimeError(f"{path} is not a surface file of format version {SURFACE_FORMAT_VERSION}.")
+
+    inter_type_value, n_expiries, n_knots = int(data[1]), int(data[2]), int(data[3])
+    n_values = HEADER_SIZE + 4 * n_expiries + 1 + 2 * n_knots + N_COEFFICIENTS * (n_knots - n_expiries)
+    if data.size != n_values:
+        raise RuntimeError(f"{path} holds {data.size} values instead of the {n_values} values of its header.")
+
+    expiries, forwards, discount_factors, knot_offsets, knots, values, coefficients = np.split(
+        data, np.cumsum([HEADER_SIZE, n_expiries, n_expiries, n_expiries, n_expiries + 1, n_knots, n_knots]))[1:]
+    knot_offsets = knot_offsets.astype(np.int64)
+    coefficient_offsets = N_COEFFICIENTS * (knot_offsets - np.arange(n_expiries + 1))
+
+    piecewise_polynomials = []
+    for i in range(n_expiries):
+        smile_knots = knots[knot_offsets[i]:knot_offsets[i + 1]]
+        smile_coefficients = coefficients[coefficient_offsets[i]:coefficient_offsets[i + 1]].reshape(
+            (N_COEFFICIENTS, smile_knots.size - 1))
+        piecewise_polynomials.append((smile_knots, values[knot_offsets[i]:knot_offsets[i + 1]], smile_coefficients))
+
+    return inter_type_value, expiries, forwards, discount_factors, piecewise_polynomials
@@ -0,0 +1,213 @@
+""" This module implements the compiled kernels that evaluate a volatility surface, whose smiles are piecewise
+    polynomials in log-moneyness, for many strikes of an expiry. The kernels fuse the steps of
+    InternalVolSurface.get_price, i.e., the transformation of the strikes, the evaluation of the smiles, the
+    interpolation of the total variance in the expiry, and the transformation of the total variance to the requested
+    price unit, into a single loop over the strikes, and release the GIL. In the tabulated mode of the surface, the
+    total variances of the smiles are looked up in a table instead of evaluated. The Greeks of the surface are computed
+    from its total variances in a single loop as well.
+
+    Remark: the strike and price units are passed by the values of their enums, since enums cannot be passed to compiled
+    code. """
+
+import numpy as np
+from math import exp, log, sqrt, erfc, pi, isnan, nan
+from typing import final
+from py_lets_be_rational.numba_helper import maybe_jit
+from py_lets_be_rational.lets_be_rational import black
+from qproc import PriceUnit, StrikeUnit
+
+STRIKE: final = StrikeUnit.strike.value
+MONEYNESS: final = StrikeUnit.moneyness.value
+VOL: final = PriceUnit.vol.value
+CALL: final = PriceUnit.call.value
+UNDISCOUNTED_CALL: final = PriceUnit.undiscounted_call.value
+NORMALIZED_CALL: final = PriceUnit.normalized_call.value
+TOTAL_VAR: final = PriceUnit.total_var.value
+SQRT_2: final = sqrt(2.0)
+ONE_OVER_SQRT_2PI: final = 1.0 / sqrt(2.0 * pi)
+
+
+@maybe_jit(cache=True, nopython=True, nogil=True)
+def _evaluate_smile(knots, values, coefficients, x):
+    """ Evaluates a piecewise cubic polynomial with flat extrapolation, in the order of operations of scipy's PPoly,
+        which reproduces np.interp for the linear smiles, whose coefficients of the higher powers are zero. """
+
+    if x < knots[0]:
+        return values[0]
+    if x > knots[-1]:
+        return values[-1]
+
+    interval = min(np.searchsorted(knots, x, side='right') - 1, knots.size - 2)
+    s = x - knots[interval]
+    value = 0.0
+    power = 1.0
+    for k in range(coefficients.shape[0]):
+        value = value + coefficients[coefficients.shape[0] - k - 1, interval] * power
+        power *= s
+
+    return value
+
+
+@maybe_jit(cache=True, nopython=True, nogil=True)
+def _look_up_total_var(total_vars, row, log_moneyness_start, log_moneyness_step, x):
+    """ Interpolates a row of the table of total variances linearly, with flat extrapolation beyond the grid. """
+
+    if isnan(x):
+        return nan
+
+    n_points = total_vars.shape[1]
+    position = (x - log_moneyness_start) / log_moneyness_step
+    if position <= 0.0:
+        return total_vars[row, 0]
+    if position >= n_points - 1:
+        return total_vars[row, n_points - 1]
+
+    i = int(position)
+    return total_vars[row, i] + (position - i) * (total_vars[row, i + 1] - total_vars[row, i])
+
+
+@maybe_jit(cache=True, nopython=True, nogil=True)
+def _compute_log_moneyness(strike, strike_unit, forward):
+    """ Transforms a strike to log-moneyness in the order of operations of quote_transformation. """
+
+    if strike_unit == STRIKE:
+        return log(strike / forward)
+    elif strike_unit == MONEYNESS:
+        return log(strike * forward / forward)
+    else:
+        return strike
+
+
+@maybe_jit(cache=True, nopython=True, nogil=True)
+def _compute_price(total_var, log_moneyness, price_unit, expiry, forward, discount_factor):
+    """ Transforms a total variance to the price unit in the order of operations of quote_transformation. """
+
+    if price_unit == TOTAL_VAR:
+        return total_var
+
+    vol = sqrt(total_var / expiry)
+    if price_unit == VOL:
+        return vol
+
+    price = discount_factor * black(forward, exp(log_moneyness) * forward, vol, expiry, 1.0)
+    if price_unit == UNDISCOUNTED_CALL:
+        price /= discount_factor
+    elif price_unit == NORMALIZED_CALL:
+        price /= discount_factor * forward
+
+    return price
+
+
+@maybe_jit(cache=True, nopython=True, nogil=True)
+def compute_surface_prices(strikes, strike_unit, left_knots, left_values, left_coefficients, left_expiry, right_knots,
+                           right_values, right_coefficients, right_expiry, left_weight, right_weight, is_interpolated,
+                           price_unit, expiry, forward, discount_factor, prices):
+    """ Fills prices with the prices for the given strikes, in the same order of operations as get_price.
+
+    :param strikes: (n,) array of strikes in the strike unit.
+    :param strike_unit:
+    :param left_knots: log-moneyness of the knots of the left smile.
+    :param left_values: volatilities at the knots of the left smile.
+    :param left_coefficients: (k, n_knots - 1) coefficients of the left smile, as those of scipy's PPoly.
+    :param left_expiry:
+    :param right_knots: the right smile is used only if is_interpolated.
+    :param right_values:
+    :param right_coefficients:
+    :param right_expiry:
+    :param left_weight: weights of the total variances of the smiles, as those of the FunctionalInterpolator.
+    :param right_weight:
+    :param is_interpolated: whether the expiry lies between the expiries of the smiles.
+    :param price_unit:
+    :param expiry:
+    :param forward:
+    :param discount_factor:
+    :param prices: (n,) array that is filled with the prices.
+    """
+
+    for i in range(strikes.size):
+        log_moneyness = _compute_log_moneyness(strikes[i], strike_unit, forward)
+        vol = _evaluate_smile(left_knots, left_values, left_coefficients, log_moneyness)
+        total_var = vol ** 2 * left_expiry
+        if is_interpolated:
+            vol = _evaluate_smile(right_knots, right_values, right_coefficients, log_moneyness)
+            total_var = left_weight * total_var + right_weight * (vol ** 2 * right_expiry)
+
+        prices[i] = _compute_price(total_var, log_moneyness, price_unit, expiry, forward, discount_factor)
+
+
+@maybe_jit(cache=True, nopython=True, nogil=True)
+def compute_tabulated_prices(strikes, strike_unit, total_vars, log_moneyness_start, log_moneyness_step, left_row,
+                             right_row, left_weight, right_weight, is_interpolated, price_unit, expiry, forward,
+                             discount_factor, prices):
+    """ Fills prices with the prices for the given strikes as compute_surface_prices does, with the total variances of
+        the smiles looked up in a table.
+
+    :param strikes: (n,) array of strikes in the strike unit.
+    :param strike_unit:
+    :param total_vars: (n_smiles, n_points) table of the total variances of the smiles on a uniform grid of
+        log-moneyness.
+    :param log_moneyness_start: the first point of the grid.
+    :param log_moneyness_step: the distance between the points of the grid.
+    :param left_row: row of the left smile.
+    :param right_row: row of the right smile, which is used only if is_interpolated.
+    :param left_weight:
+    :param right_weight:
+    :param is_interpolated:
+    :param price_unit:
+    :param expiry:
+    :param forward:
+    :param discount_factor:
+    :param prices: (n,) array that is filled with the prices.
+    """
+
+    for i in range(strikes.size):
+        log_moneyness = _compute_log_moneyness(strikes[i], strike_unit, forward)
+        total_var = _look_up_total_var(total_vars, left_row, log_moneyness_start, log_moneyness_step, log_moneyness)
+        if is_interpolated:
+            total_var = left_weight * total_var + right_weight * _look_up_total_var(
+                total_vars, right_row, log_moneyness_start, log_moneyness_step, log_moneyness)
+
+        prices[i] = _compute_price(total_var, log_moneyness, price_unit, expiry, forward, discount_factor)
+
+
+@maybe_jit(cache=True, nopython=True, nogil=True)
+def compute_prices_and_greeks(strikes, strike_unit, total_vars, expiries, forwards, discount_factors, prices, deltas,
+                              vegas, gammas):
+    """ Fills prices with the call prices for the given strikes and total variances, as _compute_price does, and the
+        Greeks with the Black sensitivities for the implied volatilities of the total variances, which share d1 and
+        the normal density at d1.
+
+    :param strikes: (n,) array of strikes in the strike unit.
+    :param strike_unit:
+    :param total_vars: (n,) array of the total variances of the surface.
+    :param expiries: (n,) array.
+    :param forwards: (n,) array of the forwards for the expiries.
+    :param discount_factors: (n,) array of the discount factors for the expiries.
+    :param prices: (n,) array that is filled with the call prices.
+    :param deltas: (n,) array that is filled with the derivatives of the prices with respect to the forwards.
+    :param vegas: (n,) array that is filled with the derivatives of the prices with respect to the volatilities.
+    :param gammas: (n,) array that is filled with the second derivatives of the prices with respect to the forwards.
+    """
+
+    for i in range(strikes.size):
+        forward = forwards[i]
+        discount_factor = discount_factors[i]
+        log_moneyness = _compute_log_moneyness(strikes[i], strike_unit, forward)
+        prices[i] = _compute_price(total_vars[i], log_moneyness, CALL, expiries[i], forward, discount_factor)
+
+        std_dev = sqrt(total_vars[i])
+        if std_dev > 0.0:
+            d1 = -log_moneyness / std_dev + 0.5 * std_dev
+            density = exp(-0.5 * d1 * d1) * ONE_OVER_SQRT_2PI
+            deltas[i] = discount_factor * 0.5 * erfc(-d1 / SQRT_2)
+            vegas[i] = discount_factor * forward * density * sqrt(expiries[i])
+            gammas[i] = discount_factor * density / (forward * std_dev)
+        elif std_dev == 0.0:  # the price is the intrinsic value
+            deltas[i] = discount_factor if log_moneyness < 0.0 else (0.5 * discount_factor if log_moneyness == 0.0
+                                                                     else 0.0)
+            vegas[i] = 0.0
+            gammas[i] = 0.0
+        else:
+            deltas[i] = nan
+            vegas[i] = nan
+            gammas[i] = nan
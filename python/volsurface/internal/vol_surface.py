@@ -2,17 +2,22 @@
 
 import numpy as np
 import computils as nc
-from typing import Optional, List, Tuple, final
+from typing import Optional, List, Tuple, Dict, Union, final
 from computils import InterpolationType, Interpolator, create_interpolator, ExtrapolationType
-from qproc import ScalarOrArray, PriceUnit, StrikeUnit, OptionQuoteProcessor, FilterType, EXPIRY_KEY, STRIKE_KEY, \
+from qproc import ScalarOrArray, PriceUnit, StrikeUnit, OptionQuoteProcessor, FilterType, FilterCache, STRIKE_KEY, \
     MID_KEY
-from ..globals import VolSurface
+from ..globals import VolSurface, RiskNeutralSampler, DEFAULT_N_TABULATED_POINTS, DEFAULT_TABULATION_VOL_TOLERANCE, \
+    DEFAULT_N_CDF_POINTS, PRICE_KEY, DELTA_KEY, VEGA_KEY, GAMMA_KEY
 from .functional_interpolator import FunctionalInterpolator, FuncInterType
+from .surface_file import TabulatedCurves, write_surface_file, read_surface_file
+from .smile_table import SmileTable, create_smile_table
 
 SMILE_STRIKE_UNIT: final = StrikeUnit.log_moneyness
 SMILE_PRICE_UNIT: final = PriceUnit.vol
 EXPIRY_PRICE_UNIT: final = PriceUnit.total_var
 ABS_LOG_MONEYNESS_EXTRA_POINT: final = 3.0
+PIECEWISE_POLYNOMIAL_INTER_TYPES: final = (InterpolationType.linear, InterpolationType.ncs, InterpolationType.ccs,
+                                          InterpolationType.pchip)
 
 
 class InterpolationData:
@@ -36,11 +41,32 @@ class VolSmile:
     def __init__(self,
                  data: InterpolationData,
                  inter_type: InterpolationType,
-                 extra_type: ExtrapolationType):
+                 extra_type: ExtrapolationType,
+                 piecewise_polynomial: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None):
+        """
+
+        :param data:
+        :param inter_type:
+        :param extra_type:
+        :param piecewise_polynomial: the result of get_piecewise_polynomial, if known, e.g., for a loaded surface.
+        """
 
         self._expiry: float = data.expiry
-        self._interpolator: Interpolator = create_interpolator(x=data.x, y=data.y,
-                                                               inter_type=inter_type, extra_type=extra_type)
+        self._data: InterpolationData = data
+        self._inter_type: InterpolationType = inter_type
+        self._extra_type: ExtrapolationType = extra_type
+        self._piecewise_polynomial: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = piecewise_polynomial
+        self._interpolator: Optional[Interpolator] = None
+        if piecewise_polynomial is None:  # otherwise, it is created on first use, as the kernel does not need it
+            self._create_interpolator()
+
+    @property
+    def expiry(self) -> float:
+        return self._expiry
+
+    @property
+    def data(self) -> InterpolationData:
+        return self._data
 
     def __call__(self, trans_strikes: ScalarOrArray) -> ScalarOrArray:
         """ Returns the total variance(s) for the given transformed strikes.
@@ -49,10 +75,44 @@ class VolSmile:
         :return:
         """
 
+        if self._interpolator is None:
+            self._create_interpolator()
+
         vol = self._interpolator(trans_strikes)
         total_variance = vol ** 2 * self._expiry
         return total_variance
 
+    def _create_interpolator(self):
+        self._interpolator = create_interpolator(x=self._data.x, y=self._data.y, inter_type=self._inter_type,
+                                                 extra_type=self._extra_type)
+
+    def get_piecewise_polynomial(self) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """ Returns the smile as a piecewise cubic polynomial in the representation of scipy's PPoly, which is built
+            on first use, or None if the interpolation type is not piecewise polynomial in this representation.
+
+        :return: the knots, the volatilities at the knots, and the (4, n_knots - 1) coefficients.
+        """
+
+        if self._piecewise_polynomial is None and self._inter_type in PIECEWISE_POLYNOMIAL_INTER_TYPES and \
+                self._data.x.size >= 2:
+            x, y = self._data.x, self._data.y
+            if self._inter_type is InterpolationType.linear:
+                slopes = (y[1:] - y[:-1]) / (x[1:] - x[:-1])
+                coefficients = np.vstack((np.zeros_like(slopes), np.zeros_like(slopes), slopes, y[:-1]))
+            else:
+                # the splines are constructed as in computils, which yields the same coefficients
+                from scipy.interpolate import CubicSpline, PchipInterpolator
+                if self._inter_type is InterpolationType.ncs:
+                    coefficients = CubicSpline(x=x, y=y, bc_type='natural').c
+                elif self._inter_type is InterpolationType.ccs:
+                    coefficients = CubicSpline(x=x, y=y, bc_type='clamped').c
+                else:
+                    coefficients = PchipInterpolator(x=x, y=y).c
+            self._piecewise_polynomial = (np.asarray(x, dtype=float), np.asarray(y, dtype=float),
+                                          np.ascontiguousarray(coefficients, dtype=float))
+
+        return self._piecewise_polynomial
+
 
 class InternalVolSurface(VolSurface):
     def __init__(self,
@@ -60,17 +120,19 @@ class InternalVolSurface(VolSurface):
                  oqp: OptionQuoteProcessor,
                  filter_type: Optional[FilterType],
                  filter_smoothness_param: float,
-                 extrapolation_param: Optional[float]):
+                 extrapolation_param: Optional[float],
+                 filter_cache: Optional[FilterCache] = None):
 
         self._smile_inter_type: InterpolationType = smile_inter_type
         self._extrapolation_param: Optional[float] = extrapolation_param
 
-        self._oqp: OptionQuoteProcessor = oqp
+        self._oqp: Union[OptionQuoteProcessor, TabulatedCurves] = oqp  # the tabulated curves of a loaded surface
         self._filtering = filter_type is not None
         if self._filtering:
-            self._oqp.filter(filter_type=filter_type, smoothing_param=filter_smoothness_param)
+            self._oqp.filter(filter_type=filter_type, smoothing_param=filter_smoothness_param, cache=filter_cache)
 
         self._vol_surface: FunctionalInterpolator = None
+        self._smile_table: Optional[SmileTable] = None
 
     def calibrate(self):
         """ Calibrates the volatility surface object to the given option price data.
@@ -78,7 +140,12 @@ class InternalVolSurface(VolSurface):
         :return:
         """
 
-        data = self._get_interpolation_data()
+        if isinstance(self._oqp, TabulatedCurves):
+            raise RuntimeError("a loaded volatility surface has no quotes to be recalibrated to.")
+
+        self._calibrate(data=self._get_interpolation_data())
+
+    def _calibrate(self, data: List[InterpolationData]):
         expiries = []
         smiles = []
         for d in data:
@@ -87,16 +154,29 @@ class InternalVolSurface(VolSurface):
 
         self._vol_surface = FunctionalInterpolator(independent_variables=np.array(expiries), funcs=smiles,
                                                    f_inter_type=FuncInterType.linear)
+        self._smile_table = None
 
     def _get_interpolation_data(self) -> List[InterpolationData]:
-        quotes = self._oqp.get_quotes(strike_unit=SMILE_STRIKE_UNIT, price_unit=SMILE_PRICE_UNIT)
-        expiries = quotes[EXPIRY_KEY].unique()
+        """ Extracts the smiles of all expiries in one pass over the quote arrays of the processor, in which the smile
+            of every expiry is a contiguous range. """
+
+        expiries, offsets, quote_arrays = self._oqp.get_quote_arrays(strike_unit=SMILE_STRIKE_UNIT,
+                                                                     price_unit=SMILE_PRICE_UNIT)
+        extra_point_bounds = None
+        if self._extrapolation_param is not None and expiries.size > 0:
+            # the bounds at both extra points are computed for all expiries in one call
+            extra_point_bounds = self._oqp.compute_bounds(
+                expiries=expiries, strikes=np.array([-ABS_LOG_MONEYNESS_EXTRA_POINT, ABS_LOG_MONEYNESS_EXTRA_POINT]),
+                strike_unit=SMILE_STRIKE_UNIT, price_unit=SMILE_PRICE_UNIT)
+
         data = []
-        for i in range(expiries.size):
-            expiry = expiries[i]
-            quotes_for_expiry = quotes.loc[quotes[EXPIRY_KEY] == expiry]
-            strikes, prices = self._get_augmented_quotes(strikes=quotes_for_expiry[STRIKE_KEY].values,
-                                                         prices=quotes_for_expiry[MID_KEY].values, expiry=expiry)
+        for i, expiry in enumerate(expiries):
+            quote_slice = slice(offsets[i], offsets[i + 1])
+            strikes, prices = quote_arrays[STRIKE_KEY][quote_slice], quote_arrays[MID_KEY][quote_slice]
+            if extra_point_bounds is not None:
+                strikes, prices = self._get_augmented_quotes(strikes=strikes, prices=prices,
+                                                             lower_bounds=extra_point_bounds[0][i],
+                                                             upper_bounds=extra_point_bounds[1][i])
             data.append(InterpolationData(expiry=expiry, x=strikes, y=prices))
 
         return data
@@ -104,34 +184,39 @@ class InternalVolSurface(VolSurface):
     def _get_augmented_quotes(self,
                               strikes: np.ndarray,
                               prices: np.ndarray,
-                              expiry: float) -> Tuple[np.ndarray, np.ndarray]:
+                              lower_bounds: np.ndarray,
+                              upper_bounds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """ Adds the extra points at both ends of the smile that are not covered by the quotes.
+
+        :param strikes:
+        :param prices:
+        :param lower_bounds: lower bounds at the left and right extra points.
+        :param upper_bounds: upper bounds at the left and right extra points.
+        :return:
+        """
 
         augmented_strikes = strikes
         augmented_prices = prices
-        if self._extrapolation_param is not None:
-            if strikes[-1] < ABS_LOG_MONEYNESS_EXTRA_POINT:
-                extra_vol_rhs = self._get_extrapolated_value(log_moneyness=ABS_LOG_MONEYNESS_EXTRA_POINT, expiry=expiry,
-                                                             base_vol=augmented_prices[-1])
-                augmented_prices = np.append(augmented_prices, values=extra_vol_rhs)
-                augmented_strikes = np.append(augmented_strikes, values=ABS_LOG_MONEYNESS_EXTRA_POINT)
-            if strikes[0] > -ABS_LOG_MONEYNESS_EXTRA_POINT:
-                extra_vol_lhs = self._get_extrapolated_value(log_moneyness=-ABS_LOG_MONEYNESS_EXTRA_POINT,
-                                                             expiry=expiry, base_vol=augmented_prices[0])
-                augmented_prices = np.insert(augmented_prices, obj=0, values=extra_vol_lhs)
-                augmented_strikes = np.insert(augmented_strikes, obj=0, values=-ABS_LOG_MONEYNESS_EXTRA_POINT)
+        if strikes[-1] < ABS_LOG_MONEYNESS_EXTRA_POINT:
+            extra_vol_rhs = self._get_extrapolated_value(lower_bound=lower_bounds[1], upper_bound=upper_bounds[1],
+                                                         base_vol=augmented_prices[-1])
+            augmented_prices = np.append(augmented_prices, values=extra_vol_rhs)
+            augmented_strikes = np.append(augmented_strikes, values=ABS_LOG_MONEYNESS_EXTRA_POINT)
+        if strikes[0] > -ABS_LOG_MONEYNESS_EXTRA_POINT:
+            extra_vol_lhs = self._get_extrapolated_value(lower_bound=lower_bounds[0], upper_bound=upper_bounds[0],
+                                                         base_vol=augmented_prices[0])
+            augmented_prices = np.insert(augmented_prices, obj=0, values=extra_vol_lhs)
+            augmented_strikes = np.insert(augmented_strikes, obj=0, values=-ABS_LOG_MONEYNESS_EXTRA_POINT)
 
         return augmented_strikes, augmented_prices
 
     def _get_extrapolated_value(self,
-                                log_moneyness: float,
-                                expiry: float,
+                                lower_bound: float,
+                                upper_bound: float,
                                 base_vol: float):
 
-        ub = self._oqp.compute_upper_bound(expiry=expiry, strike=log_moneyness, strike_unit=SMILE_STRIKE_UNIT,
-                                           price_unit=SMILE_PRICE_UNIT)
-        lb = self._oqp.compute_lower_bound(expiry=expiry, strike=log_moneyness, strike_unit=SMILE_STRIKE_UNIT,
-                                           price_unit=SMILE_PRICE_UNIT)
-        lb = max(lb, base_vol)
+        ub = float(upper_bound)
+        lb = max(float(lower_bound), base_vol)
         if lb > ub:
             extrapolated_vol = ub
         else:
@@ -156,6 +241,28 @@ class InternalVolSurface(VolSurface):
         if not self._is_calibrated():
             raise RuntimeError("calibrate() must be called before this function.")
 
+        if self._smile_table is not None:
+            return self._get_price_from_table(price_unit=price_unit, expiry=expiry, strike=strike,
+                                              strike_unit=strike_unit)
+
+        smiles, weights = self._vol_surface.get_funcs_and_weights(expiry)
+        piecewise_polynomials = [smile.get_piecewise_polynomial() for smile in smiles]
+        if all(p is not None for p in piecewise_polynomials):
+            return self._get_price_from_kernel(price_unit=price_unit, expiry=expiry, strike=strike,
+                                               strike_unit=strike_unit, smiles=smiles, weights=weights,
+                                               piecewise_polynomials=piecewise_polynomials)
+
+        return self._get_price_from_transformations(price_unit=price_unit, expiry=expiry, strike=strike,
+                                                    strike_unit=strike_unit)
+
+    def _get_price_from_transformations(self,
+                                        price_unit: PriceUnit,
+                                        expiry: float,
+                                        strike: ScalarOrArray,
+                                        strike_unit: StrikeUnit) -> ScalarOrArray:
+        """ Returns the prices of get_price by transforming the strikes, evaluating the surface, and transforming the
+            total variances, which applies to all smile interpolation types. """
+
         trans_strikes = self._oqp.transform_strike(expiry=expiry, strike=strike, input_strike_unit=strike_unit,
                                                    output_strike_unit=SMILE_STRIKE_UNIT)
         prices = self._vol_surface(x=trans_strikes, y=expiry)
@@ -164,6 +271,141 @@ class InternalVolSurface(VolSurface):
                                                  expiry=expiry)
         return trans_prices
 
+    def _get_price_from_kernel(self,
+                               price_unit: PriceUnit,
+                               expiry: float,
+                               strike: ScalarOrArray,
+                               strike_unit: StrikeUnit,
+                               smiles: List[VolSmile],
+                               weights: Optional[Tuple[float, float]],
+                               piecewise_polynomials: List[Tuple[np.ndarray, np.ndarray, np.ndarray]]) -> ScalarOrArray:
+        """ Returns the prices of get_price from the compiled kernel, which evaluates the whole chain per strike, and
+            agrees with _get_price_from_transformations up to rounding. """
+
+        from .surface_kernels import compute_surface_prices  # imported on first use, as it loads numba
+
+        strikes = np.asarray(strike, dtype=float)
+        prices = np.empty(strikes.shape)
+        is_interpolated = weights is not None
+        right = 1 if is_interpolated else 0
+        left_weight, right_weight = weights if is_interpolated else (1.0, 0.0)
+        compute_surface_prices(strikes.ravel(), strike_unit.value, *piecewise_polynomials[0], smiles[0].expiry,
+                               *piecewise_polynomials[right], smiles[right].expiry, float(left_weight),
+                               float(right_weight), is_interpolated, price_unit.value, float(expiry),
+                               float(self._oqp.get_forward(expiry)), float(self._oqp.get_discount_factor(expiry)),
+                               prices.reshape(-1))
+
+        return prices if isinstance(strike, np.ndarray) else prices[()]
+
+    def _get_price_from_table(self,
+                              price_unit: PriceUnit,
+                              expiry: float,
+                              strike: ScalarOrArray,
+                              strike_unit: StrikeUnit) -> ScalarOrArray:
+        """ Returns the prices of get_price with the total variances of the smiles looked up in the smile table. """
+
+        from .surface_kernels import compute_tabulated_prices  # imported on first use, as it loads numba
+
+        rows, weights = self._vol_surface.get_indices_and_weights(expiry)
+        strikes = np.asarray(strike, dtype=float)
+        prices = np.empty(strikes.shape)
+        is_interpolated = weights is not None
+        left_weight, right_weight = weights if is_interpolated else (1.0, 0.0)
+        compute_tabulated_prices(strikes.ravel(), strike_unit.value, self._smile_table.total_vars,
+                                 self._smile_table.log_moneyness_start, self._smile_table.log_moneyness_step, rows[0],
+                                 rows[-1], float(left_weight), float(right_weight), is_interpolated, price_unit.value,
+                                 float(expiry), float(self._oqp.get_forward(expiry)),
+                                 float(self._oqp.get_discount_factor(expiry)), prices.reshape(-1))
+
+        return prices if isinstance(strike, np.ndarray) else prices[()]
+
+    def get_price_and_greeks(self,
+                             expiries: ScalarOrArray,
+                             strikes: ScalarOrArray,
+                             strike_unit: StrikeUnit = StrikeUnit.strike) -> Dict[str, np.ndarray]:
+        """ Returns the call prices and their Greeks for pairs of expiries and strikes. The total variances are
+            evaluated once per expiry, as by get_price, and the prices, deltas, vegas and gammas are computed from them
+            in a single compiled pass, instead of bumping and repricing.
+
+        :param expiries: scalar or array of expiries, which is broadcast against strikes.
+        :param strikes: scalar or array of strikes.
+        :param strike_unit:
+        :return: arrays of the broadcast shape with the keys PRICE_KEY, DELTA_KEY, VEGA_KEY and GAMMA_KEY.
+        """
+
+        from .surface_kernels import compute_prices_and_greeks  # imported on first use, as it loads numba
+
+        if not self._is_calibrated():
+            raise RuntimeError("calibrate() must be called before this function.")
+
+        expiries, strikes = np.broadcast_arrays(np.asarray(expiries, dtype=float), np.asarray(strikes, dtype=float))
+        flat_strikes = np.array(strikes.ravel())  # a copy, as the broadcast arrays may share memory
+        unique_expiries, inverse, counts = np.unique(expiries.ravel(), return_inverse=True, return_counts=True)
+        inverse = inverse.ravel()
+
+        # the strikes of every expiry are gathered, such that the surface is evaluated once per expiry
+        order = np.argsort(inverse, kind='stable')
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        total_vars = np.empty(flat_strikes.size)
+        for i, expiry in enumerate(unique_expiries.tolist()):
+            indices = order[offsets[i]:offsets[i + 1]]
+            total_vars[indices] = self.get_price(price_unit=PriceUnit.total_var, expiry=expiry,
+                                                 strike=flat_strikes[indices], strike_unit=strike_unit)
+
+        forwards = np.array([self._oqp.get_forward(e) for e in unique_expiries.tolist()], dtype=float)
+        discount_factors = np.array([self._oqp.get_discount_factor(e) for e in unique_expiries.tolist()], dtype=float)
+        results = {key: np.empty(flat_strikes.size) for key in (PRICE_KEY, DELTA_KEY, VEGA_KEY, GAMMA_KEY)}
+        compute_prices_and_greeks(flat_strikes, strike_unit.value, total_vars, unique_expiries[inverse],
+                                  forwards[inverse], discount_factors[inverse], results[PRICE_KEY], results[DELTA_KEY],
+                                  results[VEGA_KEY], results[GAMMA_KEY])
+
+        return {key: values.reshape(strikes.shape) for key, values in results.items()}
+
+    def tabulate(self,
+                 n_points: int = DEFAULT_N_TABULATED_POINTS,
+                 vol_tolerance: float = DEFAULT_TABULATION_VOL_TOLERANCE):
+        """ Switches to the tabulated mode, in which get_price looks up the total variances of the smiles in a table on
+            a uniform grid of log-moneyness, which spans the points of all smiles. The mode ends with the next
+            calibration.
+
+        :param n_points: number of points of the grid.
+        :param vol_tolerance: maximum absolute error in implied volatility of the table at the smile expiries, which is
+            checked inside every grid cell; a RuntimeError is raised if the error exceeds the tolerance.
+        :return:
+        """
+
+        if not self._is_calibrated():
+            raise RuntimeError("calibrate() must be called before this function.")
+
+        smiles = self._vol_surface.funcs
+        self._smile_table = create_smile_table(smiles=smiles, expiries=self._vol_surface.independent_variables,
+                                               log_moneyness_start=min(s.data.x[0] for s in smiles),
+                                               log_moneyness_end=max(s.data.x[-1] for s in smiles), n_points=n_points,
+                                               vol_tolerance=vol_tolerance)
+
+    def save(self, path: str):
+        """ Saves the calibrated volatility surface to a surface file, from which it is restored by load_vol_surface.
+
+        :param path: path of the surface file, which should end with .npy.
+        :return:
+        """
+
+        if not self._is_calibrated():
+            raise RuntimeError("calibrate() must be called before this function.")
+
+        smiles = self._vol_surface.funcs
+        piecewise_polynomials = [smile.get_piecewise_polynomial() for smile in smiles]
+        if any(p is None for p in piecewise_polynomials):
+            raise RuntimeError(f"surfaces can be saved for the smile interpolation types "
+                               f"{', '.join(t.name for t in PIECEWISE_POLYNOMIAL_INTER_TYPES)} only, and for smiles "
+                               f"with at least two points.")
+
+        expiries = self._vol_surface.independent_variables
+        write_surface_file(path=path, inter_type_value=self._smile_inter_type.value, expiries=expiries,
+                           forwards=np.array([self._oqp.get_forward(e) for e in expiries], dtype=float),
+                           discount_factors=np.array([self._oqp.get_discount_factor(e) for e in expiries], dtype=float),
+                           piecewise_polynomials=piecewise_polynomials)
+
     def _is_calibrated(self) -> bool:
         return self._vol_surface is not None
 
@@ -190,6 +432,32 @@ class InternalVolSurface(VolSurface):
         cdf_values = 1.0 + fo_derivatives
         return cdf_values
 
+    def create_risk_neutral_sampler(self,
+                                    expiries: ScalarOrArray,
+                                    n_points: int = DEFAULT_N_CDF_POINTS) -> RiskNeutralSampler:
+        """ Creates a sampler whose CDF tables are computed from the undiscounted call prices of get_price on strike
+            grids that are uniform in log-moneyness, and centered at the forward.
+
+        :param expiries:
+        :param n_points: number of strikes of the grid of every expiry.
+        :return:
+        """
+
+        if not self._is_calibrated():
+            raise RuntimeError("calibrate() must be called before this function.")
+
+        from .risk_neutral_sampler import InternalRiskNeutralSampler  # imported on first use, as it loads numba
+
+        expiries = np.unique(np.asarray(expiries, dtype=float))
+        forwards = np.array([self._oqp.get_forward(e) for e in expiries.tolist()], dtype=float)
+        # the smiles are flat beyond their knots, and the maximum total variance is estimated at the knots of all smiles
+        knots = np.unique(np.concatenate([smile.data.x for smile in self._vol_surface.funcs]))
+        max_total_vars = np.array([np.nanmax(self.get_price(price_unit=PriceUnit.total_var, expiry=e, strike=knots,
+                                                            strike_unit=StrikeUnit.log_moneyness))
+                                   for e in expiries.tolist()], dtype=float)
+        return InternalRiskNeutralSampler(vol_surface=self, expiries=expiries, forwards=forwards,
+                                          max_total_vars=max_total_vars, n_points=n_points)
+
     def _compute_undiscounted_call_price(self,
                                          strike: ScalarOrArray,
                                          expiry: float) -> ScalarOrArray:
@@ -201,3 +469,39 @@ class InternalVolSurface(VolSurface):
             strike=strike, strike_unit=StrikeUnit.strike, price=vol, input_price_unit=PriceUnit.vol,
             output_price_unit=PriceUnit.undiscounted_call, expiry=expiry)
         return undiscounted_call_price
+
+
+def calibrate_vol_surfaces(smile_inter_types: List[InterpolationType],
+                           oqp: OptionQuoteProcessor,
+                           extrapolation_param: Optional[float]) -> Dict[InterpolationType, InternalVolSurface]:
+    """ Calibrates a volatility surface for every smile interpolation type to the quotes of a filtered processor. The
+        smiles, including their extrapolated points, do not depend on the interpolation type, and are extracted once for
+        all surfaces. """
+
+    vol_surfaces = {sit: InternalVolSurface(smile_inter_type=sit, oqp=oqp, filter_type=None,
+                                            filter_smoothness_param=None, extrapolation_param=extrapolation_param)
+                    for sit in smile_inter_types}
+    if vol_surfaces:
+        data = next(iter(vol_surfaces.values()))._get_interpolation_data()
+        for vol_surface in vol_surfaces.values():
+            vol_surface._calibrate(data=data)
+
+    return vol_surfaces
+
+
+def load_vol_surface(path: str) -> InternalVolSurface:
+    """ Loads a volatility surface from a surface file written by InternalVolSurface.save. The surface prices from the
+        memory-mapped file, without quotes or a processor, and cannot be recalibrated. """
+
+    inter_type_value, expiries, forwards, discount_factors, piecewise_polynomials = read_surface_file(path)
+    vol_surface = InternalVolSurface(smile_inter_type=InterpolationType(inter_type_value),
+                                     oqp=TabulatedCurves(expiries=expiries, forwards=forwards,
+                                                         discount_factors=discount_factors),
+                                     filter_type=None, filter_smoothness_param=None, extrapolation_param=None)
+    smiles = [VolSmile(data=InterpolationData(expiry=expiry, x=p[0], y=p[1]), inter_type=vol_surface._smile_inter_type,
+                       extra_type=ExtrapolationType.flat, piecewise_polynomial=p)
+              for expiry, p in zip(expiries.tolist(), piecewise_polynomials)]
+    vol_surface._vol_surface = FunctionalInterpolator(independent_variables=expiries, funcs=smiles,
+                                                      f_inter_type=FuncInterType.linear)
+
+    return vol_surface